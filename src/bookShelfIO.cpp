@@ -838,6 +838,262 @@ int read_routes_3D(char *input) {
 // mostly focusing moduleInstance, teminalInstance
 //
 
+void BookshelfArrays::Clear() {
+  *this = BookshelfArrays();
+}
+
+//
+// ParseBookShelf from memory: fills the same instances as
+// read_nodes_3D, read_nets_3D, read_pl2 and read_scl do.
+//
+void ParseBookShelfArrays(BookshelfArrays& bsArrays) {
+#ifdef USE_GOOGLE_HASH
+  nodesMap.set_empty_key(INIT_STR);
+#endif
+  int nodeCnt = bsArrays.nodeName.size();
+  if( bsArrays.nodeWidth.size() != nodeCnt || 
+      bsArrays.nodeHeight.size() != nodeCnt || 
+      bsArrays.nodeType.size() != nodeCnt || 
+      bsArrays.nodeX.size() != nodeCnt || 
+      bsArrays.nodeY.size() != nodeCnt ) {
+    runtimeError("Bookshelf arrays: node arrays differ in length");
+  }
+  if( bsArrays.netPtr.size() != bsArrays.netName.size() + 1 ) {
+    runtimeError("Bookshelf arrays: netPtr must have #nets + 1 entries");
+  }
+  for(int i = 0; i < nodeCnt; i++) {
+    if( bsArrays.nodeType[i] < 0 || bsArrays.nodeType[i] > 2 ) {
+      runtimeError("Bookshelf arrays: nodeType " 
+          + to_string(bsArrays.nodeType[i]) + " of node " 
+          + bsArrays.nodeName[i] + " is not 0, 1 or 2");
+    }
+  }
+  // a decreasing netPtr would give a net a negative pin count
+  if( bsArrays.netPtr[0] != 0 ) {
+    runtimeError("Bookshelf arrays: netPtr must start at 0");
+  }
+  for(size_t i = 1; i < bsArrays.netPtr.size(); i++) {
+    if( bsArrays.netPtr[i] < bsArrays.netPtr[i-1] ) {
+      runtimeError("Bookshelf arrays: netPtr decreases at net " 
+          + bsArrays.netName[i-1]);
+    }
+  }
+
+  // *.nodes
+  terminalCNT = 0;
+  for(int i = 0; i < nodeCnt; i++) {
+    if( bsArrays.nodeType[i] != 0 ) {
+      terminalCNT++;
+    }
+  }
+  moduleCNT = nodeCnt - terminalCNT;
+  moduleInstance =
+      (struct MODULE *)malloc(sizeof(struct MODULE) * moduleCNT);
+  terminalInstance =
+      (struct TERM *)malloc(sizeof(struct TERM) * terminalCNT);
+
+  // node index -> module or terminal index
+  vector< int > instIdx(nodeCnt);
+  int moduleCur = 0, terminalCur = 0;
+  bool isFirstTerm = true;
+  for(int i = 0; i < nodeCnt; i++) {
+    bool isTerminal = (bsArrays.nodeType[i] != 0);
+    bool isTerminalNI = (bsArrays.nodeType[i] == 2);
+    int idx = instIdx[i] = (isTerminal)? terminalCur++ : moduleCur++;
+    nodesMap[bsArrays.nodeName[i]] = NODES(idx, isTerminal, isTerminalNI);
+
+    if( !isTerminal ) {
+      MODULE* curModule = &moduleInstance[idx];
+      curModule->idx = idx;
+      moduleNameStor.push_back(bsArrays.nodeName[i]);
+
+      curModule->size.x = bsArrays.nodeWidth[i];
+      curModule->size.y = bsArrays.nodeHeight[i];
+      curModule->half_size.x = 0.5 * curModule->size.x;
+      curModule->half_size.y = 0.5 * curModule->size.y;
+      curModule->area = curModule->size.x * curModule->size.y;
+
+      curModule->pof = NULL;
+      curModule->pin = NULL;
+      curModule->netCNTinObject = 0;
+      curModule->pinCNTinObject = 0;
+
+      curModule->pmin.x = bsArrays.nodeX[i];
+      curModule->pmin.y = bsArrays.nodeY[i];
+      curModule->center.x = curModule->pmin.x + curModule->half_size.x;
+      curModule->center.y = curModule->pmin.y + curModule->half_size.y;
+      curModule->pmax.x = curModule->pmin.x + curModule->size.x;
+      curModule->pmax.y = curModule->pmin.y + curModule->size.y;
+
+      max_mac_dim.x = max(max_mac_dim.x, (int)curModule->size.x);
+      max_mac_dim.y = max(max_mac_dim.y, (int)curModule->size.y);
+    }
+    else {
+      TERM* curTerminal = &terminalInstance[idx];
+      curTerminal->idx = idx;
+      terminalNameStor.push_back(bsArrays.nodeName[i]);
+
+      // if Non-Image mode, ignore width & height
+      curTerminal->size.x = (isTerminalNI)? 0.0 : bsArrays.nodeWidth[i];
+      curTerminal->size.y = (isTerminalNI)? 0.0 : bsArrays.nodeHeight[i];
+      curTerminal->isTerminalNI = isTerminalNI;
+      curTerminal->area = curTerminal->size.x * curTerminal->size.y;
+
+      curTerminal->pof = NULL;
+      curTerminal->pin = NULL;
+      curTerminal->netCNTinObject = 0;
+      curTerminal->pinCNTinObject = 0;
+
+      curTerminal->pmin.x = bsArrays.nodeX[i];
+      curTerminal->pmin.y = bsArrays.nodeY[i];
+      curTerminal->center.x = curTerminal->pmin.x + 0.5 * curTerminal->size.x;
+      curTerminal->center.y = curTerminal->pmin.y + 0.5 * curTerminal->size.y;
+      curTerminal->pmax.x = curTerminal->pmin.x + curTerminal->size.x;
+      curTerminal->pmax.y = curTerminal->pmin.y + curTerminal->size.y;
+
+      if(isFirstTerm) {
+        terminal_pmin = curTerminal->pmin;
+        terminal_pmax = curTerminal->pmax;
+        isFirstTerm = false;
+      }
+      else {
+        terminal_pmin.x = min(terminal_pmin.x, curTerminal->pmin.x);
+        terminal_pmin.y = min(terminal_pmin.y, curTerminal->pmin.y);
+        terminal_pmax.x = max(terminal_pmax.x, curTerminal->pmax.x);
+        terminal_pmax.y = max(terminal_pmax.y, curTerminal->pmax.y);
+      }
+    }
+  }
+
+  // *.nets
+  netCNT = bsArrays.netName.size();
+  pinCNT = bsArrays.netPtr[netCNT];
+  if( bsArrays.pinNode.size() != pinCNT ||
+      bsArrays.pinIO.size() != pinCNT ||
+      bsArrays.pinX.size() != pinCNT ||
+      bsArrays.pinY.size() != pinCNT ) {
+    runtimeError("Bookshelf arrays: pin arrays differ in length");
+  }
+  netInstance = (struct NET *)malloc(sizeof(struct NET) * netCNT);
+  pinInstance = (struct PIN *)malloc(sizeof(struct PIN) * pinCNT);
+
+  // pins per node are known in advance: allocate them at once
+  // instead of the realloc in AddPinInfoForModuleAndTerminal
+  vector< int > nodePinCnt(nodeCnt, 0);
+  for(int pid = 0; pid < pinCNT; pid++) {
+    int node = bsArrays.pinNode[pid];
+    if( node < 0 || node >= nodeCnt ) {
+      runtimeError("Bookshelf arrays: pinNode " + to_string(node) 
+          + " is not a node index");
+    }
+    nodePinCnt[node]++;
+  }
+  for(int i = 0; i < nodeCnt; i++) {
+    if( nodePinCnt[i] == 0 ) {
+      continue;
+    }
+    PIN*** pin = (bsArrays.nodeType[i] == 0)? 
+      &moduleInstance[instIdx[i]].pin : &terminalInstance[instIdx[i]].pin;
+    FPOS** pof = (bsArrays.nodeType[i] == 0)? 
+      &moduleInstance[instIdx[i]].pof : &terminalInstance[instIdx[i]].pof;
+    *pin = (struct PIN **)malloc(sizeof(struct PIN *) * nodePinCnt[i]);
+    *pof = (struct FPOS *)malloc(sizeof(struct FPOS) * nodePinCnt[i]);
+  }
+
+  int max_net_deg = INT_MIN;
+  for(int i = 0; i < netCNT; i++) {
+    NET* curNet = &netInstance[i];
+    new(curNet) NET();
+    curNet->idx = i;
+    netNameStor.push_back(bsArrays.netName[i]);
+
+    int netStart = bsArrays.netPtr[i];
+    curNet->pinCNTinObject = bsArrays.netPtr[i+1] - netStart;
+    curNet->pin = (struct PIN **)malloc(
+        sizeof(struct PIN *) * curNet->pinCNTinObject);
+    max_net_deg = max(max_net_deg, curNet->pinCNTinObject);
+
+    for(int j = 0; j < curNet->pinCNTinObject; j++) {
+      int pid = netStart + j;
+      int node = bsArrays.pinNode[pid];
+      bool isTerminal = (bsArrays.nodeType[node] != 0);
+      int* pinCntInObject = (isTerminal)? 
+        &terminalInstance[instIdx[node]].pinCNTinObject :
+        &moduleInstance[instIdx[node]].pinCNTinObject;
+      PIN** objPin = (isTerminal)? 
+        terminalInstance[instIdx[node]].pin :
+        moduleInstance[instIdx[node]].pin;
+      FPOS* objPof = (isTerminal)? 
+        terminalInstance[instIdx[node]].pof :
+        moduleInstance[instIdx[node]].pof;
+
+      int pinIdxInObject = (*pinCntInObject)++;
+      objPof[pinIdxInObject].Set(bsArrays.pinX[pid], bsArrays.pinY[pid]);
+
+      PIN* pin = &pinInstance[pid];
+      curNet->pin[j] = pin;
+      objPin[pinIdxInObject] = pin;
+      pin->term = isTerminal;
+      pin->moduleID = instIdx[node];
+      pin->netID = i;
+      pin->pinIDinNet = j;
+      pin->pinIDinModule = pinIdxInObject;
+      pin->gid = pid;
+      pin->IO = bsArrays.pinIO[pid];
+    }
+  }
+
+  // *.scl
+  row_cnt = bsArrays.rowY.size();
+  if( bsArrays.rowX.size() != row_cnt || 
+      bsArrays.rowSiteCnt.size() != row_cnt ) {
+    runtimeError("Bookshelf arrays: row arrays differ in length");
+  }
+  row_st = (ROW *)malloc(sizeof(struct ROW) * row_cnt);
+  for(int i = 0; i < row_cnt; i++) {
+    ROW *row = &row_st[i];
+    new(row) ROW();
+    row->pmin.y = bsArrays.rowY[i];
+    row->size.y = bsArrays.rowHeight;
+    row->pmax.y = row->pmin.y + row->size.y;
+    row->site_wid = bsArrays.siteWidth;
+    row->site_spa = bsArrays.siteSpacing;
+    row->ori = "N";
+
+    row->pmin.x = bsArrays.rowX[i];
+    row->x_cnt = bsArrays.rowSiteCnt[i];
+    row->size.x = row->x_cnt * row->site_spa;
+    row->pmax.x = row->pmin.x + row->size.x;
+
+    if(i == 0) {
+      grow_pmin.Set(row->pmin);
+      grow_pmax.Set(row->pmax);
+    }
+    else {
+      grow_pmin.x = min(grow_pmin.x, (prec)row->pmin.x);
+      grow_pmin.y = min(grow_pmin.y, (prec)row->pmin.y);
+      grow_pmax.x = max(grow_pmax.x, (prec)row->pmax.x);
+      grow_pmax.y = max(grow_pmax.y, (prec)row->pmax.y);
+    }
+  }
+  rowHeight = bsArrays.rowHeight;
+  SITE_SPA = bsArrays.siteSpacing;
+
+  printf("INFO:  #MODULE=%d, #TERMINAL=%d (from memory)\n", 
+      moduleCNT, terminalCNT);
+  printf("INFO:  #NET=%d\n", netCNT);
+  printf("INFO:  #PIN=%d\n", pinCNT);
+  printf("INFO:    Maximum Net Degree is %d\n", max_net_deg);
+  printf("INFO:  #ROW=%d\n", row_cnt);
+
+  FPOS tier_min, tier_max;
+  int tier_row_cnt = 0;
+
+  get_mms_3d_dim(&tier_min, &tier_max, &tier_row_cnt);
+  transform_3d(&tier_min, &tier_max, tier_row_cnt);
+  post_read_3d();
+}
+
 int read_nodes_3D(char *input) {
 #ifdef USE_GOOGLE_HASH
   nodesMap.set_empty_key(INIT_STR);
@@ -90,8 +90,43 @@ struct BsNetInfo {
   void Print( FILE* file );
 };
 
+// Bookshelf data handed over in memory instead of *.aux files,
+// e.g. by replace_external::import_bookshelf_*.
+// Node arrays are in one order; terminals may come anywhere.
+struct BookshelfArrays {
+  // *.nodes
+  vector< string > nodeName;
+  vector< prec > nodeWidth;
+  vector< prec > nodeHeight;
+  vector< int > nodeType;  // 0: movable, 1: terminal, 2: terminal_NI
+
+  // *.pl, lower left
+  vector< prec > nodeX;
+  vector< prec > nodeY;
+
+  // *.nets; pins of net k are netPtr[k] .. netPtr[k+1]-1
+  vector< string > netName;
+  vector< int > netPtr;
+  vector< int > pinNode;  // index of the node arrays
+  vector< int > pinIO;    // 0: I, 1: O, 2: B
+  vector< prec > pinX;    // offset from the node center
+  vector< prec > pinY;
+
+  // *.scl
+  vector< prec > rowY;       // Coordinate
+  vector< prec > rowX;       // SubrowOrigin
+  vector< int > rowSiteCnt;  // NumSites
+  prec rowHeight;
+  prec siteWidth;
+  prec siteSpacing;
+
+  void Clear();
+  bool IsEmpty() { return nodeName.empty(); };
+};
+
 void runtimeError(string error_text);
 void ParseBookShelf();
+void ParseBookShelfArrays(BookshelfArrays& bsArrays);
 int read_nodes_3D(char *input);
 int read_shapes_3D(char *input);
 int read_routes_3D(char *input);
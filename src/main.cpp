@@ -385,6 +385,9 @@ bool isFastMode;
 
 Tcl_Interp* _interp;
 
+// the Python module (_replace) is loaded by the interpreter: it has no main()
+// and no Tcl shell of its own
+#ifndef REPLACE_PYTHON_MODULE
 extern "C" {
 extern int Replace_Init(Tcl_Interp *interp);
 }
@@ -681,6 +684,7 @@ int main(int argc, char *argv[]) {
   //    ShowPlot( benchName );
   return 0;
 }
+#endif  // REPLACE_PYTHON_MODULE
 
 // mgwoo
 void init() {
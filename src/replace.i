@@ -1,4 +1,4 @@
-%module replace 
+%module replace
 
 %{
 #include "replace_external.h"
@@ -10,6 +10,196 @@
 %include <std_vector.i>
 %include <std_pair.i>
 
-%include "replace_external.h"
+// raw pointers; the Python module wraps them as arrays below
+%ignore replace_external::get_x_data;
+%ignore replace_external::get_y_data;
+%ignore replace_external::import_bookshelf_nodes(const std::vector<std::string>&,
+    const double*, const double*, const int64_t*);
+%ignore replace_external::import_bookshelf_placement(const double*, const double*,
+    size_t);
+%ignore replace_external::import_bookshelf_nets(const std::vector<std::string>&,
+    const int64_t*, const int64_t*, const int64_t*, const double*, const double*);
+%ignore replace_external::import_bookshelf_rows(const double*, const double*,
+    const int64_t*, size_t, double, double, double);
+
+#ifdef SWIGPYTHON
+// Python takes the column arguments as arrays below, not as lists
+%ignore replace_external::import_bookshelf_nodes(const std::vector<std::string>&,
+    const std::vector<double>&, const std::vector<double>&,
+    const std::vector<int>&);
+%ignore replace_external::import_bookshelf_placement(const std::vector<double>&,
+    const std::vector<double>&);
+%ignore replace_external::import_bookshelf_nets(const std::vector<std::string>&,
+    const std::vector<int>&, const std::vector<int>&, const std::vector<int>&,
+    const std::vector<double>&, const std::vector<double>&);
+%ignore replace_external::import_bookshelf_rows(const std::vector<double>&,
+    const std::vector<double>&, const std::vector<int>&, double, double, double);
+#endif
+
+// before the class, so that its list arguments take Python sequences
 %template(vstr)         std::vector<std::string>;
+%template(vfloat)       std::vector<float>;
+%template(vdouble)      std::vector<double>;
+%template(vint)         std::vector<int>;
+
+%include "replace_external.h"
+
+#ifdef SWIGPYTHON
+// Zero-copy coordinates: NumPy arrays over instance_x / instance_y.
+// The arrays are built through the array interface of an object that also
+// holds the replace_external, so the vectors live as long as any view.
+%extend replace_external {
+  size_t get_x_address() {
+    return (size_t) $self->get_x_data();
+  }
+  size_t get_y_address() {
+    return (size_t) $self->get_y_data();
+  }
+
+  // Bookshelf columns by address; the wrappers below check the lengths
+  void import_bookshelf_nodes_at(const std::vector<std::string>& names,
+      size_t widths, size_t heights, size_t types) {
+    $self->import_bookshelf_nodes(names, (const double*) widths,
+        (const double*) heights, (const int64_t*) types);
+  }
+  void import_bookshelf_placement_at(size_t x, size_t y, size_t count) {
+    $self->import_bookshelf_placement((const double*) x, (const double*) y,
+        count);
+  }
+  void import_bookshelf_nets_at(const std::vector<std::string>& names,
+      size_t net_ptr, size_t pin_node, size_t pin_io,
+      size_t pin_x, size_t pin_y) {
+    $self->import_bookshelf_nets(names, (const int64_t*) net_ptr,
+        (const int64_t*) pin_node, (const int64_t*) pin_io,
+        (const double*) pin_x, (const double*) pin_y);
+  }
+  void import_bookshelf_rows_at(size_t row_y, size_t row_x, size_t num_sites,
+      size_t count, double row_height, double site_width,
+      double site_spacing) {
+    $self->import_bookshelf_rows((const double*) row_y, (const double*) row_x,
+        (const int64_t*) num_sites, count, row_height, site_width,
+        site_spacing);
+  }
+
+  %pythoncode %{
+    def get_coordinates(self):
+        """x and y of all instances as read-only float32 NumPy arrays, no copy
+
+        The arrays follow later placement steps and keep this object alive.
+        """
+        import numpy as np
+
+        size = self.get_instance_list_size()
+        x = np.asarray(_InstanceCoordinates(self, self.get_x_address(), size))
+        y = np.asarray(_InstanceCoordinates(self, self.get_y_address(), size))
+        return x, y
+
+    def get_x_buffer(self):
+        """read-only memoryview over the x of all instances"""
+        return memoryview(self.get_coordinates()[0])
+
+    def get_y_buffer(self):
+        """read-only memoryview over the y of all instances"""
+        return memoryview(self.get_coordinates()[1])
+
+    def get_placement(self):
+        """(instance names, master names, x, y) of all instances in one go"""
+        x, y = self.get_coordinates()
+        return list(self.get_instance_names()), list(self.get_master_names()), x, y
+
+    def import_bookshelf_nodes(self, names, widths, heights, types):
+        """node columns in *.nodes order; types are 0 movable, 1 terminal
 
+        The columns are read in place when they are float64 / int64 NumPy
+        arrays, and converted once otherwise.
+        """
+        names = list(names)
+        widths = _column(widths, "float64", len(names), "widths")
+        heights = _column(heights, "float64", len(names), "heights")
+        types = _column(types, "int64", len(names), "types")
+        self.import_bookshelf_nodes_at(
+            names, _address(widths), _address(heights), _address(types)
+        )
+
+    def import_bookshelf_placement(self, x, y):
+        """node locations in *.nodes order"""
+        x = _column(x, "float64", None, "x")
+        y = _column(y, "float64", len(x), "y")
+        self.import_bookshelf_placement_at(_address(x), _address(y), len(x))
+
+    def import_bookshelf_nets(self, names, net_ptr, pin_node, pin_io, pin_x, pin_y):
+        """CSR nets: the pins of net i are net_ptr[i]:net_ptr[i + 1]"""
+        names = list(names)
+        net_ptr = _column(net_ptr, "int64", len(names) + 1, "net_ptr")
+        num_pins = int(net_ptr[-1])
+        pin_node = _column(pin_node, "int64", num_pins, "pin_node")
+        pin_io = _column(pin_io, "int64", num_pins, "pin_io")
+        pin_x = _column(pin_x, "float64", num_pins, "pin_x")
+        pin_y = _column(pin_y, "float64", num_pins, "pin_y")
+        self.import_bookshelf_nets_at(
+            names,
+            _address(net_ptr),
+            _address(pin_node),
+            _address(pin_io),
+            _address(pin_x),
+            _address(pin_y),
+        )
+
+    def import_bookshelf_rows(
+        self, row_y, row_x, num_sites, row_height, site_width, site_spacing
+    ):
+        """rows by y, subrow origin and site count"""
+        row_y = _column(row_y, "float64", None, "row_y")
+        row_x = _column(row_x, "float64", len(row_y), "row_x")
+        num_sites = _column(num_sites, "int64", len(row_y), "num_sites")
+        self.import_bookshelf_rows_at(
+            _address(row_y),
+            _address(row_x),
+            _address(num_sites),
+            len(row_y),
+            row_height,
+            site_width,
+            site_spacing,
+        )
+  %}
+}
+
+%pythoncode %{
+import sys
+
+
+class _InstanceCoordinates:
+    """array interface of one coordinate vector of a replace_external
+
+    NumPy keeps this object as the base of the arrays made from it, and this
+    object keeps `owner` alive, so the vector outlives every view of it.
+    """
+
+    def __init__(self, owner, address, size):
+        self.owner = owner
+        self.__array_interface__ = {
+            "shape": (size,),
+            # float32 in native byte order
+            "typestr": ("<" if sys.byteorder == "little" else ">") + "f4",
+            "data": (address, True),
+            "version": 3,
+        }
+
+
+def _column(values, dtype, size, name):
+    """values as a contiguous 1-D array of dtype; no copy if it is one already"""
+    import numpy as np
+
+    array = np.ascontiguousarray(values, dtype=dtype)
+    if array.ndim != 1:
+        raise ValueError(f"{name} must be one-dimensional, not {array.shape}")
+    if size is not None and len(array) != size:
+        raise ValueError(f"{name} has {len(array)} entries, expected {size}")
+    return array
+
+
+def _address(array):
+    """address of the first element; the caller keeps `array` referenced"""
+    return array.__array_interface__["data"][0]
+%}
+#endif
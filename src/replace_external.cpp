@@ -11,6 +11,7 @@ replace_external() :
   timing_driven_mode(false), 
   routability_driven_mode(false),
   write_bookshelf_mode(false),
+  is_bookshelf_arrays(false),
   unit_r(0.0f), unit_c(0.0f) {
   initGlobalVars();
 };
@@ -34,6 +35,24 @@ replace_external::help() {
   cout << "export_def [file_name]" << endl;
   cout << "    Output DEF location" << endl;
   cout << endl; 
+  cout << "import_bookshelf_nodes [names] [widths] [heights] [types]" << endl;
+  cout << "import_bookshelf_masters [masters]" << endl;
+  cout << "import_bookshelf_placement [x] [y]" << endl;
+  cout << "import_bookshelf_nets [names] [net_ptr] [pin_node] [pin_io] " << endl;
+  cout << "    [pin_x] [pin_y]" << endl;
+  cout << "import_bookshelf_rows [row_y] [row_x] [num_sites] " << endl;
+  cout << "    [row_height] [site_width] [site_spacing]" << endl;
+  cout << "    Bookshelf design as lists, instead of LEF/DEF files." << endl;
+  cout << "    (Python: float64 / int64 NumPy arrays are read in place.)" << endl;
+  cout << "    types: 0 movable, 1 terminal, 2 terminal_NI. " << endl;
+  cout << "    pin_io: 0 I, 1 O, 2 B. (x, y): lower left. " << endl;
+  cout << "    (pin_x, pin_y): pin offset from the node center. " << endl;
+  cout << "    Pins of net k: net_ptr[k] ~ net_ptr[k+1]-1. " << endl;
+  cout << endl; 
+  cout << "set_design_name [name]" << endl;
+  cout << "    Design name for the outputs of imported Bookshelf lists." << endl;
+  cout << "    Default: design" << endl;
+  cout << endl; 
   cout << "set_output [directory_location]" << endl;
   cout << "    Specify the location of output results. " << endl;
   cout << "    Default: ./output " << endl;
@@ -170,7 +189,13 @@ replace_external::help() {
   cout << endl; 
   cout << "get_instance_name [index]" << endl;
   cout << "    Returns instance name of specified instances' index. [string]" << endl;
-  cout << endl; 
+  cout << endl;
+  cout << "get_x_list / get_y_list" << endl;
+  cout << "    Returns x / y coordinates of all instances, in index order. [list of float]" << endl;
+  cout << endl;
+  cout << "get_instance_names / get_master_names" << endl;
+  cout << "    Returns instance / master names of all instances, in index order. [list of string]" << endl;
+  cout << endl;
 
 }
 
@@ -187,9 +212,135 @@ replace_external::import_def(const char* def){
 
 void 
 replace_external::export_def(const char* def){
+  if( inputMode != InputMode::lefdef ) {
+    std::cout << "ERROR: export_def needs LEF/DEF inputs; " 
+      << "use get_placement for imported Bookshelf lists." << std::endl;
+    return;
+  }
   WriteDef(def);
 }
 
+void
+replace_external::set_design_name(const char* name) {
+  design_name = name;
+}
+
+void
+replace_external::import_bookshelf_nodes(
+    const std::vector<std::string>& names,
+    const std::vector<double>& widths, 
+    const std::vector<double>& heights,
+    const std::vector<int>& types) {
+  if( widths.size() != names.size() || heights.size() != names.size()
+      || types.size() != names.size() ) {
+    std::cout << "ERROR: import_bookshelf_nodes needs as many widths, "
+      << "heights and types as names." << std::endl;
+    return;
+  }
+  std::vector<int64_t> types64(types.begin(), types.end());
+  import_bookshelf_nodes(names, widths.data(), heights.data(), types64.data());
+}
+
+void
+replace_external::import_bookshelf_nodes(
+    const std::vector<std::string>& names,
+    const double* widths, const double* heights, const int64_t* types) {
+  size_t count = names.size();
+  is_bookshelf_arrays = true;
+  bs_arrays.nodeName = names;
+  bs_arrays.nodeWidth.assign(widths, widths + count);
+  bs_arrays.nodeHeight.assign(heights, heights + count);
+  bs_arrays.nodeType.assign(types, types + count);
+}
+
+void
+replace_external::import_bookshelf_masters(
+    const std::vector<std::string>& masters) {
+  bs_master_stor = masters;
+}
+
+void
+replace_external::import_bookshelf_placement(
+    const std::vector<double>& x, 
+    const std::vector<double>& y) {
+  import_bookshelf_placement(x.data(), y.data(), std::min(x.size(), y.size()));
+}
+
+void
+replace_external::import_bookshelf_placement(
+    const double* x, const double* y, size_t count) {
+  is_bookshelf_arrays = true;
+  bs_arrays.nodeX.assign(x, x + count);
+  bs_arrays.nodeY.assign(y, y + count);
+}
+
+void
+replace_external::import_bookshelf_nets(
+    const std::vector<std::string>& names,
+    const std::vector<int>& net_ptr,
+    const std::vector<int>& pin_node,
+    const std::vector<int>& pin_io,
+    const std::vector<double>& pin_x,
+    const std::vector<double>& pin_y) {
+  if( net_ptr.size() != names.size() + 1 
+      || pin_node.size() != (size_t) net_ptr.back() 
+      || pin_io.size() != pin_node.size() || pin_x.size() != pin_node.size()
+      || pin_y.size() != pin_node.size() ) {
+    std::cout << "ERROR: import_bookshelf_nets needs one more net_ptr than "
+      << "names and net_ptr.back() pins." << std::endl;
+    return;
+  }
+  std::vector<int64_t> net_ptr64(net_ptr.begin(), net_ptr.end());
+  std::vector<int64_t> pin_node64(pin_node.begin(), pin_node.end());
+  std::vector<int64_t> pin_io64(pin_io.begin(), pin_io.end());
+  import_bookshelf_nets(names, net_ptr64.data(), pin_node64.data(),
+      pin_io64.data(), pin_x.data(), pin_y.data());
+}
+
+void
+replace_external::import_bookshelf_nets(
+    const std::vector<std::string>& names,
+    const int64_t* net_ptr, const int64_t* pin_node, const int64_t* pin_io,
+    const double* pin_x, const double* pin_y) {
+  size_t pin_count = net_ptr[names.size()];
+  is_bookshelf_arrays = true;
+  bs_arrays.netName = names;
+  bs_arrays.netPtr.assign(net_ptr, net_ptr + names.size() + 1);
+  bs_arrays.pinNode.assign(pin_node, pin_node + pin_count);
+  bs_arrays.pinIO.assign(pin_io, pin_io + pin_count);
+  bs_arrays.pinX.assign(pin_x, pin_x + pin_count);
+  bs_arrays.pinY.assign(pin_y, pin_y + pin_count);
+}
+
+void
+replace_external::import_bookshelf_rows(
+    const std::vector<double>& row_y,
+    const std::vector<double>& row_x,
+    const std::vector<int>& num_sites,
+    double row_height, double site_width, double site_spacing) {
+  if( row_x.size() != row_y.size() || num_sites.size() != row_y.size() ) {
+    std::cout << "ERROR: import_bookshelf_rows needs as many row_x and "
+      << "num_sites as row_y." << std::endl;
+    return;
+  }
+  std::vector<int64_t> num_sites64(num_sites.begin(), num_sites.end());
+  import_bookshelf_rows(row_y.data(), row_x.data(), num_sites64.data(),
+      row_y.size(), row_height, site_width, site_spacing);
+}
+
+void
+replace_external::import_bookshelf_rows(
+    const double* row_y, const double* row_x, const int64_t* num_sites,
+    size_t count, double row_height, double site_width, double site_spacing) {
+  is_bookshelf_arrays = true;
+  bs_arrays.rowY.assign(row_y, row_y + count);
+  bs_arrays.rowX.assign(row_x, row_x + count);
+  bs_arrays.rowSiteCnt.assign(num_sites, num_sites + count);
+  bs_arrays.rowHeight = row_height;
+  bs_arrays.siteWidth = site_width;
+  bs_arrays.siteSpacing = site_spacing;
+}
+
 void
 replace_external::set_output(const char* output) {
   output_loc = output;
@@ -325,6 +476,9 @@ replace_external::set_net_weight_scale(double net_weight_scale) {
 
 bool 
 replace_external::init_replace() {
+  if( is_bookshelf_arrays ) {
+    return init_replace_bookshelf_arrays();
+  }
   if( lef_stor.size() == 0 ) {
     std::cout << "ERROR: Specify at least one LEF file!" << std::endl;
     exit(1);
@@ -369,6 +523,74 @@ replace_external::init_replace() {
   return true;
 }
 
+// init_replace from the import_bookshelf_* lists:
+// same flow, with ParseBookShelfArrays in place of ParseInput
+bool
+replace_external::init_replace_bookshelf_arrays() {
+  if( bs_arrays.IsEmpty() ) {
+    std::cout << "ERROR: import_bookshelf_nodes is missing!" << std::endl;
+    exit(1);
+  }
+  else if( bs_arrays.rowY.size() == 0 ) {
+    std::cout << "ERROR: import_bookshelf_rows is missing!" << std::endl;
+    exit(1);
+  }
+  else if( lef_stor.size() != 0 || def_stor.size() != 0 ) {
+    std::cout << "ERROR: Either LEF/DEF files or Bookshelf lists, not both!" 
+      << std::endl;
+    exit(1);
+  }
+  else if( timing_driven_mode || routability_driven_mode ) {
+    std::cout << "ERROR: Timing/routability-driven modes need LEF/DEF files!" 
+      << std::endl;
+    exit(1);
+  }
+  else if( bs_master_stor.size() != 0 && 
+      bs_master_stor.size() != bs_arrays.nodeName.size() ) {
+    runtimeError("Bookshelf arrays: " + std::to_string(bs_master_stor.size()) 
+        + " masters for " + std::to_string(bs_arrays.nodeName.size()) 
+        + " nodes");
+  }
+
+  // no file is read: the name only names the outputs
+  auxCMD = ((design_name == "")? "design" : design_name) + ".aux";
+  outputCMD = (output_loc == "")? "./output" : output_loc;
+
+  initGlobalVarsAfterParse();
+  init();
+
+  inputMode = InputMode::bookshelf;
+  ParseBookShelfArrays(bs_arrays);
+
+  // master names in moduleInstance order; Bookshelf has none by itself
+  std::vector<std::string> module_master_stor;
+  module_master_stor.reserve(moduleCNT);
+  for(size_t i=0; i<bs_arrays.nodeType.size(); i++) {
+    if( bs_arrays.nodeType[i] == 0 ) {
+      module_master_stor.push_back( (i < bs_master_stor.size())? 
+          bs_master_stor[i] : "" );
+    }
+  }
+  bs_master_stor.swap(module_master_stor);
+  // everything is in the placer's own structures by now
+  bs_arrays.Clear();
+
+  if( hasCustomNetWeight ) {
+    initCustomNetWeight(net_weight_file); 
+  }
+
+  net_update_init();
+  init_tier();
+  build_data_struct(!isInitSeed);
+  update_instance_list();
+  if( write_bookshelf_mode ) {
+    setup_before_opt();
+    routeInst.Init();
+    WriteBookshelf();  
+  }
+  return true;
+}
+
 bool 
 replace_external::place_cell_init_place() {
   initialPlacement_main();
@@ -413,21 +635,61 @@ replace_external::get_instance_name(size_t idx) {
 
 float
 replace_external::get_x(size_t idx) {
-  return instance_list[idx].x;
+  return instance_x[idx];
 }
 
 float
 replace_external::get_y(size_t idx) {
-  return instance_list[idx].y;
+  return instance_y[idx];
 }
 
 void
 replace_external::print_instances() {
   std::cout << "Total Instance: " << instance_list.size() << endl; 
-  for(auto& cur_inst : instance_list ) {
-    std::cout << cur_inst.name << " (" << cur_inst.master << ") x:";
-    std::cout << cur_inst.x << " y:" << cur_inst.y << std::endl;
+  for(size_t i=0; i<instance_list.size(); i++) {
+    std::cout << instance_list[i].name << " (" << instance_list[i].master << ") x:";
+    std::cout << instance_x[i] << " y:" << instance_y[i] << std::endl;
+  }
+}
+
+std::vector<std::string>
+replace_external::get_instance_names() {
+  std::vector<std::string> names;
+  names.reserve(instance_list.size());
+  for(auto& cur_inst : instance_list) {
+    names.push_back(cur_inst.name);
+  }
+  return names;
+}
+
+std::vector<std::string>
+replace_external::get_master_names() {
+  std::vector<std::string> masters;
+  masters.reserve(instance_list.size());
+  for(auto& cur_inst : instance_list) {
+    masters.push_back(cur_inst.master);
   }
+  return masters;
+}
+
+std::vector<float>
+replace_external::get_x_list() {
+  return instance_x;
+}
+
+std::vector<float>
+replace_external::get_y_list() {
+  return instance_y;
+}
+
+const float*
+replace_external::get_x_data() {
+  return instance_x.data();
+}
+
+const float*
+replace_external::get_y_data() {
+  return instance_y.data();
 }
 
 
@@ -475,23 +737,28 @@ replace_external::get_row_size() {
 void 
 replace_external::update_instance_list() {
   if( instance_list.size() == 0 ) {
+    instance_list.reserve(moduleCNT);
     for(int i=0; i<moduleCNT; i++) {
       MODULE* module = &moduleInstance[i];
       instance_info tmp;
       tmp.name = module->Name();
-      auto cmPtr = ckt->defComponentMap.find(tmp.name);
-      tmp.master = ckt->defComponentStor[cmPtr->second].name();
-      tmp.x = module->pmin.x;
-      tmp.y = module->pmin.y;
+      if( is_bookshelf_arrays ) {
+        tmp.master = bs_master_stor[i];
+      }
+      else {
+        auto cmPtr = ckt->defComponentMap.find(tmp.name);
+        tmp.master = ckt->defComponentStor[cmPtr->second].name();
+      }
       instance_list.push_back(tmp);
     }
+    // sized once: get_x_data() / get_y_data() views never move
+    instance_x.resize(moduleCNT);
+    instance_y.resize(moduleCNT);
   }
-  else {
-    for(int i=0; i<moduleCNT; i++) {
-      MODULE* module = &moduleInstance[i];
-      instance_list[i].x = module->pmin.x;
-      instance_list[i].y = module->pmin.y;
-    }
+  for(int i=0; i<moduleCNT; i++) {
+    MODULE* module = &moduleInstance[i];
+    instance_x[i] = module->pmin.x;
+    instance_y[i] = module->pmin.y;
   }
 }
 
@@ -4,14 +4,15 @@
 // No hope to isolate right now...
 #include "replace_private.h"
 #include "lefdefIO.h"
+#include "bookShelfIO.h"
 
 
 // SWIG refuse to be inside replace_external...
+// coordinates are kept apart in instance_x / instance_y,
+// so that all of them can be handed out at once.
 struct instance_info {
   std::string name;
   std::string master;
-  float x;
-  float y;
 };
 
 
@@ -58,6 +59,41 @@ public:
   void set_net_weight_scale(double net_weight_scale);
 
   void set_routability_driven(bool mode);
+
+  // Bookshelf data handed over in memory instead of LEF/DEF files.
+  // Nodes come in one order; pin_node indexes into it.
+  void set_design_name(const char* name);
+  void import_bookshelf_nodes(const std::vector<std::string>& names,
+      const std::vector<double>& widths, 
+      const std::vector<double>& heights,
+      const std::vector<int>& types);
+  void import_bookshelf_masters(const std::vector<std::string>& masters);
+  void import_bookshelf_placement(const std::vector<double>& x,
+      const std::vector<double>& y);
+  void import_bookshelf_nets(const std::vector<std::string>& names,
+      const std::vector<int>& net_ptr,
+      const std::vector<int>& pin_node,
+      const std::vector<int>& pin_io,
+      const std::vector<double>& pin_x,
+      const std::vector<double>& pin_y);
+  void import_bookshelf_rows(const std::vector<double>& row_y,
+      const std::vector<double>& row_x,
+      const std::vector<int>& num_sites,
+      double row_height, double site_width, double site_spacing);
+
+  // The same from raw arrays, read in place; the Python module passes
+  // NumPy arrays this way. Node arrays have names.size() entries, net_ptr
+  // names.size()+1 and the pin arrays net_ptr[names.size()].
+  void import_bookshelf_nodes(const std::vector<std::string>& names,
+      const double* widths, const double* heights, const int64_t* types);
+  void import_bookshelf_placement(const double* x, const double* y,
+      size_t count);
+  void import_bookshelf_nets(const std::vector<std::string>& names,
+      const int64_t* net_ptr, const int64_t* pin_node, const int64_t* pin_io,
+      const double* pin_x, const double* pin_y);
+  void import_bookshelf_rows(const double* row_y, const double* row_x,
+      const int64_t* num_sites, size_t count,
+      double row_height, double site_width, double site_spacing);
   
   bool init_replace();
   bool place_cell_init_place();
@@ -70,6 +106,17 @@ public:
   float get_y(size_t idx);
   void print_instances();
 
+  // bulk getters: every instance in one call, in index order
+  std::vector<std::string> get_instance_names();
+  std::vector<std::string> get_master_names();
+  std::vector<float> get_x_list();
+  std::vector<float> get_y_list();
+
+  // contiguous coordinates without a copy (get_instance_list_size() each).
+  // They stay valid while this object lives and follow every placement step.
+  const float* get_x_data();
+  const float* get_y_data();
+
   float get_hpwl();
   float get_wns();
   float get_tns(); 
@@ -86,9 +133,17 @@ public:
 
 private:
   std::vector<instance_info> instance_list;
+  std::vector<float> instance_x;
+  std::vector<float> instance_y;
   void update_instance_list();
+  bool init_replace_bookshelf_arrays();
 
   Replace::Circuit* ckt;
+  BookshelfArrays bs_arrays;
+  // master names of the movable nodes, in moduleInstance order
+  std::vector<std::string> bs_master_stor;
+  std::string design_name;
+  bool is_bookshelf_arrays;
 
   std::vector<std::string> lef_stor;
   std::vector<std::string> def_stor;
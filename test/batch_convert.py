@@ -0,0 +1,369 @@
+"""Convert many Bookshelf designs into LEF/DEF concurrently
+
+Each design is converted by from_bookshelf_to_lefdef.convert in a worker
+process of its own. Jobs are started largest first, as long as their peak
+memory, estimated from the sizes of their input files, fits the memory
+budget next to the jobs already running; a design above the budget runs
+alone. A job whose worker dies, e.g. killed for running out of memory, is
+retried once alone.
+
+    python batch_convert.py ispd2005/ --jobs 4 --mem-limit 16
+
+The output of every design goes to *_lefdef.convert.log next to its *.aux; a
+single report of all designs is printed at the end and saved as JSON.
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path, PurePath
+
+from bookshelf_class import BookshelfPaths
+from bookshelf_stream import COMPRESSED_SUFFIXES, estimated_text_size, local_path_of
+from from_bookshelf_to_lefdef import convert
+from stage_trace import StageTracer, peak_rss_mb
+
+MB = 1 << 20
+# peak RSS of convert: about 14 bytes per byte of *.nodes, *.pl, *.nets and
+# *.scl on top of the interpreter and its imports (synthetic designs, 50k to
+# 200k pins)
+BASE_MEM_MB = 60.0
+MEM_PER_INPUT_BYTE = 14.0
+# part of the available memory the jobs may take together
+MEM_BUDGET_RATIO = 0.8
+REPORT_FILE = "batch_convert_report.json"
+
+
+def available_memory_mb() -> float | None:
+    """MemAvailable of /proc/meminfo; None where there is none"""
+    try:
+        with open("/proc/meminfo") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def is_aux_name(name: str) -> bool:
+    for suffix in COMPRESSED_SUFFIXES:
+        name = name.removesuffix(suffix)
+    return name.endswith(".aux")
+
+
+def find_aux_files(paths: list[str]) -> list[PurePath]:
+    """*.aux files given directly or found anywhere under given directories
+
+    Compressed *.aux files are found too; one in a tar archive must be given
+    by its path through the archive (see bookshelf_stream).
+    """
+    aux_paths: list[PurePath] = []
+    for path_str in paths:
+        path = Path(path_str)
+        if path.is_dir():
+            aux_paths.extend(
+                sorted(found for found in path.rglob("*") if is_aux_name(found.name))
+            )
+        elif is_aux_name(path.name):
+            aux_paths.append(path)
+        else:
+            raise ValueError(f"{path_str} is neither a directory nor a *.aux file\n")
+    # the same design once, even if listed twice
+    return list(dict.fromkeys(PurePath(os.path.abspath(path)) for path in aux_paths))
+
+
+def input_bytes(aux_path: PurePath) -> int:
+    """uncompressed size of the inputs; estimated for compressed ones"""
+    paths = BookshelfPaths(aux_path)
+    return sum(
+        estimated_text_size(path)
+        for path in (paths.nodes, paths.pl, paths.nets, paths.scl)
+    )
+
+
+class Job:
+    def __init__(self, aux_path: PurePath, base_mem_mb: float, mem_per_byte: float):
+        self.aux_path = aux_path
+        self.input_mb = input_bytes(aux_path) / MB
+        self.est_mem_mb = base_mem_mb + mem_per_byte * self.input_mb
+        self.attempts = 0
+        # set once a worker died under it: retried with nothing else running
+        self.run_alone = False
+        self.result: dict | None = None
+
+    @property
+    def name(self) -> str:
+        return local_path_of(self.aux_path).stem
+
+
+def log_path_of(aux_path: PurePath) -> PurePath:
+    aux_path = local_path_of(aux_path)
+    return PurePath(aux_path.parent, aux_path.stem + "_lefdef.convert.log")
+
+
+def convert_job(aux_path: PurePath, options: dict) -> dict:
+    """runs in a worker process: converts one design, its output to a log file
+
+    Returns:
+        dict: status, error, wall and CPU seconds, peak RSS in MB and the wall
+            seconds of every top-level stage of the conversion
+    """
+    tracer = StageTracer(count_objects=False)
+    error = None
+    with open(log_path_of(aux_path), "w") as log:
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            tracer.start()
+            try:
+                convert(aux_path, **options)
+            except Exception as err:
+                error = f"{type(err).__name__}: {err}"
+            finally:
+                tracer.stop()
+    stages: dict[str, float] = {}
+    for record in tracer.records:
+        if record.depth == 0:
+            stages[record.name] = stages.get(record.name, 0.0) + record.wall_seconds
+    return {
+        "status": "ok" if error is None else "failed",
+        "error": error,
+        "wall_seconds": tracer.wall_seconds,
+        "cpu_seconds": tracer.cpu_seconds,
+        # one design per worker process, so this is the peak of the design
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages,
+    }
+
+
+def new_executor(num_workers: int) -> ProcessPoolExecutor:
+    # a fresh process per design: its peak RSS is its own and freed afterwards
+    return ProcessPoolExecutor(max_workers=num_workers, max_tasks_per_child=1)
+
+
+def run_batch(
+    jobs: list[Job], options: dict, num_workers: int, mem_budget_mb: float
+) -> float:
+    """converts every job; returns the wall seconds of the whole batch"""
+    pending = sorted(jobs, key=lambda job: job.est_mem_mb, reverse=True)
+    running: dict[Future, Job] = {}
+    start = time.perf_counter()
+    executor = new_executor(num_workers)
+    try:
+        while pending or running:
+            reserved = sum(job.est_mem_mb for job in running.values())
+            for job in list(pending):
+                if len(running) >= num_workers:
+                    break
+                if job.run_alone or job.est_mem_mb > mem_budget_mb:
+                    if running:
+                        # smaller jobs would keep it waiting: let the pool drain
+                        break
+                elif reserved + job.est_mem_mb > mem_budget_mb:
+                    continue
+                pending.remove(job)
+                job.attempts += 1
+                running[executor.submit(convert_job, job.aux_path, options)] = job
+                reserved += job.est_mem_mb
+                print(
+                    f"start {job.name}: ~{job.est_mem_mb:.0f} MB,"
+                    f" {reserved:.0f}/{mem_budget_mb:.0f} MB reserved"
+                )
+                if job.run_alone or job.est_mem_mb > mem_budget_mb:
+                    break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            crashed: list[Job] = []
+            for future in done:
+                job = running.pop(future)
+                try:
+                    job.result = future.result()
+                except BrokenProcessPool:
+                    crashed.append(job)
+                except Exception as err:
+                    # raised outside the conversion, e.g. the log could not be opened
+                    error = f"{type(err).__name__}: {err}"
+                    job.result = {"status": "failed", "error": error}
+                    print(f"failed {job.name}")
+                else:
+                    print(f"{job.result['status']} {job.name}")
+            if not crashed:
+                continue
+            # the other running jobs went down with the pool
+            crashed.extend(running.values())
+            running = {}
+            executor.shutdown(cancel_futures=True)
+            executor = new_executor(num_workers)
+            for job in crashed:
+                job.result = {"status": "crashed", "error": "worker process died"}
+                print(f"crashed {job.name}")
+                if job.attempts < 2:
+                    job.run_alone = True
+                    pending.append(job)
+    finally:
+        executor.shutdown(cancel_futures=True)
+    return time.perf_counter() - start
+
+
+def print_report(jobs: list[Job], batch_seconds: float, mem_budget_mb: float):
+    stage_names: list[str] = []
+    for job in jobs:
+        for name in (job.result or {}).get("stages", {}):
+            if name not in stage_names:
+                stage_names.append(name)
+    header = f"{'design':<16} {'status':<8} {'input MB':>9} {'est MB':>8}"
+    header += f" {'peak MB':>8} {'wall s':>8} {'CPU s':>8}"
+    header += "".join(f" {name[:14]:>14}" for name in stage_names)
+    print(header)
+    total_wall = 0.0
+    for job in jobs:
+        result = job.result or {"status": "skipped"}
+        total_wall += result.get("wall_seconds") or 0.0
+        cells = [
+            result.get(key) for key in ("peak_rss_mb", "wall_seconds", "cpu_seconds")
+        ]
+        line = f"{job.name:<16} {result['status']:<8} {job.input_mb:>9.1f}"
+        line += f" {job.est_mem_mb:>8.0f}"
+        line += "".join(f" {'-' if cell is None else f'{cell:.1f}':>8}" for cell in cells)
+        stages = result.get("stages", {})
+        for name in stage_names:
+            seconds = stages.get(name)
+            line += f" {'-' if seconds is None else f'{seconds:.2f}':>14}"
+        print(line)
+        if result.get("error"):
+            print(f"    {result['error']} (see {log_path_of(job.aux_path)})")
+    num_ok = sum(job.result is not None and job.result["status"] == "ok" for job in jobs)
+    print(
+        f"{num_ok}/{len(jobs)} designs converted in {batch_seconds:.1f}s"
+        f" ({total_wall:.1f}s of conversions), memory budget {mem_budget_mb:.0f} MB"
+    )
+
+
+def write_report(
+    jobs: list[Job], batch_seconds: float, mem_budget_mb: float, report_path: PurePath
+):
+    report = {
+        "batch_seconds": batch_seconds,
+        "mem_budget_mb": mem_budget_mb,
+        "designs": [
+            {
+                "aux": str(job.aux_path),
+                "input_mb": job.input_mb,
+                "est_mem_mb": job.est_mem_mb,
+                "attempts": job.attempts,
+                **(job.result or {"status": "skipped"}),
+            }
+            for job in jobs
+        ],
+    }
+    with open(report_path, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Report written to {report_path}")
+
+
+def main(
+    paths: list[str],
+    num_workers: int | None = None,
+    mem_limit_gb: float | None = None,
+    base_mem_mb: float = BASE_MEM_MB,
+    mem_per_byte: float = MEM_PER_INPUT_BYTE,
+    report_path_str: str = REPORT_FILE,
+    options: dict | None = None,
+) -> bool:
+    """converts every design of paths; True when all of them succeeded"""
+    jobs = [Job(aux, base_mem_mb, mem_per_byte) for aux in find_aux_files(paths)]
+    if not jobs:
+        print("No *.aux files found")
+        return False
+    if mem_limit_gb is not None:
+        mem_budget_mb = mem_limit_gb * 1024
+    else:
+        available_mb = available_memory_mb()
+        mem_budget_mb = (
+            available_mb * MEM_BUDGET_RATIO
+            if available_mb is not None
+            else max(job.est_mem_mb for job in jobs)
+        )
+    num_workers = min(num_workers or os.cpu_count() or 1, len(jobs))
+    print(
+        f"Converting {len(jobs)} designs, up to {num_workers} at a time"
+        f" within {mem_budget_mb:.0f} MB"
+    )
+
+    batch_seconds = run_batch(jobs, options or {}, num_workers, mem_budget_mb)
+    print_report(jobs, batch_seconds, mem_budget_mb)
+    write_report(jobs, batch_seconds, mem_budget_mb, PurePath(report_path_str))
+    return all(job.result is not None and job.result["status"] == "ok" for job in jobs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert Bookshelf designs into LEF/DEF in a process pool"
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="*.aux files, or directories searched for them"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="concurrent designs (default: CPUs)"
+    )
+    parser.add_argument(
+        "--mem-limit",
+        type=float,
+        default=None,
+        help="GB the running designs may take together"
+        f" (default: {MEM_BUDGET_RATIO:.0%} of the available memory)",
+    )
+    parser.add_argument(
+        "--base-mem",
+        type=float,
+        default=BASE_MEM_MB,
+        help="estimated MB of a design besides its input (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--mem-per-byte",
+        type=float,
+        default=MEM_PER_INPUT_BYTE,
+        help="estimated bytes of memory per input byte (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--report", default=REPORT_FILE, help="JSON report (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="keep nodes in NumPy arrays (less memory on large designs)",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="write gzip-compressed *.lef.gz and *.def.gz",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always parse the text files; do not read or write *.bookshelf_cache",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="if only *.pl changed since the last full conversion, rewrite just"
+        " the DEF COMPONENTS",
+    )
+    args = parser.parse_args()
+    passed = main(
+        args.paths,
+        args.jobs,
+        args.mem_limit,
+        args.base_mem,
+        args.mem_per_byte,
+        args.report,
+        {
+            "columnar": args.columnar,
+            "gzip_output": args.gzip,
+            "use_cache": not args.no_cache,
+            "incremental": args.incremental,
+        },
+    )
+    raise SystemExit(0 if passed else 1)
@@ -0,0 +1,413 @@
+"""Benchmark of the Bookshelf -> LEF/DEF converter on synthetic designs
+
+Each design size (in pins) is generated by bookshelf_synth and converted stage
+by stage. Every stage is timed, and unless --no-memory is given, run once more
+under tracemalloc for its peak memory. One JSON record per design is appended
+to the history file, so that throughput can be followed over time:
+
+    python bookshelf_bench.py --pins 10k 100k 1M
+    python bookshelf_bench.py --report
+"""
+import argparse
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import PurePath
+from typing import Callable
+
+import numpy as np
+
+from bookshelf_class import (
+    DEFAULT_ROW_HEIGHT,
+    DEFAULT_SITE_SPACING,
+    BookshelfPaths,
+    read_net_input,
+    read_node_input,
+    read_placement_input,
+    read_row_input,
+)
+from bookshelf_synth import (
+    DEFAULT_MACRO_RATIO,
+    DEFAULT_TERMINAL_RATIO,
+    DEFAULT_UTILIZATION,
+    SyntheticDesign,
+    parse_count,
+    parse_degree_weights,
+    write_bookshelf,
+)
+from from_bookshelf_to_lefdef import write_to_lefdef
+from macro_component_maker import (
+    PhysDesignData,
+    make_macros_and_components_from_bookshelf,
+)
+
+DEFAULT_PINS = ("10k", "100k", "1M")
+HISTORY_PATH = "bookshelf_bench_history.jsonl"
+STAGES = (
+    "read_row_input",
+    "read_node_input",
+    "read_placement_input",
+    "read_net_input",
+    "make_macros_and_components_from_bookshelf",
+    "write_to_lefdef",
+)
+MB = 1 << 20
+
+
+class StageResult:
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.seconds: float | None = None
+        self.cpu_seconds: float | None = None
+        # tracemalloc peak above the memory held when the stage started
+        self.peak_mb: float | None = None
+        # memory still held when the stage returned, i.e. its result
+        self.retained_mb: float | None = None
+
+    def to_dict(self, num_pins: int) -> dict:
+        return {
+            "seconds": self.seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "pins_per_second": num_pins / self.seconds if self.seconds else None,
+            "peak_mb": self.peak_mb,
+            "retained_mb": self.retained_mb,
+        }
+
+
+def run_stages(
+    aux_path: PurePath,
+    columnar: bool,
+    measure: Callable[[str, Callable], object],
+):
+    """converts aux_path stage by stage; `measure(stage, func)` runs every stage"""
+    paths = BookshelfPaths(aux_path)
+    region = measure(
+        "read_row_input",
+        lambda: read_row_input(paths.scl, DEFAULT_ROW_HEIGHT, DEFAULT_SITE_SPACING),
+    )
+    object_db = measure("read_node_input", lambda: read_node_input(paths.nodes, columnar))
+    measure("read_placement_input", lambda: read_placement_input(paths.pl, object_db))
+    nets = measure("read_net_input", lambda: read_net_input(paths.nets))
+    macros, components = measure(
+        "make_macros_and_components_from_bookshelf",
+        lambda: make_macros_and_components_from_bookshelf(object_db, nets),
+    )
+    pd_data = PhysDesignData(paths, columnar)
+    pd_data.region = region
+    pd_data.object_db = pd_data.placement = object_db
+    pd_data.nets = nets
+    pd_data.macros = macros
+    pd_data.components = components
+    measure("write_to_lefdef", lambda: write_to_lefdef(pd_data, aux_path))
+
+
+def time_stages(aux_path: PurePath, columnar: bool, results: dict[str, StageResult]):
+    def measure(stage: str, func: Callable):
+        start, cpu_start = time.perf_counter(), time.process_time()
+        value = func()
+        seconds = time.perf_counter() - start
+        result = results[stage]
+        # the best of the repeats
+        if result.seconds is None or seconds < result.seconds:
+            result.seconds = seconds
+            result.cpu_seconds = time.process_time() - cpu_start
+        return value
+
+    run_stages(aux_path, columnar, measure)
+
+
+def trace_stages(aux_path: PurePath, columnar: bool, results: dict[str, StageResult]):
+    def measure(stage: str, func: Callable):
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        value = func()
+        current, peak = tracemalloc.get_traced_memory()
+        results[stage].peak_mb = (peak - start) / MB
+        results[stage].retained_mb = (current - start) / MB
+        return value
+
+    tracemalloc.start()
+    try:
+        run_stages(aux_path, columnar, measure)
+    finally:
+        tracemalloc.stop()
+
+
+def git_commit() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def design_name(params: dict) -> str:
+    """names a design by its generator parameters, so a kept one can be reused"""
+    digest = hashlib.blake2b(
+        json.dumps(params, sort_keys=True).encode(), digest_size=4
+    ).hexdigest()
+    return f"synth_{params['pins']}_{digest}"
+
+
+def bench_design(
+    params: dict,
+    design_dir: PurePath,
+    columnar: bool,
+    repeat: int,
+    memory: bool,
+    quiet: bool,
+) -> dict:
+    """generates (or reuses) one design and benchmarks every stage on it
+
+    Returns:
+        dict: the history record
+    """
+    name = design_name(params)
+    aux_path = PurePath(design_dir, f"{name}.aux")
+    generate_seconds = None
+    if not os.path.exists(aux_path):
+        start = time.perf_counter()
+        design = SyntheticDesign(
+            params["pins"],
+            params["degrees"],
+            params["macro_ratio"],
+            params["terminal_ratio"],
+            params["utilization"],
+            params["rows"],
+            params["seed"],
+        )
+        write_bookshelf(design, design_dir, name)
+        generate_seconds = time.perf_counter() - start
+        del design
+
+    results = {stage: StageResult(stage) for stage in STAGES}
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        for _ in range(repeat):
+            time_stages(aux_path, columnar, results)
+        if memory:
+            trace_stages(aux_path, columnar, results)
+
+    num_pins = count_pins(aux_path)
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "cpus": os.cpu_count(),
+        "params": params,
+        "columnar": columnar,
+        "repeat": repeat,
+        "num_pins": num_pins,
+        "input_mb": sum(
+            os.path.getsize(path)
+            for path in vars(BookshelfPaths(aux_path)).values()
+        )
+        / MB,
+        "generate_seconds": generate_seconds,
+        "stages": {
+            stage: result.to_dict(num_pins) for stage, result in results.items()
+        },
+    }
+
+
+def count_pins(aux_path: PurePath) -> int:
+    """NumPins of the *.nets header"""
+    with open(BookshelfPaths(aux_path).nets) as file:
+        for line in file:
+            words = line.split()
+            if words and words[0] == "NumPins":
+                return int(words[2])
+    raise ValueError(f"NumPins not found in the nets of {aux_path}")
+
+
+def append_history(history_path: PurePath, record: dict):
+    with open(history_path, "a") as file:
+        file.write(json.dumps(record) + "\n")
+
+
+def read_history(history_path: PurePath) -> list[dict]:
+    if not os.path.exists(history_path):
+        return []
+    with open(history_path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def print_record(record: dict):
+    print(
+        f"{record['num_pins']} pins ({record['input_mb']:.1f} MB of input),"
+        f" commit {record['commit']}"
+    )
+    print(f"\t{'stage':<44} {'seconds':>9} {'Mpins/s':>9} {'peak MB':>9}")
+    for stage, result in record["stages"].items():
+        throughput = result["pins_per_second"]
+        throughput_str = "-" if throughput is None else f"{throughput / 1e6:.3f}"
+        peak = result["peak_mb"]
+        peak_str = "-" if peak is None else f"{peak:.1f}"
+        print(
+            f"\t{stage:<44} {result['seconds']:>9.3f} {throughput_str:>9}"
+            f" {peak_str:>9}"
+        )
+
+
+def print_report(history: list[dict]):
+    """throughput per stage of the last run of every design, against the run before
+
+    Runs compare when their design parameters and columnar flag are equal.
+    """
+    runs: dict[str, list[dict]] = {}
+    for record in history:
+        key = json.dumps([record["params"], record["columnar"]], sort_keys=True)
+        runs.setdefault(key, []).append(record)
+    if not runs:
+        print("No benchmark history")
+        return
+    for key in sorted(runs, key=lambda key: runs[key][-1]["num_pins"]):
+        last = runs[key][-1]
+        previous = runs[key][-2] if len(runs[key]) > 1 else None
+        print(
+            f"{last['num_pins']} pins, columnar={last['columnar']}:"
+            f" {len(runs[key])} runs, last {last['timestamp']} ({last['commit']})"
+        )
+        for stage, result in last["stages"].items():
+            throughput = result["pins_per_second"]
+            line = f"\t{stage:<44} {throughput / 1e6:>9.3f} Mpins/s"
+            if previous and stage in previous["stages"]:
+                before = previous["stages"][stage]["pins_per_second"]
+                if before:
+                    line += f" ({throughput / before - 1:+.1%} vs {previous['commit']})"
+            print(line)
+    print_scaling([records[-1] for records in runs.values()])
+
+
+def print_scaling(records: list[dict]):
+    """the exponent b of seconds ~ pins^b per stage, fitted over the design sizes
+
+    1 is linear scaling; only the last run of every design is used.
+    """
+    for columnar in (False, True):
+        sizes = [record for record in records if record["columnar"] == columnar]
+        if len({record["num_pins"] for record in sizes}) < 2:
+            continue
+        print(f"Scaling over {len(sizes)} designs, columnar={columnar}:")
+        log_pins = np.log([record["num_pins"] for record in sizes])
+        for stage in STAGES:
+            seconds = [record["stages"][stage]["seconds"] for record in sizes]
+            if not all(seconds):
+                continue
+            exponent = np.polyfit(log_pins, np.log(seconds), 1)[0]
+            print(f"\t{stage:<44} pins^{exponent:.2f}")
+
+
+def main(
+    pins_strs: list[str],
+    degree_weights: dict[int, float] | None,
+    macro_ratio: float,
+    terminal_ratio: float,
+    utilization: float,
+    num_rows: int | None,
+    seed: int,
+    columnar: bool,
+    repeat: int,
+    memory: bool,
+    design_dir_str: str | None,
+    history_path_str: str,
+    quiet: bool = True,
+):
+    with contextlib.ExitStack() as stack:
+        if design_dir_str:
+            design_dir = PurePath(design_dir_str)
+            os.makedirs(design_dir, exist_ok=True)
+        else:
+            design_dir = PurePath(stack.enter_context(tempfile.TemporaryDirectory()))
+        for pins_str in pins_strs:
+            params = {
+                "pins": parse_count(pins_str),
+                "degrees": degree_weights,
+                "macro_ratio": macro_ratio,
+                "terminal_ratio": terminal_ratio,
+                "utilization": utilization,
+                "rows": num_rows,
+                "seed": seed,
+            }
+            record = bench_design(params, design_dir, columnar, repeat, memory, quiet)
+            append_history(PurePath(history_path_str), record)
+            print_record(record)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Bookshelf -> LEF/DEF converter stage by stage"
+    )
+    parser.add_argument(
+        "--pins",
+        nargs="+",
+        default=list(DEFAULT_PINS),
+        help="design sizes, e.g. 10k 100k 1M 10M (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--degrees",
+        default=None,
+        help="net degree weights, e.g. 2:60,3:15,4:8,16:2 (default: ISPD-like)",
+    )
+    parser.add_argument("--macro-ratio", type=float, default=DEFAULT_MACRO_RATIO)
+    parser.add_argument("--terminal-ratio", type=float, default=DEFAULT_TERMINAL_RATIO)
+    parser.add_argument("--utilization", type=float, default=DEFAULT_UTILIZATION)
+    parser.add_argument("--rows", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--columnar", action="store_true", help="read nodes into an ArrayObjectDB"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="timed runs per design; the best counts"
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the tracemalloc run"
+    )
+    parser.add_argument(
+        "--design-dir",
+        default=None,
+        help="keep the designs here and reuse them (default: a temporary directory)",
+    )
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON Lines file")
+    parser.add_argument(
+        "--report", action="store_true", help="print the history instead of running"
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="show the output of the stages"
+    )
+    args = parser.parse_args()
+    if args.report:
+        print_report(read_history(PurePath(args.history)))
+    else:
+        main(
+            args.pins,
+            parse_degree_weights(args.degrees) if args.degrees else None,
+            args.macro_ratio,
+            args.terminal_ratio,
+            args.utilization,
+            args.rows,
+            args.seed,
+            args.columnar,
+            args.repeat,
+            not args.no_memory,
+            args.design_dir,
+            args.history,
+            not args.verbose,
+        )
@@ -0,0 +1,283 @@
+"""Persistent binary cache of parsed Bookshelf inputs
+
+A cache file holds the Region, ObjectDB and Nets of one design as raw arrays
+(see bookshelf_parallel.write_arrays) behind a JSON header:
+
+    MAGIC | header length (8 bytes, little endian) | JSON header | arrays
+
+The header records the size, mtime and content hash of every input file. An
+entry whose sizes differ, or whose mtimes differ and whose content hashes do
+not match either, is stale: it is removed and rebuilt on the next read. When
+only the mtimes differ, the header takes the new mtimes so that later reads
+do not hash the files again.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import PurePath
+from typing import BinaryIO
+
+from bookshelf_class import (
+    ArrayObjectDB,
+    BookshelfPaths,
+    Nets,
+    ObjectDB,
+    Region,
+)
+from bookshelf_parallel import map_arrays, write_arrays
+from bookshelf_stream import local_path_of, on_disk_path
+
+MAGIC = b"BSCACHE\0"
+# bump whenever the cached arrays change meaning
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".bookshelf_cache"
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def cache_path_of(aux_path: PurePath) -> PurePath:
+    """<design>.aux -> <design>.bookshelf_cache in the same directory
+
+    For a compressed or archived *.aux, see bookshelf_stream.local_path_of.
+    """
+    return local_path_of(aux_path).with_suffix(CACHE_SUFFIX)
+
+
+def file_digest(path: PurePath) -> str:
+    """BLAKE2b hex digest of the file content, as stored on disk
+
+    A member of an archive is represented by the whole archive.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(on_disk_path(path), "rb") as file:
+        while block := file.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_stamps(
+    paths: BookshelfPaths, with_digest: bool, known: list[dict] | None = None
+) -> list[dict]:
+    """size, mtime and (optionally) content hash of every input file
+
+    Args:
+        known (list[dict] | None, optional): earlier stamps, e.g. those of
+            cached_stamps; their hashes are reused for files whose size and
+            mtime did not change. Defaults to None.
+    """
+    known_stamps = {stamp["path"]: stamp for stamp in known or []}
+    stamps: list[dict] = []
+    for path in (paths.aux, paths.scl, paths.nodes, paths.pl, paths.nets):
+        stat = os.stat(on_disk_path(path))
+        stamp = {
+            "path": str(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        if with_digest:
+            old = known_stamps.get(stamp["path"], {})
+            if (
+                "digest" in old
+                and old["size"] == stamp["size"]
+                and old["mtime_ns"] == stamp["mtime_ns"]
+            ):
+                stamp["digest"] = old["digest"]
+            else:
+                stamp["digest"] = file_digest(path)
+        stamps.append(stamp)
+    return stamps
+
+
+def cached_stamps(aux_path: PurePath) -> list[dict]:
+    """source stamps in the header of the cache of aux_path, [] without one"""
+    try:
+        with open(cache_path_of(aux_path), "rb") as file:
+            return read_header(file)["sources"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def is_fresh(header: dict, paths: BookshelfPaths, params: list[int]) -> bool:
+    """tells whether a cache header still describes the input files
+
+    Sizes and mtimes are compared first; content hashes are computed only
+    for files whose mtime changed, e.g. after a copy or a touch. The cached
+    mtime of a file whose content still matches is updated in header.
+    """
+    if header.get("version") != CACHE_VERSION or header.get("params") != params:
+        return False
+    stamps = source_stamps(paths, with_digest=False)
+    cached_stamps = header["sources"]
+    if len(stamps) != len(cached_stamps):
+        return False
+    for stamp, cached in zip(stamps, cached_stamps):
+        if stamp["path"] != cached["path"] or stamp["size"] != cached["size"]:
+            return False
+        if stamp["mtime_ns"] != cached["mtime_ns"]:
+            if file_digest(PurePath(stamp["path"])) != cached["digest"]:
+                return False
+            cached["mtime_ns"] = stamp["mtime_ns"]
+    return True
+
+
+def read_header(file: BinaryIO) -> dict:
+    """
+    Raises:
+        ValueError: When the file is not a cache file
+    """
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{file.name} is not a Bookshelf cache file")
+    header_len = int.from_bytes(file.read(8), "little")
+    return json.loads(file.read(header_len))
+
+
+def write_header(file: BinaryIO, header: dict, reserved: int):
+    """writes header into the `reserved` bytes after MAGIC and its length
+
+    Raises:
+        ValueError: When the header does not fit
+    """
+    header_bytes = json.dumps(header).encode()
+    if len(header_bytes) > reserved:
+        raise ValueError("cache header does not fit in its reserved space")
+    file.seek(len(MAGIC) + 8)
+    file.write(header_bytes.ljust(reserved))
+
+
+def refresh_header(cache_path: PurePath, header: dict):
+    """rewrites the header of a cache file in place, if it still fits
+
+    A cache that cannot be updated, e.g. a read-only shared one, is left as
+    it is; it only costs the hashing again on the next read.
+    """
+    try:
+        with open(cache_path, "r+b") as file:
+            read_header(file)
+            file.seek(len(MAGIC))
+            write_header(file, header, int.from_bytes(file.read(8), "little"))
+    except (OSError, ValueError):
+        pass
+
+
+def current_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def load_cache(
+    aux_path: PurePath, params: list[int]
+) -> tuple[Region, ArrayObjectDB, Nets] | None:
+    """loads the cached design of aux_path
+
+    The arrays are mapped copy-on-write: nothing is read until used, and
+    changes made to the loaded design never reach the cache file.
+
+    Args:
+        aux_path (PurePath): path to *.aux file
+        params (list[int]): parse parameters the cache must have been built with,
+            i.e. [default_row_height, default_site_spacing]
+
+    Returns:
+        tuple[Region, ArrayObjectDB, Nets] | None: None when there is no
+            usable cache; a stale or unreadable one is removed
+    """
+    cache_path = cache_path_of(aux_path)
+    try:
+        with open(cache_path, "rb") as file:
+            header = read_header(file)
+        paths = BookshelfPaths(aux_path)
+        cached_mtimes = [cached["mtime_ns"] for cached in header["sources"]]
+        if not is_fresh(header, paths, params):
+            print(f"Bookshelf cache {cache_path} is stale; removing it.")
+            os.unlink(cache_path)
+            return None
+        if [cached["mtime_ns"] for cached in header["sources"]] != cached_mtimes:
+            refresh_header(cache_path, header)
+        arrays = map_arrays(str(cache_path), header["layout"], mode="c")
+    except FileNotFoundError:
+        return None
+    except PermissionError as err:
+        # someone else's cache: neither use nor remove it
+        print(Warning(f"Ignoring inaccessible Bookshelf cache {cache_path}: {err}"))
+        return None
+    except (OSError, ValueError, KeyError) as err:
+        print(Warning(f"Ignoring unreadable Bookshelf cache {cache_path}: {err}"))
+        try:
+            os.unlink(cache_path)
+        except OSError:
+            pass
+        return None
+
+    # the layout keys are "<part>.<column>"
+    parts: dict[str, dict] = {"region": {}, "nodes": {}, "nets": {}}
+    for key, array in arrays.items():
+        part, column = key.split(".", 1)
+        parts[part][column] = array
+    region = Region.from_arrays(parts["region"])
+    object_db = ArrayObjectDB.from_arrays(parts["nodes"])
+    nets = Nets.from_arrays(parts["nets"])
+    print(f"Bookshelf cache {cache_path} is loaded.")
+    return region, object_db, nets
+
+
+def save_cache(
+    aux_path: PurePath,
+    params: list[int],
+    region: Region,
+    object_db: ObjectDB | ArrayObjectDB,
+    nets: Nets,
+    sources: list[dict] | None = None,
+):
+    """writes the parsed design of aux_path next to it, see cache_path_of
+
+    The file is written under a temporary name and renamed into place, so a
+    reader never sees a half-written cache. Failing to write is not an error.
+
+    Args:
+        sources (list[dict] | None, optional): source_stamps of the input
+            files with digests, when the caller has them already.
+            Defaults to None.
+    """
+    cache_path = cache_path_of(aux_path)
+    arrays = {}
+    for part, part_arrays in (
+        ("region", region.to_arrays()),
+        ("nodes", object_db.to_arrays()),
+        ("nets", nets.to_arrays()),
+    ):
+        for column, array in part_arrays.items():
+            arrays[f"{part}.{column}"] = array
+
+    tmp_path = None
+    try:
+        header = {
+            "version": CACHE_VERSION,
+            "params": params,
+            "sources": sources
+            or source_stamps(BookshelfPaths(aux_path), with_digest=True),
+        }
+        # the layout depends on where the arrays start, i.e. on the header size:
+        # reserve room for the header first and fill it in last
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=cache_path.name, suffix=".tmp", dir=cache_path.parent
+        )
+        with os.fdopen(fd, "wb") as file:
+            header["layout"] = [(key, "", 0, 0) for key in arrays]
+            reserved = len(json.dumps(header)) + 64 * len(arrays)
+            file.write(MAGIC)
+            file.write(reserved.to_bytes(8, "little"))
+            file.seek(reserved, os.SEEK_CUR)
+            header["layout"] = write_arrays(file, arrays)
+            write_header(file, header, reserved)
+        # mkstemp creates the file for its owner only; give it the mode of
+        # any other new file
+        os.chmod(tmp_path, 0o666 & ~current_umask())
+        os.replace(tmp_path, cache_path)
+        tmp_path = None
+        print(f"Bookshelf cache {cache_path} is written.")
+    except (OSError, ValueError) as err:
+        print(Warning(f"Bookshelf cache {cache_path} is not written: {err}"))
+    finally:
+        if tmp_path is not None:
+            os.unlink(tmp_path)
@@ -1,6 +1,287 @@
+import gc
 import math
+import os
+import re
+from contextlib import contextmanager
+from itertools import repeat
 from pathlib import PurePath
-from typing import Iterator
+from typing import Iterator, Mapping
+
+import numpy as np
+
+from bookshelf_stream import is_plain, open_input, open_text_input, resolve_input
+
+# characters read per block by the Bookshelf tokenizer
+READ_BLOCK_SIZE = 1 << 24
+# bytes per block of the array-based *.nodes and *.pl readers
+COLUMN_BLOCK_SIZE = 1 << 18
+NEWLINE, MINUS, ZERO = ord("\n"), ord("-"), ord("0")
+# printable ASCII and the whitespace that str.split() and bytes.split() agree on
+PLAIN_BYTES = bytes(range(32, 127)) + b"\t\n\r\x0b\x0c"
+
+
+def iter_bookshelf_words(
+    path: PurePath,
+    block_size: int = READ_BLOCK_SIZE,
+    start: int = 0,
+    end: int | None = None,
+    first_line: int = 1,
+) -> Iterator[tuple[int, list[str]]]:
+    """yields (line number, words) for every meaningful line of a Bookshelf file
+
+    The file is read in large blocks that are split into lines in bulk, and
+    each line is split by whitespace exactly once. Empty lines and metadata
+    lines (`#` comments, `UCLA` headers) are skipped but still counted, so the
+    line numbers match the file.
+
+    Args:
+        path (PurePath): any Bookshelf text file, or a compressed or archived
+            one (see bookshelf_stream)
+        block_size (int, optional): bytes per read. Defaults to READ_BLOCK_SIZE.
+        start (int, optional): byte offset of the first line to read; plain
+            files only. Defaults to 0.
+        end (int | None, optional): byte offset to stop at. Defaults to end of file.
+        first_line (int, optional): line number of the line at `start`.
+            Defaults to 1.
+    """
+    line_idx = first_line - 1
+    rest = b""
+    with open_input(path) as file:
+        if start:
+            file.seek(start)
+        remaining = -1 if end is None else end - start
+        while remaining:
+            block = file.read(block_size if remaining < 0 else min(block_size, remaining))
+            if not block:
+                break
+            if remaining > 0:
+                remaining -= len(block)
+            # decode whole lines only, so no multi-byte character is cut in two
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:
+                rest += block
+                continue
+            lines = (rest + block[:cut]).decode().split("\n")
+            rest = block[cut:]
+            lines.pop()
+            for line in lines:
+                line_idx += 1
+                words = line.split()
+                if not words or words[0] == "#" or words[0] == "UCLA":
+                    continue
+                yield line_idx, words
+    words = rest.decode().split()
+    if words and words[0] != "#" and words[0] != "UCLA":
+        yield line_idx + 1, words
+
+
+def iter_line_blocks(
+    path: PurePath, block_size: int = COLUMN_BLOCK_SIZE
+) -> Iterator[tuple[int, bytes]]:
+    """yields (number of the first line, block of whole lines) of a text file"""
+    line_idx = 1
+    rest = b""
+    with open_input(path) as file:
+        while block := file.read(block_size):
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:
+                rest += block
+                continue
+            lines = rest + block[:cut]
+            rest = block[cut:]
+            yield line_idx, lines
+            line_idx += lines.count(b"\n")
+    if rest:
+        yield line_idx, rest
+
+
+class WordBlock:
+    """the words of a block of whole lines, located with array operations
+
+    Word k of the block spans data[starts[k] : ends[k]]; the words of block
+    line l are first_word[l], ... and there are num_words[l] of them. Blocks
+    that are not plain ASCII, whose whitespace str.split() might see
+    differently, have `plain` unset and are not split.
+    """
+
+    def __init__(self, block: bytes):
+        data = np.frombuffer(block, dtype=np.uint8)
+        self.data = data
+        self.newlines = np.flatnonzero(data == NEWLINE)
+        self.num_lines = len(self.newlines) + int(len(data) > 0 and data[-1] != NEWLINE)
+        self.plain = not block.translate(None, PLAIN_BYTES)
+        if not self.plain:
+            return
+        is_word = data > 32
+        edges = np.diff(is_word.view(np.int8))
+        self.starts = np.flatnonzero(edges == 1) + 1
+        self.ends = np.flatnonzero(edges == -1) + 1
+        if len(data) and is_word[0]:
+            self.starts = np.insert(self.starts, 0, 0)
+        if len(data) and is_word[-1]:
+            self.ends = np.append(self.ends, len(data))
+        # words before the end of every line
+        bounds = np.searchsorted(self.starts, self.newlines)
+        if self.num_lines > len(self.newlines):
+            bounds = np.append(bounds, len(self.starts))
+        self.num_words = np.diff(bounds, prepend=0)
+        self.first_word = bounds - self.num_words
+
+    def lines(self) -> Iterator[str]:
+        """the lines of the block as text"""
+        text = self.data.tobytes().decode()
+        lines = text.split("\n")
+        if text.endswith("\n"):
+            lines.pop()
+        return iter(lines)
+
+    def words_of(self, line: int) -> list[str]:
+        start = int(self.newlines[line - 1]) + 1 if line else 0
+        end = int(self.newlines[line]) if line < len(self.newlines) else len(self.data)
+        return self.data[start:end].tobytes().decode().split()
+
+    def word(self, lines: np.ndarray, k: int) -> np.ndarray:
+        """indices of word k of the given lines; k < 0 counts from the end"""
+        if k < 0:
+            return self.first_word[lines] + self.num_words[lines] + k
+        return self.first_word[lines] + k
+
+    def equals(self, words: np.ndarray, text: bytes) -> np.ndarray:
+        """which of the words are text"""
+        starts = self.starts[words]
+        same = self.ends[words] - starts == len(text)
+        for offset, char in enumerate(text):
+            same[same] = self.data[starts[same] + offset] == char
+        return same
+
+    def integers(self, words: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """values of the words read as decimal integers, and which of them are
+
+        Only an optional minus sign and up to 18 digits are accepted, which
+        int() reads the same; other words are left to the caller.
+        """
+        starts, ends = self.starts[words], self.ends[words]
+        negative = (self.data[starts] == MINUS) & (ends - starts > 1)
+        starts = starts + negative
+        num_digits = ends - starts
+        valid = num_digits <= 18
+        values = np.zeros(len(words), dtype=np.int64)
+        last = len(self.data) - 1
+        for offset in range(int(num_digits.max(initial=0))):
+            digit = self.data[np.minimum(starts + offset, last)].astype(np.int64) - ZERO
+            active = num_digits > offset
+            valid &= ~active | ((digit >= 0) & (digit <= 9))
+            values = np.where(active, values * 10 + digit, values)
+        return np.where(negative, -values, values), valid
+
+    def _gather(self, words: np.ndarray, extra: int) -> tuple[np.ndarray, np.ndarray]:
+        """the bytes of the words plus `extra` following bytes, back to back"""
+        starts = self.starts[words]
+        lengths = self.ends[words] - starts + extra
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        np.minimum(positions, len(self.data) - 1, out=positions)
+        return self.data[positions], lengths
+
+    def packed(self, words: np.ndarray) -> np.ndarray:
+        """the words in the layout of encode_names, each one separated"""
+        buffer, lengths = self._gather(words, 1)
+        buffer[np.cumsum(lengths) - 1] = NEWLINE
+        return buffer
+
+    def fixed_width(self, words: np.ndarray) -> np.ndarray:
+        """the words as one fixed-width np.bytes_ array"""
+        buffer, lengths = self._gather(words, 0)
+        width = max(int(lengths.max(initial=0)), 1)
+        table = np.zeros((len(words), width), dtype=np.uint8)
+        table[np.arange(width) < lengths[:, None]] = buffer
+        return table.view(f"S{width}").ravel()
+
+    def text(self, word: int) -> str:
+        return self.data[self.starts[word] : self.ends[word]].tobytes().decode()
+
+
+def count_lines(path: PurePath, end: int, block_size: int = READ_BLOCK_SIZE) -> int:
+    """returns the number of line breaks before byte offset `end`"""
+    num_lines = 0
+    with open_input(path) as file:
+        while end > 0:
+            block = file.read(min(block_size, end))
+            if not block:
+                break
+            num_lines += block.count(b"\n")
+            end -= len(block)
+    return num_lines
+
+
+@contextmanager
+def gc_paused():
+    """suspends the cyclic garbage collector while bulk-building containers
+
+    Parsers allocate millions of long-lived dicts and tuples; without this the
+    collector repeatedly rescans them although none of them can be garbage.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+# separates the names packed by encode_names
+NAME_SEPARATOR = NEWLINE
+# names decoded at once while iterating over a packed name table
+NAME_DECODE_BATCH = 1 << 16
+
+
+def encode_names(names: list[str]) -> np.ndarray:
+    """packs whitespace-free names into one uint8 array"""
+    return np.frombuffer("\n".join(names).encode(), dtype=np.uint8)
+
+
+def decode_names(buffer: np.ndarray) -> list[str]:
+    """inverse of encode_names"""
+    if len(buffer) == 0:
+        return []
+    return buffer.tobytes().decode().split("\n")
+
+
+def fixed_width_names(buffer: np.ndarray) -> np.ndarray:
+    """names packed by encode_names as one fixed-width np.bytes_ array"""
+    if len(buffer) == 0:
+        return np.zeros(0, dtype="S1")
+    ends = np.append(np.flatnonzero(buffer == NAME_SEPARATOR), len(buffer))
+    lengths = np.diff(ends, prepend=-1) - 1
+    width = max(int(lengths.max()), 1)
+    table = np.zeros((len(ends), width), dtype=np.uint8)
+    # the name bytes in order fill every row from the left
+    table[np.arange(width) < lengths[:, None]] = buffer[buffer != NAME_SEPARATOR]
+    return table.view(f"S{width}").ravel()
+
+
+# DO NOT CHANGE. All circuit row height is 12
+DEFAULT_ROW_HEIGHT = 12
+DEFAULT_SITE_SPACING = 1
+
+
+class BookshelfPaths:
+    """input file paths listed in a *.aux file"""
+
+    def __init__(self, aux_path: PurePath):
+        aux_path = PurePath(aux_path)
+        # from .aux read filenames
+        filename_list: list[str] = []
+        with open_text_input(aux_path) as file:
+            row = file.readline()
+            filename_list = row.split()
+        self.aux = resolve_input(aux_path)
+        # each may also be compressed or in the archive of the *.aux
+        self.scl = resolve_input(PurePath(aux_path.parent, filename_list[6]))
+        self.nodes = resolve_input(PurePath(aux_path.parent, filename_list[2]))
+        self.pl = resolve_input(PurePath(aux_path.parent, filename_list[5]))
+        self.nets = resolve_input(PurePath(aux_path.parent, filename_list[3]))
 
 
 class Region:
@@ -60,6 +341,38 @@ class Region:
         ):
             yield (f"ROW_{row_idx}", coord[0], coord[1], coord[2])
 
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """returns the rows and the scalar attributes as flat NumPy arrays"""
+        return {
+            "row_y": np.array(self.RowDB, dtype=np.int64),
+            "row_start_x": np.array(self.RowDBstartX, dtype=np.int64),
+            "row_end_x": np.array(self.RowDBendX, dtype=np.int64),
+            "attributes": np.array(
+                [
+                    self.default_row_height,
+                    self.default_site_spacing,
+                    self.lx,
+                    self.ly,
+                    self.hx,
+                    self.hy,
+                    self.total_row_area,
+                ],
+                dtype=np.int64,
+            ),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "Region":
+        """inverse of to_arrays"""
+        attributes = arrays["attributes"].tolist()
+        region = cls(attributes[0], attributes[1])
+        region.lx, region.ly, region.hx, region.hy = attributes[2:6]
+        region.total_row_area = attributes[6]
+        region.RowDB = arrays["row_y"].tolist()
+        region.RowDBstartX = arrays["row_start_x"].tolist()
+        region.RowDBendX = arrays["row_end_x"].tolist()
+        return region
+
 
 def read_row_input(
     scl_file: PurePath, default_row_height: int, default_site_spacing: int
@@ -76,7 +389,7 @@ def read_row_input(
     Returns:
         Region
     """
-    file = open(scl_file, "r")
+    file = open_text_input(scl_file)
     line_idx = 0
     region = Region(default_row_height, default_site_spacing)
 
@@ -230,22 +543,142 @@ class Bin:
         return self.lx, self.ly, self.hx, self.hy
 
 
+# rectangles spanning more bins than this per axis are rasterized one by one
+OVERLAP_SPAN = 3
+
+
 class CMap:
     def __init__(self, x_dim: int, y_dim: int, x_unit: int, y_unit: int):
         self.x_dim = x_dim
         self.y_dim = y_dim
         self.x_unit = x_unit
         self.y_unit = y_unit
-        self.bins: list[Bin] = []
+        # bin (i, j) spans x_edges[i]..x_edges[i + 1] and y_edges[j]..y_edges[j + 1]
+        self.x_edges = np.zeros(0, dtype=np.int64)
+        self.y_edges = np.zeros(0, dtype=np.int64)
+        # capacity, movable and fixed usage of bin (i, j) at [j, i]
+        self.cap = np.zeros((0, 0), dtype=np.int64)
+        self.m_usage = np.zeros((0, 0), dtype=np.float64)
+        self.f_usage = np.zeros((0, 0), dtype=np.float64)
+        self._bins: list[Bin] | None = None
 
-    def num_entry(self) -> int:
-        return len(self.bins)
+    @property
+    def bins(self) -> list[Bin]:
+        """Bin objects in row-major order, made from the arrays on first access"""
+        if self._bins is None:
+            self._bins = [
+                Bin(bin_lx, bin_hx, bin_ly, bin_hy, bin_cap)
+                for bin_ly, bin_hy, cap_row in zip(
+                    self.y_edges[:-1].tolist(),
+                    self.y_edges[1:].tolist(),
+                    self.cap.tolist(),
+                )
+                for bin_lx, bin_hx, bin_cap in zip(
+                    self.x_edges[:-1].tolist(), self.x_edges[1:].tolist(), cap_row
+                )
+            ]
+            if self.m_usage.size:
+                for bin, m_usage, f_usage in zip(
+                    self._bins,
+                    self.m_usage.ravel().tolist(),
+                    self.f_usage.ravel().tolist(),
+                ):
+                    bin.m_usage = m_usage
+                    bin.f_usage = f_usage
+        return self._bins
+
+    def accumulate_overlap(
+        self, lx: np.ndarray, ly: np.ndarray, hx: np.ndarray, hy: np.ndarray
+    ) -> np.ndarray:
+        """returns how much of the rectangles' area falls in each bin
 
-    def add_bin(self, bin: Bin):
-        self.bins.append(bin)
+        Rectangles spanning at most OVERLAP_SPAN bins per axis, i.e. all
+        standard cells, are rasterized together: one weighted bincount per
+        (column, row) offset inside the span. Larger ones (macros) are added
+        one by one as an outer product of their x and y overlaps.
+
+        Args:
+            lx, ly, hx, hy (np.ndarray): rectangle corners
+
+        Returns:
+            np.ndarray: overlap area of bin (i, j) at [j, i]
+        """
+        x_edges, y_edges = self.x_edges, self.y_edges
+        num_bins = self.x_dim * self.y_dim
+        # only the part inside the bin map counts
+        lx = np.clip(lx, x_edges[0], x_edges[-1])
+        hx = np.clip(hx, x_edges[0], x_edges[-1])
+        ly = np.clip(ly, y_edges[0], y_edges[-1])
+        hy = np.clip(hy, y_edges[0], y_edges[-1])
+        inside = (hx > lx) & (hy > ly)
+        lx, ly, hx, hy = lx[inside], ly[inside], hx[inside], hy[inside]
+
+        col_lo = ((lx - x_edges[0]) // self.x_unit).astype(np.int64)
+        col_hi = np.minimum(
+            np.ceil((hx - x_edges[0]) / self.x_unit).astype(np.int64), self.x_dim
+        )
+        row_lo = ((ly - y_edges[0]) // self.y_unit).astype(np.int64)
+        row_hi = np.minimum(
+            np.ceil((hy - y_edges[0]) / self.y_unit).astype(np.int64), self.y_dim
+        )
+        span_x, span_y = col_hi - col_lo, row_hi - row_lo
+        small = (span_x <= OVERLAP_SPAN) & (span_y <= OVERLAP_SPAN)
+
+        usage = np.zeros(num_bins, dtype=np.float64)
+        for dx in range(OVERLAP_SPAN):
+            for dy in range(OVERLAP_SPAN):
+                sel = small & (span_x > dx) & (span_y > dy)
+                if not sel.any():
+                    continue
+                col, row = col_lo[sel] + dx, row_lo[sel] + dy
+                width = np.minimum(hx[sel], x_edges[col + 1]) - np.maximum(
+                    lx[sel], x_edges[col]
+                )
+                height = np.minimum(hy[sel], y_edges[row + 1]) - np.maximum(
+                    ly[sel], y_edges[row]
+                )
+                usage += np.bincount(
+                    row * self.x_dim + col, weights=width * height, minlength=num_bins
+                )
+        usage = usage.reshape(self.y_dim, self.x_dim)
+
+        for k in np.flatnonzero(~small).tolist():
+            c0, c1, r0, r1 = col_lo[k], col_hi[k], row_lo[k], row_hi[k]
+            width = np.minimum(hx[k], x_edges[c0 + 1 : c1 + 1]) - np.maximum(
+                lx[k], x_edges[c0:c1]
+            )
+            height = np.minimum(hy[k], y_edges[r0 + 1 : r1 + 1]) - np.maximum(
+                ly[k], y_edges[r0:r1]
+            )
+            usage[r0:r1, c0:c1] += np.outer(height, width)
+        return usage
+
+    def fill_usage(self, object_db: "ObjectDB | ArrayObjectDB"):
+        """sets movable (MUSAGE) and fixed (FUSAGE) node area of every bin"""
+        dx, dy, lx, ly, is_fixed = object_db.geometry()
+        hx, hy = lx + dx, ly + dy
+        movable = ~is_fixed
+        self.m_usage = self.accumulate_overlap(
+            lx[movable], ly[movable], hx[movable], hy[movable]
+        )
+        self.f_usage = self.accumulate_overlap(
+            lx[is_fixed], ly[is_fixed], hx[is_fixed], hy[is_fixed]
+        )
+        # rebuild Bin objects with the new usage on next access
+        self._bins = None
+
+    def num_entry(self) -> int:
+        return self.x_dim * self.y_dim
 
 
 def make_c_map(region: Region, default_row_height: int, bin_row_factor: int) -> CMap:
+    """builds the bin map of the region and each bin's capacity
+
+    A bin's capacity is its area covered by rows. It is computed for all bins
+    at once: per row, the covered width of every bin column comes from
+    clipping the bin edges to the row, and each row adds that width times its
+    height overlap to the (at most few) bin rows it crosses.
+    """
     window_width = region.hx - region.lx
     window_height = region.hy - region.ly
 
@@ -254,59 +687,33 @@ def make_c_map(region: Region, default_row_height: int, bin_row_factor: int) ->
     y_dim = math.ceil(window_height / y_unit)
     c_map = CMap(x_dim, y_dim, x_unit, y_unit)
 
-    debug_summed_bin_cap = 0
-    start_y = region.ly
-    for j in range(y_dim):
-        start_x = region.lx
-        for i in range(x_dim):
-            # index = j * x_dim + i
-
-            bin_lx = start_x + i * x_unit
-            bin_ly = start_y
-            bin_hx = bin_lx + x_unit
-            bin_hy = bin_ly + y_unit
-
-            # last column bins
-            if i == x_dim - 1 and bin_hx > region.hx:
-                bin_hx = region.hx
-            # last row bins
-            if j == y_dim - 1 and bin_hy > region.hy:
-                bin_hy = region.hy
-
-            # calculate bin cap based on row definition
-            bin_cap = 0
-            for row_idx in range(region.num_rows()):
-                row_lx = region.RowDBstartX[row_idx]
-                row_hx = region.RowDBendX[row_idx]
-                row_ly = region.RowDB[row_idx]
-                row_hy = row_ly + default_row_height
-
-                if row_ly > bin_hy:
-                    break
-                # no overlapping area between this row and bin under consideration
-                # comment: second condition is redundant
-                if (
-                    row_hy < bin_ly
-                    or row_ly > bin_hy
-                    or row_hx < bin_lx
-                    or row_lx > bin_hx
-                ):
-                    continue
-
-                # get intersection between row & bin
-                common_lx = max(row_lx, bin_lx)
-                common_hx = min(row_hx, bin_hx)
-                common_ly = max(row_ly, bin_ly)
-                common_hy = min(row_hy, bin_hy)
-                common_area = (common_hx - common_lx) * (common_hy - common_ly)
-                bin_cap += common_area
-
-            # cover_area = (bin_hx - bin_lx) * (bin_hy - bin_ly)
-
-            bin = Bin(bin_lx, bin_hx, bin_ly, bin_hy, bin_cap)
-            c_map.add_bin(bin)
-            debug_summed_bin_cap += bin.cap
-        start_y += y_unit
+    # last column / row bins are cut at the window boundary
+    x_edges = np.minimum(region.lx + x_unit * np.arange(x_dim + 1), region.hx)
+    y_edges = np.minimum(region.ly + y_unit * np.arange(y_dim + 1), region.hy)
+    c_map.x_edges, c_map.y_edges = x_edges, y_edges
+
+    row_lx = np.array(region.RowDBstartX, dtype=np.int64)
+    row_hx = np.array(region.RowDBendX, dtype=np.int64)
+    row_ly = np.array(region.RowDB, dtype=np.int64)
+    row_hy = row_ly + default_row_height
+
+    # width of each (row, bin column) intersection
+    covered = np.clip(x_edges[None, :], row_lx[:, None], row_hx[:, None])
+    common_width = np.diff(covered, axis=1)
+
+    cap = np.zeros((y_dim, x_dim), dtype=np.int64)
+    first_bin_row = (row_ly - region.ly) // y_unit
+    for k in range(-(-default_row_height // y_unit) + 1):
+        bin_row = first_bin_row + k
+        in_map = bin_row < y_dim
+        bin_row = bin_row[in_map]
+        common_height = np.minimum(row_hy[in_map], y_edges[bin_row + 1]) - np.maximum(
+            row_ly[in_map], y_edges[bin_row]
+        )
+        common_height = np.maximum(common_height, 0)
+        np.add.at(cap, bin_row, common_height[:, None] * common_width[in_map])
+    c_map.cap = cap
+    debug_summed_bin_cap = int(cap.sum())
 
     # Debugging purpose: Just make sure sigma(bin area) == placement area
     debug_place_area = window_width * window_height
@@ -317,7 +724,8 @@ def make_c_map(region: Region, default_row_height: int, bin_row_factor: int) ->
         raise ValueError(err_str)
 
     print(f"CMAP Dim: {c_map.x_dim} x {c_map.y_dim}")
-    print(f"BinSize: {c_map.x_unit} x {c_map.y_unit}\tTotal {c_map.num_entry()} bins.")
+    num_bins = c_map.x_dim * c_map.y_dim
+    print(f"BinSize: {c_map.x_unit} x {c_map.y_unit}\tTotal {num_bins} bins.")
     return c_map
 
 
@@ -352,45 +760,398 @@ class ObjectDB:
         self.nodes[name].lx = loc_x
         self.nodes[name].ly = loc_y
 
+    def geometry(
+        self,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """returns dx, dy, lx, ly and is_fixed of all nodes as arrays"""
+        nodes = self.nodes.values()
+        num = len(self.nodes)
+        return (
+            np.fromiter((node.dx for node in nodes), np.int64, num),
+            np.fromiter((node.dy for node in nodes), np.int64, num),
+            np.fromiter((node.lx for node in nodes), np.int64, num),
+            np.fromiter((node.ly for node in nodes), np.int64, num),
+            np.fromiter((node.is_fixed for node in nodes), np.bool_, num),
+        )
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """same columns as ArrayObjectDB.to_arrays"""
+        dx, dy, lx, ly, is_fixed = self.geometry()
+        return {
+            "names": encode_names(list(self.nodes)),
+            "dx": dx,
+            "dy": dy,
+            "lx": lx,
+            "ly": ly,
+            "is_fixed": is_fixed,
+            "totals": np.array(
+                [self.num_terminal, self.total_movable_area, self.total_fixed_area],
+                dtype=np.int64,
+            ),
+        }
+
+
+class NodeView:
+    """Node-like handle to one entry of an ArrayObjectDB
+
+    Attribute reads and writes go straight to the underlying arrays,
+    so no per-node Python object has to be kept alive.
+    """
 
-def read_node_input(node_file: PurePath) -> ObjectDB:
-    """reads node input file and returns an instance of class ObjectDB
+    __slots__ = ("_db", "_idx")
 
-    Args:
-        node_file (PurePath): *.nodes
+    def __init__(self, db: "ArrayObjectDB", idx: int):
+        self._db = db
+        self._idx = idx
 
-    Raises:
-        ValueError: When NumTerminals is not next to NumNodes row
+    @property
+    def name(self) -> str:
+        return self._db.name_of(self._idx)
 
-    Returns:
-        ObjectDB
+    @property
+    def dx(self) -> int:
+        return int(self._db.dx[self._idx])
+
+    @property
+    def dy(self) -> int:
+        return int(self._db.dy[self._idx])
+
+    @property
+    def lx(self) -> int:
+        return int(self._db.lx[self._idx])
+
+    @lx.setter
+    def lx(self, value: int):
+        self._db.lx[self._idx] = value
+
+    @property
+    def ly(self) -> int:
+        return int(self._db.ly[self._idx])
+
+    @ly.setter
+    def ly(self, value: int):
+        self._db.ly[self._idx] = value
+
+    @property
+    def is_fixed(self) -> bool:
+        return bool(self._db.is_fixed[self._idx])
+
+    @property
+    def node_type(self) -> str:
+        return "terminal" if self.is_fixed else "movable"
+
+
+class NodesView(Mapping[str, NodeView]):
+    """read-only `dict[str, Node]` look-alike over an ArrayObjectDB"""
+
+    __slots__ = ("_db",)
+
+    def __init__(self, db: "ArrayObjectDB"):
+        self._db = db
+
+    def __getitem__(self, name: str) -> NodeView:
+        return NodeView(self._db, self._db.index_of(name))
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._db.find(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return self._db.iter_names()
+
+    def __len__(self) -> int:
+        return self._db.num_entry()
+
+    def items(self) -> Iterator[tuple[str, NodeView]]:  # type: ignore[override]
+        db = self._db
+        for idx, name in enumerate(db.iter_names()):
+            yield name, NodeView(db, idx)
+
+    def values(self) -> Iterator[NodeView]:  # type: ignore[override]
+        db = self._db
+        for idx in range(db.num_entry()):
+            yield NodeView(db, idx)
+
+
+class ArrayObjectDB:
+    """columnar ObjectDB: one NumPy array per node attribute
+
+    Nodes are addressed by their insertion index. Their names are packed into
+    one byte table (the layout of encode_names, plus a separator after the
+    last name) with `_name_ptr[k]` the start of name k; a sorted fixed-width
+    copy of the names, built on the first lookup, maps names back to indices.
+    `nodes` gives the same `nodes[name]` access as ObjectDB through NodeView
+    handles.
     """
-    file = open(node_file, "r")
-    line_idx = 0
-    object_db = ObjectDB()
 
-    num_obj = 0
+    def __init__(self, capacity: int = 1024):
+        self._size = 0
+        self._name_data = np.zeros(capacity * 8, dtype=np.uint8)
+        self._name_ptr = np.zeros(capacity + 1, dtype=np.int64)
+        self._dx = np.zeros(capacity, dtype=np.int64)
+        self._dy = np.zeros(capacity, dtype=np.int64)
+        self._lx = np.zeros(capacity, dtype=np.int64)
+        self._ly = np.zeros(capacity, dtype=np.int64)
+        self._is_fixed = np.zeros(capacity, dtype=np.bool_)
+        # sorted names and their node indices, see _name_index
+        self._sorted_names: np.ndarray | None = None
+        self._sorted_idx: np.ndarray | None = None
+        self._names: np.ndarray | None = None
 
-    for line in file:
-        line_idx += 1
-        _line = line.strip()  # remove front & end whitespaces
-        words = _line.split()  # split the row by whitespace
+        self.num_terminal = 0
+        self.total_movable_area = 0
+        self.total_fixed_area = 0
 
-        # skip empty lines
-        if not _line:
-            continue
-        # skip initial metadata lines
-        if words[0] in ["#", "UCLA"]:
-            continue
+    @property
+    def dx(self) -> np.ndarray:
+        return self._dx[: self._size]
+
+    @property
+    def dy(self) -> np.ndarray:
+        return self._dy[: self._size]
+
+    @property
+    def lx(self) -> np.ndarray:
+        return self._lx[: self._size]
+
+    @property
+    def ly(self) -> np.ndarray:
+        return self._ly[: self._size]
+
+    @property
+    def is_fixed(self) -> np.ndarray:
+        return self._is_fixed[: self._size]
+
+    @property
+    def nodes(self) -> NodesView:
+        return NodesView(self)
+
+    def num_entry(self) -> int:
+        return self._size
+
+    def name_buffer(self) -> np.ndarray:
+        """all names packed as by encode_names, without copying"""
+        return self._name_data[: max(int(self._name_ptr[self._size]) - 1, 0)]
+
+    def name_of(self, idx: int) -> str:
+        start, end = self._name_ptr[idx : idx + 2].tolist()
+        return self._name_data[start : end - 1].tobytes().decode()
 
+    def iter_names(self) -> Iterator[str]:
+        """yields the node names in index order, decoding them in batches"""
+        ptr = self._name_ptr
+        for first in range(0, self._size, NAME_DECODE_BATCH):
+            last = min(first + NAME_DECODE_BATCH, self._size)
+            yield from decode_names(self._name_data[ptr[first] : ptr[last] - 1])
+
+    def _name_index(self) -> tuple[np.ndarray, np.ndarray]:
+        """sorted names and the node index of each
+
+        With duplicate names the last node wins, as with dict assignment.
+        """
+        if self._sorted_names is None:
+            names = fixed_width_names(self.name_buffer())
+            order = np.argsort(names, kind="stable")
+            self._sorted_names = names[order]
+            self._sorted_idx = order
+            # index order, for lookups that can guess the index; only
+            # unambiguous when every name is unique
+            unique = not (self._sorted_names[1:] == self._sorted_names[:-1]).any()
+            self._names = names if unique else None
+        return self._sorted_names, self._sorted_idx
+
+    def find(self, name: str) -> int:
+        """returns the index of the node called name, or -1"""
+        sorted_names, sorted_idx = self._name_index()
+        key = name.encode()
+        if not key or len(key) > sorted_names.itemsize:
+            return -1
+        pos = int(np.searchsorted(sorted_names, key, side="right")) - 1
+        if pos < 0 or sorted_names[pos] != key:
+            return -1
+        return int(sorted_idx[pos])
+
+    def index_of(self, name: str) -> int:
+        idx = self.find(name)
+        if idx < 0:
+            raise KeyError(name)
+        return idx
+
+    def indices_of(self, names: list[str]) -> np.ndarray:
+        """returns the node index of every name, -1 for unknown names"""
+        keys = fixed_width_names(encode_names(names))
+        if len(keys) < len(names):
+            # a single empty name packs into an empty buffer
+            keys = np.zeros(len(names), dtype="S1")
+        return self.lookup(keys)
+
+    def lookup(self, keys: np.ndarray, first_guess: int | None = None) -> np.ndarray:
+        """indices_of for names given as a fixed-width np.bytes_ array
+
+        Args:
+            first_guess (int | None, optional): likely index of keys[0], with
+                the others following in order, as in a *.pl file written in
+                *.nodes order. Names found there skip the binary search.
+                Defaults to None.
+        """
+        sorted_names, sorted_idx = self._name_index()
+        indices = np.full(len(keys), -1, dtype=np.int64)
+        missing = np.arange(len(keys))
+        if first_guess is not None and self._names is not None:
+            guess = np.arange(first_guess, first_guess + len(keys))
+            guess = guess[guess < self._size]
+            hit = self._names[guess] == keys[: len(guess)]
+            indices[: len(guess)][hit] = guess[hit]
+            missing = np.flatnonzero(indices < 0)
+        pos = np.searchsorted(sorted_names, keys[missing], side="right") - 1
+        found = pos >= 0
+        found[found] = sorted_names[pos[found]] == keys[missing[found]]
+        indices[missing[found]] = sorted_idx[pos[found]]
+        return indices
+
+    def reserve(self, capacity: int, name_bytes: int = 0):
+        """grows the arrays so that `capacity` nodes whose names take
+        `name_bytes` (separators included) fit without reallocation
+        """
+        if capacity > len(self._dx):
+            for attr in ("_dx", "_dy", "_lx", "_ly", "_is_fixed"):
+                old = getattr(self, attr)
+                new = np.zeros(capacity, dtype=old.dtype)
+                new[: len(old)] = old
+                setattr(self, attr, new)
+            ptr = np.zeros(capacity + 1, dtype=np.int64)
+            ptr[: len(self._name_ptr)] = self._name_ptr
+            self._name_ptr = ptr
+        if name_bytes > len(self._name_data):
+            data = np.zeros(name_bytes, dtype=np.uint8)
+            data[: len(self._name_data)] = self._name_data
+            self._name_data = data
+
+    def append(self, name: str, dx: int, dy: int, is_fixed: bool) -> int:
+        """adds a node at location (0, 0) and returns its index"""
+        idx = self._size
+        key = name.encode() + b"\n"
+        start = int(self._name_ptr[idx])
+        end = start + len(key)
+        self.reserve(
+            max(2 * idx, 1024) if idx == len(self._dx) else idx + 1,
+            max(2 * end, 8192) if end > len(self._name_data) else 0,
+        )
+        self._name_data[start:end] = np.frombuffer(key, dtype=np.uint8)
+        self._name_ptr[idx + 1] = end
+        self._dx[idx] = dx
+        self._dy[idx] = dy
+        self._is_fixed[idx] = is_fixed
+        self._size = idx + 1
+        self._sorted_names = self._sorted_idx = self._names = None
+        return idx
+
+    def extend(
+        self,
+        names: list[str],
+        dxs: list[int],
+        dys: list[int],
+        fixed_flags: list[bool],
+    ):
+        """adds nodes in bulk at location (0, 0)"""
+        if names:
+            buffer = np.append(encode_names(names), np.uint8(NAME_SEPARATOR))
+            self.extend_packed(buffer, dxs, dys, fixed_flags)
+
+    def extend_packed(
+        self,
+        buffer: np.ndarray,
+        dxs: np.ndarray | list[int],
+        dys: np.ndarray | list[int],
+        fixed_flags: np.ndarray | list[bool],
+    ):
+        """extend for names packed by encode_names plus a final separator"""
+        start = self._size
+        end = start + len(dxs)
+        name_start = int(self._name_ptr[start])
+        name_end = name_start + len(buffer)
+        # grow geometrically, this is called once per parsed block
+        self.reserve(
+            max(end, 2 * len(self._dx)) if end > len(self._dx) else end,
+            max(name_end, 2 * len(self._name_data))
+            if name_end > len(self._name_data)
+            else 0,
+        )
+        self._name_data[name_start:name_end] = buffer
+        separators = np.flatnonzero(buffer == NAME_SEPARATOR)
+        self._name_ptr[start + 1 : end + 1] = name_start + separators + 1
+        self._dx[start:end] = dxs
+        self._dy[start:end] = dys
+        self._is_fixed[start:end] = fixed_flags
+        self._size = end
+        self._sorted_names = self._sorted_idx = self._names = None
+
+    def geometry(
+        self,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """returns dx, dy, lx, ly and is_fixed of all nodes as arrays"""
+        return self.dx, self.dy, self.lx, self.ly, self.is_fixed
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """returns every column, names included, as flat NumPy arrays"""
+        return {
+            "names": self.name_buffer(),
+            "dx": self.dx,
+            "dy": self.dy,
+            "lx": self.lx,
+            "ly": self.ly,
+            "is_fixed": self.is_fixed,
+            "totals": np.array(
+                [self.num_terminal, self.total_movable_area, self.total_fixed_area],
+                dtype=np.int64,
+            ),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "ArrayObjectDB":
+        """inverse of to_arrays; the numeric columns are used without copying"""
+        object_db = cls(capacity=0)
+        size = len(arrays["dx"])
+        if size:
+            object_db._name_data = np.append(arrays["names"], np.uint8(NAME_SEPARATOR))
+            separators = np.flatnonzero(object_db._name_data == NAME_SEPARATOR)
+            object_db._name_ptr = np.append(0, separators + 1)
+        else:
+            object_db._name_ptr = np.zeros(1, dtype=np.int64)
+        object_db._size = size
+        object_db._dx = arrays["dx"]
+        object_db._dy = arrays["dy"]
+        object_db._lx = arrays["lx"]
+        object_db._ly = arrays["ly"]
+        object_db._is_fixed = arrays["is_fixed"]
+        num_terminal, total_movable_area, total_fixed_area = arrays["totals"].tolist()
+        object_db.num_terminal = num_terminal
+        object_db.total_movable_area = total_movable_area
+        object_db.total_fixed_area = total_fixed_area
+        return object_db
+
+    def add_node(self, node: Node):
+        idx = self.append(node.name, node.dx, node.dy, node.is_fixed)
+        self._lx[idx] = node.lx
+        self._ly[idx] = node.ly
+
+    def set_node_loc(self, name: str, loc_x: int, loc_y: int):
+        idx = self.index_of(name)
+        self._lx[idx] = loc_x
+        self._ly[idx] = loc_y
+
+
+def read_node_objects(node_file: PurePath) -> tuple[ObjectDB, int]:
+    """read_node_input into an ObjectDB, one Node per line"""
+    object_db = ObjectDB()
+    num_obj = 0
+
+    records = iter_bookshelf_words(node_file)
+    for line_idx, words in records:
         # NumNodes row
         if words[0] == "NumNodes":
             num_obj_from_file = int(words[2])
             # NumTerminals row
-            line = file.readline()
-            line_idx += 1
-            _line = line.strip()
-            words = _line.split()
+            line_idx, words = next(records, (line_idx + 1, [""]))
             if words[0] != "NumTerminals":
                 err_str = "*.nodes Processing: NumTerminals keyword not found"
                 err_str += f" at line {line_idx}\n"
@@ -402,26 +1163,197 @@ def read_node_input(node_file: PurePath) -> ObjectDB:
 
         # comment: node ID, x, y, terminal boolean rows
         name, dx, dy = words[0], int(words[1]), int(words[2])
-        move_type: str
         # comment: words[3] in original raises IndexError in python
-        if words[-1] == "terminal":
-            move_type = "terminal"
+        is_terminal = words[-1] == "terminal"
+        if is_terminal:
             object_db.num_terminal += 1
             # comment: added
             object_db.total_fixed_area += dx * dy
         else:
-            move_type = "movable"
             object_db.total_movable_area += dx * dy
-        lx, ly = 0, 0
 
         # add node info
-        record = Node(name, dx, dy, lx, ly, move_type)
-        record.is_fixed = move_type == "terminal"
+        move_type = "terminal" if is_terminal else "movable"
+        record = Node(name, dx, dy, 0, 0, move_type)
+        record.is_fixed = is_terminal
         object_db.add_node(record)
 
         num_obj += 1
+    return object_db, num_obj
+
+
+class ColumnReader:
+    """reads the regular lines of a Bookshelf file in bulk
+
+    The file is read in blocks of whole lines. The lines of a block that
+    regular_lines() marks go to read_run() together, and every other
+    meaningful line goes to read_line() as words, in file order, the way
+    iter_bookshelf_words yields it. Irregular lines (headers, comments and
+    anything unusual) are rare, so runs are long.
+    """
+
+    def read(self, path: PurePath):
+        for first_line, chunk in iter_line_blocks(path, COLUMN_BLOCK_SIZE):
+            block = WordBlock(chunk)
+            if not block.plain:
+                for line, text in enumerate(block.lines()):
+                    self.read_words(first_line + line, text.split())
+                continue
+            regular = self.regular_lines(block)
+            done = 0
+            single = np.flatnonzero(~regular & (block.num_words > 0)).tolist()
+            for line in [*single, block.num_lines]:
+                run = np.flatnonzero(regular[done:line]) + done
+                if len(run):
+                    self.read_run(block, run, first_line)
+                if line < block.num_lines:
+                    self.read_words(first_line + line, block.words_of(line))
+                done = line + 1
+        self.finish()
+
+    def read_words(self, line_idx: int, words: list[str]):
+        if words and words[0] != "#" and words[0] != "UCLA":
+            self.read_line(line_idx, words)
+
+    def regular_lines(self, block: WordBlock) -> np.ndarray:
+        """bool mask over the lines of block"""
+        raise NotImplementedError
+
+    def read_run(self, block: WordBlock, lines: np.ndarray, first_line: int):
+        """reads the given regular lines of block, numbered from first_line"""
+        raise NotImplementedError
+
+    def read_line(self, line_idx: int, words: list[str]):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+
+def starts_with_keyword(
+    block: WordBlock, lines: np.ndarray, keywords: tuple[bytes, ...]
+) -> np.ndarray:
+    """which of the lines begin with one of the keywords"""
+    first = block.word(lines, 0)
+    found = np.zeros(len(lines), dtype=np.bool_)
+    for keyword in keywords:
+        found |= block.equals(first, keyword)
+    return found
+
+
+class NodeColumnReader(ColumnReader):
+    """*.nodes into an ArrayObjectDB, for read_node_input
+
+    A regular line is `name dx dy` or `name dx dy word` with plain integers.
+    """
+
+    KEYWORDS = (b"#", b"UCLA", b"NumNodes", b"NumTerminals")
+
+    def __init__(self):
+        self.object_db = ArrayObjectDB()
+        # line after NumNodes, which must hold NumTerminals
+        self.num_terminals_line: int | None = None
+        # sizes of the regular lines of the current block
+        self.lines = self.dxs = self.dys = np.zeros(0, dtype=np.int64)
+
+    def regular_lines(self, block: WordBlock) -> np.ndarray:
+        num_words = block.num_words
+        lines = np.flatnonzero((num_words == 3) | (num_words == 4))
+        dxs, dx_valid = block.integers(block.word(lines, 1))
+        dys, dy_valid = block.integers(block.word(lines, 2))
+        regular = dx_valid & dy_valid
+        regular[regular] = ~starts_with_keyword(block, lines[regular], self.KEYWORDS)
+        self.lines, self.dxs, self.dys = lines[regular], dxs[regular], dys[regular]
+        mask = np.zeros(block.num_lines, dtype=np.bool_)
+        mask[self.lines] = True
+        return mask
+
+    def read_run(self, block: WordBlock, lines: np.ndarray, first_line: int):
+        if self.num_terminals_line is not None:
+            self.check_num_terminals(first_line + int(lines[0]), "")
+        pos = np.searchsorted(self.lines, lines)
+        dxs, dys = self.dxs[pos], self.dys[pos]
+        # comment: words[3] in original raises IndexError in python
+        is_terminal = block.num_words[lines] == 4
+        is_terminal[is_terminal] = block.equals(
+            block.word(lines[is_terminal], 3), b"terminal"
+        )
+        areas = dxs * dys
+        object_db = self.object_db
+        object_db.num_terminal += int(np.count_nonzero(is_terminal))
+        object_db.total_fixed_area += int(areas[is_terminal].sum())
+        object_db.total_movable_area += int(areas[~is_terminal].sum())
+        object_db.extend_packed(
+            block.packed(block.word(lines, 0)), dxs, dys, is_terminal
+        )
+
+    def read_line(self, line_idx: int, words: list[str]):
+        object_db = self.object_db
+        if self.num_terminals_line is not None:
+            self.check_num_terminals(line_idx, words[0])
+            num_term_from_file = int(words[2])
+            # TODO: from print to log.info
+            print(
+                f"NumNodes: {self.num_obj_from_file}"
+                f"\tNumTerminals: {num_term_from_file}"
+            )
+            return
+        # NumNodes row
+        if words[0] == "NumNodes":
+            self.num_obj_from_file = int(words[2])
+            self.num_terminals_line = line_idx + 1
+            # room for the nodes, with names of about 8 characters
+            object_db.reserve(self.num_obj_from_file, 9 * self.num_obj_from_file)
+            return
+
+        # comment: node ID, x, y, terminal boolean rows
+        name, dx, dy = words[0], int(words[1]), int(words[2])
+        is_terminal = words[-1] == "terminal"
+        if is_terminal:
+            object_db.num_terminal += 1
+            # comment: added
+            object_db.total_fixed_area += dx * dy
+        else:
+            object_db.total_movable_area += dx * dy
+        object_db.append(name, dx, dy, is_terminal)
+
+    def check_num_terminals(self, line_idx: int, keyword: str):
+        """the row after NumNodes must be NumTerminals"""
+        if keyword != "NumTerminals":
+            err_str = "*.nodes Processing: NumTerminals keyword not found"
+            err_str += f" at line {line_idx}\n"
+            raise ValueError(err_str)
+        self.num_terminals_line = None
+
+    def finish(self):
+        if self.num_terminals_line is not None:
+            self.check_num_terminals(self.num_terminals_line, "")
+
+
+@gc_paused()
+def read_node_input(
+    node_file: PurePath, columnar: bool = False
+) -> ObjectDB | ArrayObjectDB:
+    """reads node input file and returns an instance of class ObjectDB
+
+    Args:
+        node_file (PurePath): *.nodes
+        columnar (bool, optional): returns an ArrayObjectDB instead.
+            Defaults to False.
+
+    Raises:
+        ValueError: When NumTerminals is not next to NumNodes row
+
+    Returns:
+        ObjectDB | ArrayObjectDB
+    """
+    if columnar:
+        reader = NodeColumnReader()
+        reader.read(node_file)
+        object_db, num_obj = reader.object_db, reader.object_db.num_entry()
+    else:
+        object_db, num_obj = read_node_objects(node_file)
 
-    file.close()
     num_entry = object_db.num_entry()
     print("Node file processing is done.")
     print(f"\tTotal {num_obj} objects ({object_db.num_terminal} terminals)")
@@ -432,47 +1364,41 @@ def read_node_input(node_file: PurePath) -> ObjectDB:
     return object_db
 
 
-def read_placement_input(pl_path: PurePath, object_db: ObjectDB):
+def read_placement_input(pl_path: PurePath, object_db: ObjectDB | ArrayObjectDB):
     """reads placement input file and changes the location information of the object_db.
 
     Args:
         pl_path (PurePath): *.pl
-        object_db (ObjectDB)
+        object_db (ObjectDB | ArrayObjectDB)
 
     Raises:
         ValueError: When an undefined node name exists in *.pl
         ValueError: When a terminal node is not fixed in *.pl
     """
-    file = open(pl_path, "r")
-    line_idx = 0
-    # object_db = ObjectDB()
+    if isinstance(object_db, ArrayObjectDB):
+        reader = PlacementColumnReader(pl_path, object_db)
+        reader.read(pl_path)
+        print("Solution PL file processing is done.")
+        print(f"\tTotal {reader.num_obj} objects ({reader.num_terminal} terminals)")
+        return
+    nodes = object_db.nodes
 
     num_obj = 0
     num_terminal = 0
 
-    for line in file:
-        line_idx += 1
-        _line = line.strip()  # remove front & end whitespaces
-        words = _line.split()  # split the row by whitespace
-
-        # skip empty lines
-        if not _line:
-            continue
-        # skip initial metadata lines
-        if words[0] in ["#", "UCLA"]:
-            continue
-
+    for line_idx, words in iter_bookshelf_words(pl_path):
         # comment: node ID, x, y, terminal boolean rows
         name, loc_x, loc_y = words[0], int(words[1]), int(words[2])
-        if name not in object_db.nodes:
-            err_str = f"Undefined object {name} appear in Solution PL file."
+        if name not in nodes:
+            err_str = f"Undefined object {name} appear in Solution PL file"
+            err_str += f" at line {line_idx}."
             raise ValueError(err_str)
 
         # comment: added terminal boolean check
-        if object_db.nodes[name].is_fixed:
+        if nodes[name].is_fixed:
             if words[-1] != "/FIXED":
                 err_str = f"Object {name} is terminal in *.scl file,"
-                err_str += f" but not fixed in {pl_path}."
+                err_str += f" but not fixed in {pl_path} at line {line_idx}."
                 raise ValueError(err_str)
             num_terminal += 1
 
@@ -480,134 +1406,545 @@ def read_placement_input(pl_path: PurePath, object_db: ObjectDB):
         object_db.set_node_loc(name, loc_x, loc_y)
         num_obj += 1
 
-    file.close()
     print("Solution PL file processing is done.")
     print(f"\tTotal {num_obj} objects ({num_terminal} terminals)")
 
 
-class Pin:
-    def __init__(
-        self,
-        cell_name: str,
-        io: str,
-        x_offset: float,
-        y_offset: float,
-    ):
-        self.cell_name = cell_name
-        self.io = io
-        self.offset = (x_offset, y_offset)
+class PlacementColumnReader(ColumnReader):
+    """*.pl into an ArrayObjectDB, for read_placement_input
+
+    A regular line starts with `name x y`, x and y plain integers. The names
+    of a run are looked up at once; the checks and messages are those of
+    read_placement_input, for the first offending line.
+    """
+
+    def __init__(self, pl_path: PurePath, object_db: ArrayObjectDB):
+        self.pl_path = pl_path
+        self.object_db = object_db
+        self.num_obj = 0
+        self.num_terminal = 0
+        # locations of the regular lines of the current block
+        self.lines = self.xs = self.ys = np.zeros(0, dtype=np.int64)
+
+    def regular_lines(self, block: WordBlock) -> np.ndarray:
+        lines = np.flatnonzero(block.num_words >= 3)
+        xs, x_valid = block.integers(block.word(lines, 1))
+        ys, y_valid = block.integers(block.word(lines, 2))
+        regular = x_valid & y_valid
+        regular[regular] = ~starts_with_keyword(block, lines[regular], (b"#", b"UCLA"))
+        self.lines, self.xs, self.ys = lines[regular], xs[regular], ys[regular]
+        mask = np.zeros(block.num_lines, dtype=np.bool_)
+        mask[self.lines] = True
+        return mask
+
+    def read_run(self, block: WordBlock, lines: np.ndarray, first_line: int):
+        object_db = self.object_db
+        names = block.word(lines, 0)
+        idxs = object_db.lookup(block.fixed_width(names), first_guess=self.num_obj)
+        undefined = idxs < 0
+        fixed = object_db.is_fixed[idxs] & ~undefined
+        # comment: added terminal boolean check
+        unfixed = fixed & ~block.equals(block.word(lines, -1), b"/FIXED")
+        bad = np.flatnonzero(undefined | unfixed)
+        if len(bad):
+            line = int(bad[0])
+            self.raise_error(
+                first_line + int(lines[line]),
+                block.text(names[line]),
+                bool(undefined[line]),
+            )
+        pos = np.searchsorted(self.lines, lines)
+        object_db.lx[idxs] = self.xs[pos]
+        object_db.ly[idxs] = self.ys[pos]
+        self.num_obj += len(lines)
+        self.num_terminal += int(np.count_nonzero(fixed))
+
+    def read_line(self, line_idx: int, words: list[str]):
+        # comment: node ID, x, y, terminal boolean rows
+        name, loc_x, loc_y = words[0], int(words[1]), int(words[2])
+        idx = self.object_db.find(name)
+        if idx < 0:
+            self.raise_error(line_idx, name, True)
 
+        # comment: added terminal boolean check
+        if self.object_db.is_fixed[idx]:
+            if words[-1] != "/FIXED":
+                self.raise_error(line_idx, name, False)
+            self.num_terminal += 1
 
-class Net:
-    def __init__(self, net_name: str, degree: int):
-        self.net_name: str = net_name
-        self.degree: int = degree
-        self.pin_names: list[str] = []
+        # add node info
+        self.object_db.lx[idx] = loc_x
+        self.object_db.ly[idx] = loc_y
+        self.num_obj += 1
+
+    def raise_error(self, line_idx: int, name: str, undefined: bool):
+        if undefined:
+            err_str = f"Undefined object {name} appear in Solution PL file"
+            err_str += f" at line {line_idx}."
+        else:
+            err_str = f"Object {name} is terminal in *.scl file,"
+            err_str += f" but not fixed in {self.pl_path} at line {line_idx}."
+        raise ValueError(err_str)
 
 
 class Nets:
-    def __init__(self):
-        # node name -> pin coordinate -> pin name
-        self.pin_coord_dict: dict[str, dict[tuple[float, float], str]] = {}
-        self.pin_type_count: dict[str, dict[str, int]] = {}
-        self.pin_dict: dict[str, Pin] = {}
-        self.net_dict: dict[str, Net] = {}
-
-    def add_pin(self, cell_name: str, io: str, x_offset: float, y_offset: float) -> str:
-        if cell_name not in self.pin_coord_dict:
-            self.pin_coord_dict[cell_name] = {}
-        if (x_offset, y_offset) in self.pin_coord_dict[cell_name]:
-            return self.pin_coord_dict[cell_name][(x_offset, y_offset)]
-
-        if cell_name not in self.pin_type_count:
-            self.pin_type_count[cell_name] = {}
-        if io not in self.pin_type_count[cell_name]:
-            self.pin_type_count[cell_name][io] = 1
-        else:
-            self.pin_type_count[cell_name][io] += 1
-        new_pin_name = f"{io}{self.pin_type_count[cell_name][io]}"
+    """global pin table of a netlist
 
-        new_pin = Pin(cell_name, io, x_offset, y_offset)
-        self.pin_coord_dict[cell_name][(x_offset, y_offset)] = new_pin_name
-        self.pin_dict[new_pin_name] = new_pin
+    Pins are numbered 0, 1, ... in order of first appearance in *.nets. A pin
+    is one distinct (cell, offset) pair; its cell index, direction code and
+    offset are stored in flat arrays indexed by pin id. The pins of net k are
+    net_pins[net_ptr[k]] to net_pins[net_ptr[k + 1] - 1].
 
-        return new_pin_name
+    A pin is named after its direction and its rank among the pins of that
+    direction on the same cell, e.g. I1, I2, O1; the name is unique per cell
+    only, so pins are always referred to by id.
+    """
+
+    def __init__(self):
+        self.net_names: list[str] = []
+        self.net_degrees: list[int] = []
+        # cell name -> cell index; cell_names is filled in by finalize
+        self.cell_idx: dict[str, int] = {}
+        self.cell_names: list[str] = []
+        # direction code -> direction, e.g. "I", "O", "B"
+        self.io_idx: dict[str, int] = {}
+        self.io_names: list[str] = []
+
+        self.net_ptr = np.zeros(1, dtype=np.int64)
+        self.net_pins = np.zeros(0, dtype=np.int64)
+        # pin id -> cell index / direction code / number / offset from cell center
+        self.pin_cell = np.zeros(0, dtype=np.int64)
+        self.pin_io = np.zeros(0, dtype=np.int8)
+        self.pin_number = np.zeros(0, dtype=np.int64)
+        self.pin_x = np.zeros(0, dtype=np.float64)
+        self.pin_y = np.zeros(0, dtype=np.float64)
+        # pins of cell c are cell_pins[cell_pin_ptr[c]] to cell_pins[cell_pin_ptr[c + 1] - 1]
+        self.cell_pin_ptr = np.zeros(1, dtype=np.int64)
+        self.cell_pins = np.zeros(0, dtype=np.int64)
+
+        # pin records staged by add_records until finalize
+        self._staged: list[tuple[np.ndarray, ...]] = []
+        self._num_staged = 0
+
+    def num_nets(self) -> int:
+        return len(self.net_names)
+
+    def num_pins(self) -> int:
+        return len(self.pin_cell)
+
+    def add_records(self, records: "NetRecords"):
+        """stages every net of records, in order, with its pin records
+
+        Cell and direction names are interned once per distinct name of
+        records; the pins are then mapped to global ids in bulk.
+        """
+        net_ptr = np.array(records.net_ptr, dtype=np.int64)
+        first, last = int(net_ptr[0]), int(net_ptr[-1])
+        pin_cell = np.asarray(records.pin_cell, dtype=np.int64)[first:last]
+        pin_io = np.asarray(records.pin_io, dtype=np.int64)[first:last]
+        cells = np.take(
+            intern_names(self.cell_idx, records.cell_names, pin_cell, first > 0),
+            pin_cell,
+        )
+        ios = np.take(
+            intern_names(self.io_idx, records.io_names, pin_io, first > 0), pin_io
+        ).astype(np.int8)
+        net_ptr = net_ptr[1:] + (self._num_staged - first)
+        self._staged.append(
+            (
+                net_ptr,
+                cells,
+                ios,
+                np.asarray(records.pin_x, dtype=np.float64)[first:last],
+                np.asarray(records.pin_y, dtype=np.float64)[first:last],
+            )
+        )
+        self._num_staged += last - first
+        self.net_names.extend(records.net_names)
+        self.net_degrees.extend(records.net_degrees)
+
+    def finalize(self):
+        """builds the pin table from the staged pin records"""
+        if not self._staged:
+            return
+        net_ptrs, cells, ios, xs, ys = zip(*self._staged)
+        self._staged = []
+        self._num_staged = 0
+        # pins of earlier calls are merged in again as records of their own
+        net_ptrs = (self.net_ptr, *(ptr + len(self.net_pins) for ptr in net_ptrs))
+        rec_cell = np.concatenate((self.pin_cell[self.net_pins], *cells))
+        rec_io = np.concatenate((self.pin_io[self.net_pins], *ios))
+        rec_x = np.concatenate((self.pin_x[self.net_pins], *xs))
+        rec_y = np.concatenate((self.pin_y[self.net_pins], *ys))
+        self.net_ptr = np.concatenate(net_ptrs)
+        self.cell_names = list(self.cell_idx)
+        self.io_names = list(self.io_idx)
+
+        # group equal (cell, x, y) records; a stable sort keeps the first
+        # occurrence of a pin at the head of its group
+        order = np.lexsort((rec_y, rec_x, rec_cell))
+        is_head = np.ones(len(order), dtype=bool)
+        is_head[1:] = (
+            (np.diff(rec_cell[order]) != 0)
+            | (rec_x[order][1:] != rec_x[order][:-1])
+            | (rec_y[order][1:] != rec_y[order][:-1])
+        )
+        rec_group = np.empty(len(order), dtype=np.int64)
+        rec_group[order] = np.cumsum(is_head) - 1
+        # number the groups by first occurrence
+        group_head = order[is_head]
+        pin_head = np.sort(group_head)
+        group_pin = np.empty(len(group_head), dtype=np.int64)
+        group_pin[np.argsort(group_head)] = np.arange(len(group_head))
+        self.net_pins = group_pin[rec_group]
+
+        self.pin_cell = rec_cell[pin_head]
+        self.pin_io = rec_io[pin_head]
+        self.pin_x = rec_x[pin_head]
+        self.pin_y = rec_y[pin_head]
+
+        # rank of every pin among the same-direction pins of its cell
+        order = np.lexsort((self.pin_io, self.pin_cell))
+        is_head = np.ones(len(order), dtype=bool)
+        is_head[1:] = (np.diff(self.pin_cell[order]) != 0) | (
+            np.diff(self.pin_io[order]) != 0
+        )
+        head_pos = np.maximum.accumulate(np.where(is_head, np.arange(len(order)), 0))
+        self.pin_number = np.empty(len(order), dtype=np.int64)
+        self.pin_number[order] = np.arange(len(order)) - head_pos + 1
+
+        self.cell_pins = np.argsort(self.pin_cell, kind="stable")
+        self.cell_pin_ptr = np.zeros(len(self.cell_names) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(self.pin_cell, minlength=len(self.cell_names)),
+            out=self.cell_pin_ptr[1:],
+        )
+
+    def pin_names(self) -> list[str]:
+        """pin id -> pin name"""
+        io_names = self.io_names
+        return [
+            f"{io_names[io]}{number}"
+            for io, number in zip(self.pin_io.tolist(), self.pin_number.tolist())
+        ]
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """returns the finalized pin table, names included, as flat NumPy arrays"""
+        self.finalize()
+        return {
+            "net_names": encode_names(self.net_names),
+            "net_degrees": np.array(self.net_degrees, dtype=np.int64),
+            "cell_names": encode_names(self.cell_names),
+            "io_names": encode_names(self.io_names),
+            "net_ptr": self.net_ptr,
+            "net_pins": self.net_pins,
+            "pin_cell": self.pin_cell,
+            "pin_io": self.pin_io,
+            "pin_number": self.pin_number,
+            "pin_x": self.pin_x,
+            "pin_y": self.pin_y,
+            "cell_pin_ptr": self.cell_pin_ptr,
+            "cell_pins": self.cell_pins,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "Nets":
+        """inverse of to_arrays; the pin table arrays are used without copying"""
+        nets = cls()
+        nets.net_names = decode_names(arrays["net_names"])
+        nets.net_degrees = arrays["net_degrees"].tolist()
+        nets.cell_names = decode_names(arrays["cell_names"])
+        nets.cell_idx = dict(zip(nets.cell_names, range(len(nets.cell_names))))
+        nets.io_names = decode_names(arrays["io_names"])
+        nets.io_idx = dict(zip(nets.io_names, range(len(nets.io_names))))
+        for key in (
+            "net_ptr",
+            "net_pins",
+            "pin_cell",
+            "pin_io",
+            "pin_number",
+            "pin_x",
+            "pin_y",
+            "cell_pin_ptr",
+            "cell_pins",
+        ):
+            setattr(nets, key, arrays[key])
+        return nets
 
-    def add_net(self, net_name: str, net_degree: int):
-        new_net = Net(net_name, net_degree)
-        self.net_dict[net_name] = new_net
+    def get_pins(self, cell_name: str) -> np.ndarray:
+        """pin ids of a cell, in order of first appearance"""
+        cell = self.cell_idx.get(cell_name)
+        if cell is None:
+            return self.cell_pins[:0]
+        return self.cell_pins[self.cell_pin_ptr[cell] : self.cell_pin_ptr[cell + 1]]
 
-    def assign_pin(self, pin_name: str, net_name: str):
-        self.net_dict[net_name].pin_names.append(pin_name)
 
-    def get_pins(self, cell_name: str) -> list[str]:
-        if cell_name not in self.pin_coord_dict:
-            return []
-        return list(self.pin_coord_dict[cell_name].values())
+def intern_names(
+    name_idx: dict[str, int], names: list[str], ids: np.ndarray, partial: bool
+) -> np.ndarray:
+    """maps local name ids to the global ids of name_idx, adding new names
 
+    Args:
+        name_idx (dict[str, int]): global name -> id, extended in place
+        names (list[str]): local id -> name, in order of first appearance
+        ids (np.ndarray): local ids in use
+        partial (bool): ids may use only some of names; unused names are then
+            not added to name_idx
 
-def read_net_input(nets_path: PurePath) -> Nets:
-    """reads placement input file and changes the location information of the object_db.
+    Returns:
+        np.ndarray: local id -> global id
+    """
+    local_ids = np.arange(len(names))
+    if partial:
+        _, heads = np.unique(ids, return_index=True)
+        local_ids = ids[np.sort(heads)]
+    local_names = [names[local_id] for local_id in local_ids.tolist()]
+    global_ids = np.fromiter(
+        map(name_idx.get, local_names, repeat(-1)), dtype=np.int64, count=len(local_names)
+    )
+    # names within a range are distinct, so new names are numbered in a row
+    is_new = np.flatnonzero(global_ids < 0)
+    global_ids[is_new] = np.arange(len(name_idx), len(name_idx) + len(is_new))
+    name_idx.update(
+        zip(
+            [local_names[new] for new in is_new.tolist()],
+            global_ids[is_new].tolist(),
+        )
+    )
+    local_to_global = np.full(len(names), -1, dtype=np.int64)
+    local_to_global[local_ids] = global_ids
+    return local_to_global
+
+
+class NetRecords:
+    """flat, column-wise contents of a *.nets file
+
+    Net k owns the pin records net_ptr[k] to net_ptr[k + 1] - 1. Cell and
+    direction names are interned per file range: pin_cell / pin_io are
+    indices into cell_names / io_names, which list the names in order of
+    first appearance. The columns are lists while parsing and NumPy arrays
+    once imported by from_arrays.
+    """
+
+    def __init__(self):
+        # NumNets / NumPins values declared in the file header
+        self.num_nets = 0
+        self.num_pins = 0
+
+        self.net_names: list[str] = []
+        self.net_degrees: list[int] = []
+        self.net_ptr: list[int] | np.ndarray = [0]
+        self.cell_names: list[str] = []
+        self.io_names: list[str] = []
+        # one entry per pin record, in file order
+        self.pin_cell: list[int] | np.ndarray = []
+        self.pin_io: list[int] | np.ndarray = []
+        self.pin_x: list[float] | np.ndarray = []
+        self.pin_y: list[float] | np.ndarray = []
+
+    def num_net_entry(self) -> int:
+        return len(self.net_names)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """returns every column, names included, as flat NumPy arrays"""
+        return {
+            "header": np.array([self.num_nets, self.num_pins], dtype=np.int64),
+            "net_names": encode_names(self.net_names),
+            "net_degrees": np.array(self.net_degrees, dtype=np.int64),
+            "net_ptr": np.array(self.net_ptr, dtype=np.int64),
+            "cell_names": encode_names(self.cell_names),
+            "io_names": encode_names(self.io_names),
+            "pin_cell": np.array(self.pin_cell, dtype=np.int32),
+            "pin_io": np.array(self.pin_io, dtype=np.int8),
+            "pin_x": np.array(self.pin_x, dtype=np.float64),
+            "pin_y": np.array(self.pin_y, dtype=np.float64),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "NetRecords":
+        """inverse of to_arrays; the pin columns are used without copying"""
+        records = cls()
+        records.num_nets, records.num_pins = arrays["header"].tolist()
+        records.net_names = decode_names(arrays["net_names"])
+        records.net_degrees = arrays["net_degrees"].tolist()
+        records.cell_names = decode_names(arrays["cell_names"])
+        records.io_names = decode_names(arrays["io_names"])
+        for key in ("net_ptr", "pin_cell", "pin_io", "pin_x", "pin_y"):
+            setattr(records, key, arrays[key])
+        return records
+
+    def num_pin_entry(self) -> int:
+        return len(self.pin_cell)
+
+
+# a net header at the start of a line; *.nets files may be cut right before it
+NET_HEADER_PATTERN = re.compile(rb"\nNetDegree\s")
+
+
+def find_net_ranges(
+    nets_path: PurePath, num_ranges: int
+) -> list[tuple[int, int | None]]:
+    """splits a net input file into byte ranges that each start at a net header
+
+    The first range also holds the file header (NumNets / NumPins). Fewer
+    ranges are returned when the file is too small to be cut num_ranges times,
+    and a single (0, None) range when it is compressed and cannot be seeked.
 
     Args:
-        pl_path (PurePath): *.pl
-        object_db (ObjectDB)
+        nets_path (PurePath): *.nets
+        num_ranges (int): number of ranges wanted
 
-    Raises:
-        ValueError: When an undefined node name exists in *.pl
-        ValueError: When a terminal node is not fixed in *.pl
+    Returns:
+        list[tuple[int, int | None]]: (start, end) byte offsets, in file order
     """
-    file = open(nets_path, "r")
-    line_idx = 0
-    nets = Nets()
+    if not is_plain(nets_path):
+        return [(0, None)]
+    file_size = os.path.getsize(nets_path)
+    bounds = [0]
+    with open(nets_path, "rb") as file:
+        for range_idx in range(1, num_ranges):
+            target = max(file_size * range_idx // num_ranges, bounds[-1], 1) - 1
+            file.seek(target)
+            window = b""
+            while True:
+                block = file.read(1 << 20)
+                # overlap the previous window so a header split between reads is found
+                window = window[-len("\nNetDegree "):] + block
+                match = NET_HEADER_PATTERN.search(window)
+                if match:
+                    bound = file.tell() - len(window) + match.start() + 1
+                    break
+                if not block:
+                    bound = file_size
+                    break
+            if bound >= file_size:
+                break
+            if bound > bounds[-1]:
+                bounds.append(bound)
+    bounds.append(file_size)
+    return list(zip(bounds[:-1], bounds[1:]))
 
-    num_nets, current_net = 0, 0
-    num_pins, current_pin = 0, 0
 
-    for line in file:
-        line_idx += 1
-        _line = line.strip()  # remove front & end whitespaces
-        words = _line.split()  # split the row by whitespace
+@gc_paused()
+def read_net_records(
+    nets_path: PurePath,
+    start: int = 0,
+    end: int | None = None,
+    first_line: int = 1,
+) -> NetRecords:
+    """tokenizes a net input file, or a byte range of it, into flat NetRecords
 
-        # skip empty lines
-        if not _line:
-            continue
-        # skip initial metadata lines
-        if words[0] in ["#", "UCLA"]:
-            continue
-        if line.startswith("NumNets"):
-            num_nets = int(line.split()[2])
-            continue
-        if line.startswith("NumPins"):
-            num_pins = int(line.split()[2])
-            continue
+    Args:
+        nets_path (PurePath): *.nets
+        start (int, optional): byte offset to start at; see find_net_ranges.
+            Defaults to 0.
+        end (int | None, optional): byte offset to stop at. Defaults to end of file.
+        first_line (int, optional): line number at `start`, for error messages.
+            Defaults to 1.
 
-        match len(line.split()):
-            case 4:
-                current_net += 1
-                _, _, net_degree_str, net_name = line.split()
-                nets.add_net(net_name, eval(net_degree_str))
+    Raises:
+        UserWarning: When a pin offset is not a number
+
+    Returns:
+        NetRecords
+    """
+    records = NetRecords()
+    net_names, net_degrees = records.net_names, records.net_degrees
+    net_ptr = records.net_ptr
+    pin_cell, pin_io = records.pin_cell, records.pin_io
+    pin_x, pin_y = records.pin_x, records.pin_y
+    # cell / direction name -> id within this range
+    cell_idx: dict[str, int] = {}
+    io_idx: dict[str, int] = {}
+    # pin offsets repeat a lot; parse each distinct literal only once
+    num_cache: dict[str, float] = {}
+
+    for line_idx, words in iter_bookshelf_words(
+        nets_path, start=start, end=end, first_line=first_line
+    ):
+        match len(words):
             case 5:
-                current_pin += 1
-                cell_name, io, _, x_offset_str, y_offset_str = line.split()
+                cell_name, io, _, x_offset_str, y_offset_str = words
                 try:
-                    pin_name = nets.add_pin(
-                        cell_name, io, eval(x_offset_str), eval(y_offset_str)
-                    )
-                    nets.assign_pin(pin_name, net_name)
+                    x_offset = num_cache.get(x_offset_str)
+                    if x_offset is None:
+                        x_offset = num_cache[x_offset_str] = float(x_offset_str)
+                    y_offset = num_cache.get(y_offset_str)
+                    if y_offset is None:
+                        y_offset = num_cache[y_offset_str] = float(y_offset_str)
                 except ValueError:
-                    print(line.split())
-                    raise UserWarning
-            case None:
-                break
+                    print(words)
+                    err_str = "*.nets Processing: invalid pin offset"
+                    err_str += f" at line {line_idx}\n"
+                    raise UserWarning(err_str)
+                cell = cell_idx.get(cell_name)
+                if cell is None:
+                    cell = cell_idx[cell_name] = len(cell_idx)
+                pin_cell.append(cell)
+                pin_io.append(io_idx.setdefault(io, len(io_idx)))
+                pin_x.append(x_offset)
+                pin_y.append(y_offset)
+            case 4:
+                if net_names:
+                    net_ptr.append(len(pin_cell))
+                else:
+                    # pins ahead of the first NetDegree row belong to no net
+                    net_ptr[0] = len(pin_cell)
+                net_names.append(words[3])
+                net_degrees.append(int(words[2]))
+            case 3:
+                if words[0] == "NumNets":
+                    records.num_nets = int(words[2])
+                elif words[0] == "NumPins":
+                    records.num_pins = int(words[2])
+
+    if net_names:
+        net_ptr.append(len(pin_cell))
+    records.cell_names = list(cell_idx)
+    records.io_names = list(io_idx)
+    return records
+
+
+def read_net_input(nets_path: PurePath, num_workers: int = 1) -> Nets:
+    """reads net input file and returns an instance of class Nets
+
+    Args:
+        nets_path (PurePath): *.nets
+        num_workers (int, optional): worker processes that parse byte ranges
+            of the file concurrently; 1 parses serially. Defaults to 1.
+
+    Raises:
+        UserWarning: When a pin offset is not a number
+
+    Returns:
+        Nets
+    """
+    if num_workers > 1:
+        # imported here: bookshelf_parallel builds on this module
+        from bookshelf_parallel import read_net_input_parallel
+
+        return read_net_input_parallel(nets_path, num_workers)
+
+    records = read_net_records(nets_path)
+    nets = Nets()
+    nets.add_records(records)
+    nets.finalize()
 
-    file.close()
     print("Nets file processing is done.")
+    check_net_counts(
+        records.num_nets,
+        records.num_net_entry(),
+        records.num_pins,
+        records.num_pin_entry(),
+    )
+    return nets
+
+
+def check_net_counts(num_nets: int, current_net: int, num_pins: int, current_pin: int):
+    """warns when the NumNets / NumPins header disagrees with the records read"""
     _str = f"The number of nets recorded in file {num_nets} is wrong; there are {current_net} nets"
     if num_nets != current_net:
         print(Warning(_str))
     _str = f"The number of pins recorded in file {num_pins} is wrong; there are {current_pin} pins"
     if num_pins != current_pin:
         print(Warning(_str))
-
-    return nets
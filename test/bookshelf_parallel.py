@@ -0,0 +1,229 @@
+"""Parallel loading of Bookshelf files
+
+Every input file is parsed in its own worker process. The parsed columns do
+not travel back pickled: a worker dumps them as raw arrays into a file in
+shared memory (/dev/shm) and the parent maps that file with np.memmap, so only
+a few bytes of layout metadata cross the process boundary.
+"""
+import os
+import tempfile
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import PurePath
+from typing import BinaryIO, Iterable
+
+import numpy as np
+
+from bookshelf_class import (
+    ArrayObjectDB,
+    NetRecords,
+    Nets,
+    Region,
+    check_net_counts,
+    count_lines,
+    find_net_ranges,
+    read_net_records,
+    read_node_input,
+    read_placement_input,
+    read_row_input,
+)
+from bookshelf_stream import estimated_text_size
+
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+# *.nets ranges handed out per worker; more ranges balance the load better
+RANGES_PER_WORKER = 4
+# smallest *.nets byte range worth a task of its own
+MIN_RANGE_SIZE = 8 << 20
+
+# (array key, dtype string, length, byte offset) per exported array
+ArrayLayout = list[tuple[str, str, int, int]]
+
+
+def write_arrays(file: BinaryIO, arrays: dict[str, np.ndarray]) -> ArrayLayout:
+    """writes 1-D arrays back to back from the current position of file
+
+    Returns:
+        ArrayLayout: where each array lives in the file
+    """
+    layout: ArrayLayout = []
+    offset = file.tell()
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        # keep every array aligned to its item size
+        padding = -offset % 8
+        file.write(bytes(padding))
+        offset += padding
+        layout.append((key, array.dtype.str, len(array), offset))
+        array.tofile(file)
+        offset += array.nbytes
+    return layout
+
+
+def map_arrays(
+    path: str, layout: ArrayLayout, mode: str = "r+"
+) -> dict[str, np.ndarray]:
+    """maps the arrays written by write_arrays without copying them"""
+    arrays: dict[str, np.ndarray] = {}
+    for key, dtype, length, offset in layout:
+        if length == 0:
+            # mmap cannot map zero bytes
+            arrays[key] = np.zeros(0, dtype=dtype)
+            continue
+        arrays[key] = np.memmap(
+            path, dtype=dtype, mode=mode, offset=offset, shape=(length,)
+        ).view(np.ndarray)
+    return arrays
+
+
+def export_arrays(arrays: dict[str, np.ndarray]) -> tuple[str, ArrayLayout]:
+    """writes 1-D arrays back to back into a new shared-memory file
+
+    Returns:
+        tuple[str, ArrayLayout]: file path and where each array lives in it
+    """
+    fd, path = tempfile.mkstemp(prefix="bookshelf_", suffix=".bin", dir=SHM_DIR)
+    with os.fdopen(fd, "wb") as file:
+        layout = write_arrays(file, arrays)
+    return path, layout
+
+
+def import_arrays(path: str, layout: ArrayLayout) -> dict[str, np.ndarray]:
+    """maps the arrays written by export_arrays without copying them
+
+    The file is unlinked right away; its memory is released together with
+    the last array that maps it.
+    """
+    try:
+        return map_arrays(path, layout)
+    finally:
+        os.unlink(path)
+
+
+def discard_exports(futures: Iterable[Future]):
+    """removes the shared-memory files of results that will not be imported"""
+    for future in futures:
+        try:
+            path, _ = future.result()
+            os.unlink(path)
+        except Exception:
+            pass
+
+
+def load_nodes_and_placement(
+    node_path: PurePath, pl_path: PurePath
+) -> tuple[str, ArrayLayout]:
+    # *.pl refers to nodes by name, so both files are read by the same worker
+    object_db = read_node_input(node_path, columnar=True)
+    read_placement_input(pl_path, object_db)
+    return export_arrays(object_db.to_arrays())
+
+
+def _load_net_records(
+    nets_path: PurePath, start: int = 0, end: int | None = None
+) -> tuple[str, ArrayLayout]:
+    return export_arrays(read_net_records(nets_path, start, end).to_arrays())
+
+
+def submit_net_ranges(
+    executor: Executor, nets_path: PurePath, num_workers: int
+) -> list[tuple[int, int | None, Future]]:
+    """submits one parse task per NetDegree-aligned byte range of *.nets"""
+    num_ranges = min(
+        num_workers * RANGES_PER_WORKER,
+        max(1, estimated_text_size(nets_path) // MIN_RANGE_SIZE),
+    )
+    return [
+        (start, end, executor.submit(_load_net_records, nets_path, start, end))
+        for start, end in find_net_ranges(nets_path, num_ranges)
+    ]
+
+
+def collect_net_ranges(
+    nets_path: PurePath, range_futures: list[tuple[int, int | None, Future]]
+) -> Nets:
+    """builds Nets from the parsed ranges, strictly in file order
+
+    Each range is added as soon as it arrives while later ranges are still
+    being parsed, so the nets, their order and the pin ids are exactly those
+    of the serial parser.
+    """
+    nets = Nets()
+    num_nets, current_net = 0, 0
+    num_pins, current_pin = 0, 0
+    for range_idx, (start, end, future) in enumerate(range_futures):
+        try:
+            records = NetRecords.from_arrays(import_arrays(*future.result()))
+        except UserWarning:
+            discard_exports(future for _, _, future in range_futures[range_idx + 1 :])
+            # reparse the range here to report the absolute line number
+            first_line = count_lines(nets_path, start) + 1
+            read_net_records(nets_path, start, end, first_line)
+            raise
+        except BaseException:
+            discard_exports(future for _, _, future in range_futures[range_idx + 1 :])
+            raise
+        nets.add_records(records)
+        # only the range at the top of the file holds the header
+        num_nets = records.num_nets or num_nets
+        num_pins = records.num_pins or num_pins
+        current_net += records.num_net_entry()
+        current_pin += records.num_pin_entry()
+    nets.finalize()
+
+    print("Nets file processing is done.")
+    check_net_counts(num_nets, current_net, num_pins, current_pin)
+    return nets
+
+
+def read_net_input_parallel(nets_path: PurePath, num_workers: int) -> Nets:
+    """reads *.nets by parsing byte ranges of it in worker processes
+
+    Returns:
+        Nets: identical to read_net_input(nets_path)
+    """
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        range_futures = submit_net_ranges(executor, nets_path, num_workers)
+        return collect_net_ranges(nets_path, range_futures)
+
+
+def read_bookshelf_files_parallel(
+    scl_path: PurePath,
+    node_path: PurePath,
+    pl_path: PurePath,
+    nets_path: PurePath,
+    default_row_height: int,
+    default_site_spacing: int,
+    num_workers: int | None = None,
+) -> tuple[Region, ArrayObjectDB, Nets]:
+    """reads *.scl, *.nodes + *.pl and *.nets concurrently in worker processes
+
+    *.nets is additionally cut into NetDegree-aligned byte ranges that are
+    parsed side by side. With fewer than three workers the tasks queue in the
+    order their results are awaited.
+
+    Args:
+        num_workers (int | None, optional): worker processes.
+            Defaults to the number of CPUs.
+
+    Returns:
+        tuple[Region, ArrayObjectDB, Nets]
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        nodes_future = executor.submit(load_nodes_and_placement, node_path, pl_path)
+        # a Region is a few lists of row coordinates: cheap to pickle
+        region_future = executor.submit(
+            read_row_input, scl_path, default_row_height, default_site_spacing
+        )
+        range_futures = submit_net_ranges(executor, nets_path, num_workers)
+
+        try:
+            object_db = ArrayObjectDB.from_arrays(
+                import_arrays(*nodes_future.result())
+            )
+            region = region_future.result()
+        except BaseException:
+            discard_exports(future for _, _, future in range_futures)
+            raise
+        nets = collect_net_ranges(nets_path, range_futures)
+
+    return region, object_db, nets
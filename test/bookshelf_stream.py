@@ -0,0 +1,292 @@
+"""Reading compressed and archived Bookshelf inputs as if they were plain files
+
+An input path may name
+- a plain file,
+- a file compressed with gzip, bzip2, xz or zstd, by its full name
+  (design.nets.gz) or by the plain name *.aux lists (design.nets, when only
+  design.nets.gz exists), or
+- a member of a tar archive, compressed or not, by a path through the archive
+  as if it were a directory: ispd2005/adaptec1.tar.gz/adaptec1/adaptec1.aux.
+  Relative names in such a *.aux resolve to members of the same archive.
+
+Compressed inputs are decompressed by a background thread a few blocks ahead
+of the parser; zlib, bz2, lzma and zstandard release the GIL while they work,
+so decompression overlaps with parsing and nothing is staged on disk.
+zstd needs the optional zstandard package.
+"""
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import tarfile
+import threading
+from pathlib import PurePath
+from typing import BinaryIO, TextIO
+
+try:
+    import zstandard
+except ImportError:  # optional; only *.zst inputs need it
+    zstandard = None
+
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zst")
+TAR_SUFFIXES = (".tar", ".tgz", ".tbz2", ".txz")
+# decompressed bytes per block handed from the background thread; the block
+# size of the Bookshelf tokenizer, so that its reads take whole blocks
+STREAM_BLOCK_SIZE = 1 << 24
+# blocks decompressed ahead of the reader at most
+STREAM_QUEUE_BLOCKS = 2
+# rough size ratio of Bookshelf text to its compressed file, where the
+# compressed format does not record the original size
+COMPRESSION_RATIO_GUESS = 6.0
+
+
+def is_tar_name(name: str) -> bool:
+    name = name.lower()
+    for suffix in COMPRESSED_SUFFIXES:
+        name = name.removesuffix(suffix)
+    return name.endswith(TAR_SUFFIXES)
+
+
+def split_archive_path(path: PurePath) -> tuple[PurePath, str] | None:
+    """(tar archive, member name) when path runs through a tar archive"""
+    path = PurePath(path)
+    for archive in path.parents:
+        if is_tar_name(archive.name) and os.path.isfile(archive):
+            return archive, path.relative_to(archive).as_posix()
+    return None
+
+
+def compression_of(path: PurePath) -> str | None:
+    """compression suffix of a file outside archives, e.g. ".gz"; None if plain"""
+    path = PurePath(path)
+    return path.suffix if path.suffix in COMPRESSED_SUFFIXES else None
+
+
+def is_plain(path: PurePath) -> bool:
+    """tells whether path is an uncompressed file, so it can be seeked in"""
+    return compression_of(path) is None and split_archive_path(path) is None
+
+
+def resolve_input(path: PurePath) -> PurePath:
+    """path itself if it exists, otherwise the compressed file there is of it
+
+    Archive members are taken as they are: looking for them would mean reading
+    the archive. A path that exists in no form is returned unchanged, so that
+    opening it fails with the usual error.
+    """
+    path = PurePath(path)
+    if os.path.exists(path) or split_archive_path(path) is not None:
+        return path
+    for suffix in COMPRESSED_SUFFIXES:
+        compressed = PurePath(f"{path}{suffix}")
+        if os.path.exists(compressed):
+            return compressed
+    return path
+
+
+def local_path_of(path: PurePath) -> PurePath:
+    """the plain path outputs derived from an input are named after
+
+    Compression suffixes are dropped, and a path in an archive is moved next
+    to the archive: ispd/adaptec1.tar.gz/adaptec1/adaptec1.aux ->
+    ispd/adaptec1.aux.
+    """
+    path = PurePath(path)
+    split = split_archive_path(path)
+    if split is not None:
+        path = PurePath(split[0].parent, path.name)
+    if compression_of(path) is not None:
+        path = path.with_suffix("")
+    return path
+
+
+def on_disk_path(path: PurePath) -> PurePath:
+    """the file holding path: the archive of a member, otherwise path itself"""
+    path = PurePath(path)
+    split = split_archive_path(path)
+    return path if split is None else split[0]
+
+
+def estimated_text_size(path: PurePath) -> int:
+    """uncompressed size of an input; estimated where the format hides it
+
+    A member of an archive counts as the whole archive.
+    """
+    path = PurePath(path)
+    disk_path = on_disk_path(path)
+    size = os.path.getsize(disk_path)
+    if disk_path.suffix == ".gz" and disk_path == path and size >= 4:
+        # gzip trailer: original size modulo 2^32
+        with open(disk_path, "rb") as file:
+            file.seek(-4, os.SEEK_END)
+            return int.from_bytes(file.read(4), "little")
+    if compression_of(disk_path) is not None:
+        return int(size * COMPRESSION_RATIO_GUESS)
+    return size
+
+
+def open_decompressed(path: PurePath) -> BinaryIO:
+    """file object of the decompressed content of a (compressed) file"""
+    match compression_of(path):
+        case ".gz":
+            return gzip.open(path, "rb")
+        case ".bz2":
+            return bz2.open(path, "rb")
+        case ".xz":
+            return lzma.open(path, "rb")
+        case ".zst":
+            if zstandard is None:
+                raise ImportError(f"reading {path} needs the zstandard package")
+            return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+    return open(path, "rb")
+
+
+class ArchiveMember(io.RawIOBase):
+    """one member of a tar archive, read in one pass over the archive stream"""
+
+    def __init__(self, archive: PurePath, member_name: str):
+        # *.tar.<suffix> is decompressed here; tarfile detects *.tgz and the like
+        self.source = open_decompressed(archive)
+        self.tar = tarfile.open(fileobj=self.source, mode="r|*")
+        self.member = None
+        wanted = os.path.normpath(member_name)
+        for member in self.tar:
+            if os.path.normpath(member.name) == wanted and member.isfile():
+                self.member = self.tar.extractfile(member)
+                break
+        if self.member is None:
+            self.close()
+            raise FileNotFoundError(f"no member {member_name} in {archive}")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.member.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self.tar.close()
+            self.source.close()
+        super().close()
+
+
+class BackgroundReader(io.RawIOBase):
+    """reads a stream ahead in a background thread
+
+    The thread keeps up to queue_blocks blocks of block_size bytes ready;
+    read() and readinto() take from those blocks, and a read of a whole block
+    gets the block itself without a copy. An error of the thread is raised
+    again by the read that reaches it.
+    """
+
+    def __init__(
+        self,
+        source: BinaryIO,
+        block_size: int = STREAM_BLOCK_SIZE,
+        queue_blocks: int = STREAM_QUEUE_BLOCKS,
+    ):
+        self.source = source
+        self.block_size = block_size
+        self.blocks: queue.Queue[bytes | BaseException] = queue.Queue(queue_blocks)
+        self.stopping = threading.Event()
+        # the block being read and the position in it
+        self.block = b""
+        self.pos = 0
+        self.at_end = False
+        self.thread = threading.Thread(target=self.fill, daemon=True)
+        self.thread.start()
+
+    def put(self, item: bytes | BaseException) -> bool:
+        """False when the reader was closed meanwhile"""
+        while not self.stopping.is_set():
+            try:
+                self.blocks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fill(self):
+        try:
+            while block := self.source.read(self.block_size):
+                if not self.put(block):
+                    return
+            self.put(b"")
+        except BaseException as err:
+            self.put(err)
+
+    def readable(self) -> bool:
+        return True
+
+    def next_block(self) -> bool:
+        """False at the end of the stream"""
+        if self.at_end:
+            return False
+        block = self.blocks.get()
+        if isinstance(block, BaseException):
+            self.at_end = True
+            raise block
+        if not block:
+            self.at_end = True
+            return False
+        self.block, self.pos = block, 0
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self.pos == len(self.block) and not self.next_block():
+            return 0
+        num = min(len(buffer), len(self.block) - self.pos)
+        buffer[:num] = self.block[self.pos : self.pos + num]
+        self.pos += num
+        return num
+
+    def read(self, size: int = -1) -> bytes:
+        """up to size bytes, fewer only at the end; everything left if size < 0"""
+        chunks: list[bytes] = []
+        while size != 0:
+            if self.pos == len(self.block) and not self.next_block():
+                break
+            if self.pos == 0 and (size < 0 or size >= len(self.block)):
+                chunk = self.block
+            else:
+                end = len(self.block) if size < 0 else self.pos + size
+                chunk = self.block[self.pos : end]
+            self.pos += len(chunk)
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+    def close(self):
+        if not self.closed:
+            self.stopping.set()
+            self.thread.join()
+            self.source.close()
+        super().close()
+
+
+def open_input(path: PurePath) -> BinaryIO:
+    """opens an input for binary reading, decompressing it in the background
+
+    Only plain files are seekable.
+    """
+    path = resolve_input(path)
+    split = split_archive_path(path)
+    if split is not None:
+        return BackgroundReader(ArchiveMember(*split))
+    if compression_of(path) is None:
+        return open(path, "rb")
+    return BackgroundReader(open_decompressed(path))
+
+
+def open_text_input(path: PurePath) -> TextIO:
+    """open_input for reading text lines"""
+    file = open_input(path)
+    if isinstance(file, BackgroundReader):
+        file = io.BufferedReader(file)
+    return io.TextIOWrapper(file)
@@ -0,0 +1,384 @@
+"""Synthetic Bookshelf designs of any size, for benchmarking
+
+A design is drawn from a small random cell library, the way a synthesized
+netlist is: standard cells of one row height, movable macros of several rows
+and fixed terminals (I/O pads). Every node has the pins of its cell type, and
+all pins are dealt out to nets whose degrees follow a given distribution.
+Nodes of one cell type therefore share a macro in the LEF, as in real data.
+
+    python bookshelf_synth.py out_dir/ design --pins 1M
+"""
+import argparse
+import math
+import os
+from pathlib import PurePath
+
+import numpy as np
+
+from bookshelf_class import DEFAULT_ROW_HEIGHT, DEFAULT_SITE_SPACING
+from from_bookshelf_to_lefdef import write_chunked
+
+# net degree -> relative frequency, roughly that of the ISPD 2005 designs
+DEFAULT_DEGREE_WEIGHTS = {
+    2: 60,
+    3: 15,
+    4: 8,
+    5: 5,
+    6: 3,
+    8: 3,
+    12: 3,
+    24: 2,
+    64: 1,
+}
+# fractions of the nodes that are macros and terminals
+DEFAULT_MACRO_RATIO = 0.001
+DEFAULT_TERMINAL_RATIO = 0.01
+# movable area / core area
+DEFAULT_UTILIZATION = 0.7
+# cell types per node kind
+NUM_CELL_TYPES = 32
+NUM_MACRO_TYPES = 4
+NUM_TERMINAL_TYPES = 2
+
+# node kinds
+CELL, MACRO, TERMINAL = 0, 1, 2
+IO_CHARS = ("I", "O", "B")
+
+
+def parse_count(count_str: str) -> int:
+    """10k -> 10000, 2.5M -> 2500000"""
+    scale = {"k": 10**3, "m": 10**6, "g": 10**9}.get(count_str[-1].lower())
+    if scale is None:
+        return int(count_str)
+    return int(float(count_str[:-1]) * scale)
+
+
+def parse_degree_weights(weights_str: str) -> dict[int, float]:
+    """"2:60,3:15,8:5" -> {2: 60.0, 3: 15.0, 8: 5.0}"""
+    weights: dict[int, float] = {}
+    for item in weights_str.split(","):
+        degree, _, weight = item.partition(":")
+        if int(degree) < 2 or float(weight) < 0:
+            raise ValueError(f"Invalid net degree weight {item}")
+        weights[int(degree)] = float(weight)
+    return weights
+
+
+class CellLibrary:
+    """cell types of all node kinds; pins of type t are pin_ptr[t] to pin_ptr[t + 1] - 1"""
+
+    def __init__(self, rng: np.random.Generator, row_height: int):
+        kinds: list[int] = []
+        widths: list[int] = []
+        heights: list[int] = []
+        pin_counts: list[int] = []
+        for _ in range(NUM_CELL_TYPES):
+            num_pins = int(rng.integers(2, 7))
+            kinds.append(CELL)
+            widths.append(num_pins * 2 + int(rng.integers(0, 6)))
+            heights.append(row_height)
+            pin_counts.append(num_pins)
+        for _ in range(NUM_MACRO_TYPES):
+            kinds.append(MACRO)
+            widths.append(int(rng.integers(4, 20)) * row_height)
+            heights.append(int(rng.integers(4, 20)) * row_height)
+            pin_counts.append(int(rng.integers(16, 129)))
+        for _ in range(NUM_TERMINAL_TYPES):
+            kinds.append(TERMINAL)
+            widths.append(1)
+            heights.append(1)
+            pin_counts.append(1)
+
+        self.kind = np.array(kinds, dtype=np.int8)
+        self.width = np.array(widths, dtype=np.int64)
+        self.height = np.array(heights, dtype=np.int64)
+        self.pin_ptr = np.zeros(len(kinds) + 1, dtype=np.int64)
+        np.cumsum(pin_counts, out=self.pin_ptr[1:])
+
+        # pin offsets from the cell center, on a half-unit grid
+        pin_type = np.repeat(np.arange(len(kinds)), pin_counts)
+        half_width = self.width[pin_type] / 2
+        half_height = self.height[pin_type] / 2
+        # (+ 0.0 turns -0.0 into 0.0)
+        self.pin_x = np.round(rng.uniform(-half_width, half_width) * 2) / 2 + 0.0
+        self.pin_y = np.round(rng.uniform(-half_height, half_height) * 2) / 2 + 0.0
+        # the first pin of a standard cell drives, the others are inputs;
+        # macro pins have any direction, terminal pins are bidirectional
+        self.pin_io = np.zeros(len(pin_type), dtype=np.int8)
+        self.pin_io[self.pin_ptr[:-1][self.kind == CELL]] = 1
+        is_macro_pin = self.kind[pin_type] == MACRO
+        self.pin_io[is_macro_pin] = rng.integers(0, 3, int(is_macro_pin.sum()))
+        self.pin_io[self.kind[pin_type] == TERMINAL] = 2
+
+    def types_of(self, kind: int) -> np.ndarray:
+        return np.flatnonzero(self.kind == kind)
+
+    def mean_pins(self, kind: int) -> float:
+        return float(np.diff(self.pin_ptr)[self.types_of(kind)].mean())
+
+
+class SyntheticDesign:
+    """a placed random netlist; node columns in *.nodes order, terminals last
+
+    Pins are numbered node by node; net k holds pins net_pins[net_ptr[k]] to
+    net_pins[net_ptr[k + 1] - 1], node_pin_ptr maps a node to its first pin.
+    """
+
+    def __init__(
+        self,
+        num_pins: int,
+        degree_weights: dict[int, float] | None = None,
+        macro_ratio: float = DEFAULT_MACRO_RATIO,
+        terminal_ratio: float = DEFAULT_TERMINAL_RATIO,
+        utilization: float = DEFAULT_UTILIZATION,
+        num_rows: int | None = None,
+        seed: int = 0,
+        row_height: int = DEFAULT_ROW_HEIGHT,
+        site_spacing: int = DEFAULT_SITE_SPACING,
+    ):
+        if not 0 <= macro_ratio + terminal_ratio < 1:
+            raise ValueError("Macro and terminal ratios must sum to less than 1")
+        self.row_height = row_height
+        self.site_spacing = site_spacing
+        rng = np.random.default_rng(seed)
+        library = CellLibrary(rng, row_height)
+        self.library = library
+
+        # nodes: enough of them for num_pins pins, in *.nodes order
+        cell_ratio = 1 - macro_ratio - terminal_ratio
+        mean_pins = (
+            cell_ratio * library.mean_pins(CELL)
+            + macro_ratio * library.mean_pins(MACRO)
+            + terminal_ratio * library.mean_pins(TERMINAL)
+        )
+        num_nodes = max(2, round(num_pins / mean_pins))
+        self.num_terminals = round(num_nodes * terminal_ratio)
+        num_movable = num_nodes - self.num_terminals
+        kinds = np.full(num_nodes, TERMINAL, dtype=np.int8)
+        is_macro = rng.random(num_movable) < macro_ratio / (1 - terminal_ratio)
+        kinds[:num_movable] = np.where(is_macro, MACRO, CELL)
+        self.node_type = np.empty(num_nodes, dtype=np.int64)
+        for kind in (CELL, MACRO, TERMINAL):
+            is_kind = kinds == kind
+            self.node_type[is_kind] = rng.choice(
+                library.types_of(kind), int(is_kind.sum())
+            )
+        self.width = library.width[self.node_type]
+        self.height = library.height[self.node_type]
+
+        # pins, node by node
+        pin_counts = np.diff(library.pin_ptr)[self.node_type]
+        self.node_pin_ptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(pin_counts, out=self.node_pin_ptr[1:])
+        total_pins = int(self.node_pin_ptr[-1])
+        self.pin_node = np.repeat(np.arange(num_nodes), pin_counts)
+        pin_of_type = (
+            np.arange(total_pins)
+            - self.node_pin_ptr[self.pin_node]
+            + library.pin_ptr[self.node_type[self.pin_node]]
+        )
+        self.pin_x = library.pin_x[pin_of_type]
+        self.pin_y = library.pin_y[pin_of_type]
+        self.pin_io = library.pin_io[pin_of_type]
+
+        # nets: all pins in random order, cut by degrees drawn from the weights
+        self.net_ptr = self.draw_net_ptr(rng, total_pins, degree_weights)
+        self.net_pins = rng.permutation(total_pins)
+
+        # core: a square of the movable area over the utilization
+        movable_area = float((self.width * self.height)[: self.num_movable()].sum())
+        side = math.sqrt(movable_area / utilization)
+        self.num_rows = num_rows or max(1, math.ceil(side / row_height))
+        core_width = max(
+            int(self.width.max()),
+            math.ceil(movable_area / utilization / (self.num_rows * row_height)),
+        )
+        self.num_sites = math.ceil(core_width / site_spacing)
+        self.place(rng)
+
+    @staticmethod
+    def draw_net_ptr(
+        rng: np.random.Generator,
+        total_pins: int,
+        degree_weights: dict[int, float] | None,
+    ) -> np.ndarray:
+        weights = degree_weights or DEFAULT_DEGREE_WEIGHTS
+        degrees = np.array(list(weights), dtype=np.int64)
+        probs = np.array(list(weights.values()), dtype=np.float64)
+        probs /= probs.sum()
+        mean_degree = float(degrees @ probs)
+        draws = rng.choice(degrees, int(total_pins / mean_degree * 1.1) + 16, p=probs)
+        while draws.sum() < total_pins:
+            draws = np.concatenate([draws, rng.choice(degrees, len(draws), p=probs)])
+        net_ptr = np.concatenate([[0], np.cumsum(draws)])
+        num_nets = int(np.searchsorted(net_ptr, total_pins))
+        net_ptr = net_ptr[: num_nets + 1]
+        net_ptr[-1] = total_pins
+        if num_nets > 1 and net_ptr[-1] - net_ptr[-2] < 2:
+            # no single-pin net: the last one joins the one before
+            net_ptr = np.delete(net_ptr, -2)
+        return net_ptr
+
+    def place(self, rng: np.random.Generator):
+        """random site- and row-aligned locations; terminals on the core boundary"""
+        num_movable = self.num_movable()
+        core_width = self.num_sites * self.site_spacing
+        core_height = self.num_rows * self.row_height
+        x_span = np.maximum(core_width - self.width[:num_movable], 0) + 1
+        y_span = np.maximum(self.num_rows - self.height[:num_movable] // self.row_height, 0)
+        self.lx = np.empty(self.num_nodes(), dtype=np.int64)
+        self.ly = np.empty(self.num_nodes(), dtype=np.int64)
+        self.lx[:num_movable] = rng.integers(0, x_span)
+        self.ly[:num_movable] = rng.integers(0, y_span + 1) * self.row_height
+
+        # terminals: a random position along the boundary, counterclockwise
+        # from the lower left corner
+        position = rng.integers(0, 2 * (core_width + core_height), self.num_terminals)
+        x = np.clip(position, 0, core_width)
+        position -= x
+        y = np.clip(position, 0, core_height)
+        position -= y
+        x -= np.clip(position, 0, core_width)
+        position -= np.clip(position, 0, core_width)
+        y -= position
+        self.lx[num_movable:] = x
+        self.ly[num_movable:] = y
+
+    def num_nodes(self) -> int:
+        return len(self.node_type)
+
+    def num_movable(self) -> int:
+        return self.num_nodes() - self.num_terminals
+
+    def num_nets(self) -> int:
+        return len(self.net_ptr) - 1
+
+    def num_pins(self) -> int:
+        return len(self.pin_node)
+
+    def summary(self) -> dict[str, int]:
+        return {
+            "nodes": self.num_nodes(),
+            "terminals": self.num_terminals,
+            "macros": int((self.library.kind[self.node_type] == MACRO).sum()),
+            "nets": self.num_nets(),
+            "pins": self.num_pins(),
+            "rows": self.num_rows,
+        }
+
+
+def iter_scl(design: SyntheticDesign):
+    yield f"UCLA scl 1.0\n# synthetic\n\nNumRows : {design.num_rows}\n\n"
+    for row_idx in range(design.num_rows):
+        yield (
+            "CoreRow Horizontal\n"
+            f"  Coordinate    :   {row_idx * design.row_height}\n"
+            f"  Height        :   {design.row_height}\n"
+            "  Sitewidth     :    1\n"
+            f"  Sitespacing   :    {design.site_spacing}\n"
+            "  Siteorient    :    1\n"
+            "  Sitesymmetry  :    1\n"
+            f"  SubrowOrigin  :   0\tNumSites  :  {design.num_sites}\n"
+            "End\n"
+        )
+
+
+def iter_nodes(design: SyntheticDesign):
+    yield "UCLA nodes 1.0\n# synthetic\n\n"
+    yield f"NumNodes : \t{design.num_nodes()}\nNumTerminals : \t{design.num_terminals}\n"
+    num_movable = design.num_movable()
+    for node_idx, (dx, dy) in enumerate(
+        zip(design.width.tolist(), design.height.tolist())
+    ):
+        if node_idx < num_movable:
+            yield f"\to{node_idx}\t{dx}\t{dy}\n"
+        else:
+            yield f"\to{node_idx}\t{dx}\t{dy}\tterminal\n"
+
+
+def iter_pl(design: SyntheticDesign):
+    yield "UCLA pl 1.0\n# synthetic\n\n"
+    num_movable = design.num_movable()
+    for node_idx, (x, y) in enumerate(zip(design.lx.tolist(), design.ly.tolist())):
+        if node_idx < num_movable:
+            yield f"o{node_idx}\t{x}\t{y}\t: N\n"
+        else:
+            yield f"o{node_idx}\t{x}\t{y}\t: N /FIXED\n"
+
+
+def iter_nets(design: SyntheticDesign):
+    yield "UCLA nets 1.0\n# synthetic\n\n"
+    yield f"NumNets : {design.num_nets()}\nNumPins : {design.num_pins()}\n\n"
+    net_ptr = design.net_ptr.tolist()
+    net_pins = design.net_pins
+    pin_lines = [
+        f"\to{node}\t{IO_CHARS[io]} : {x:.6f}\t{y:.6f}\n"
+        for node, io, x, y in zip(
+            design.pin_node[net_pins].tolist(),
+            design.pin_io[net_pins].tolist(),
+            design.pin_x[net_pins].tolist(),
+            design.pin_y[net_pins].tolist(),
+        )
+    ]
+    for net_idx in range(len(net_ptr) - 1):
+        start, end = net_ptr[net_idx], net_ptr[net_idx + 1]
+        yield f"NetDegree : {end - start}   n{net_idx}\n"
+        yield "".join(pin_lines[start:end])
+
+
+def write_bookshelf(design: SyntheticDesign, out_dir: PurePath, name: str) -> PurePath:
+    """writes <name>.aux and the files it lists into out_dir
+
+    Returns:
+        PurePath: path to the *.aux file
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with open(PurePath(out_dir, f"{name}.aux"), "w") as file:
+        file.write(
+            f"RowBasedPlacement :  {name}.nodes  {name}.nets  {name}.wts"
+            f"  {name}.pl  {name}.scl\n"
+        )
+    with open(PurePath(out_dir, f"{name}.wts"), "w") as file:
+        file.write("UCLA wts 1.0\n# synthetic\n")
+    for suffix, records in (
+        ("scl", iter_scl(design)),
+        ("nodes", iter_nodes(design)),
+        ("pl", iter_pl(design)),
+        ("nets", iter_nets(design)),
+    ):
+        with open(PurePath(out_dir, f"{name}.{suffix}"), "w") as file:
+            write_chunked(file, records)
+    return PurePath(out_dir, f"{name}.aux")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic Bookshelf design")
+    parser.add_argument("out_dir", help="directory for the design files")
+    parser.add_argument("name", help="design name, e.g. synth_1m")
+    parser.add_argument(
+        "--pins", default="100k", help="about this many pins, e.g. 10k, 2.5M"
+    )
+    parser.add_argument(
+        "--degrees",
+        default=None,
+        help="net degree weights, e.g. 2:60,3:15,4:8,16:2 (default: ISPD-like)",
+    )
+    parser.add_argument("--macro-ratio", type=float, default=DEFAULT_MACRO_RATIO)
+    parser.add_argument("--terminal-ratio", type=float, default=DEFAULT_TERMINAL_RATIO)
+    parser.add_argument("--utilization", type=float, default=DEFAULT_UTILIZATION)
+    parser.add_argument(
+        "--rows", type=int, default=None, help="default: a square core"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    design = SyntheticDesign(
+        parse_count(args.pins),
+        parse_degree_weights(args.degrees) if args.degrees else None,
+        args.macro_ratio,
+        args.terminal_ratio,
+        args.utilization,
+        args.rows,
+        args.seed,
+    )
+    aux_path = write_bookshelf(design, PurePath(args.out_dir), args.name)
+    print(f"{aux_path}: {design.summary()}")
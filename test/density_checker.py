@@ -0,0 +1,124 @@
+"""Density overflow scoring of a Bookshelf placement
+reference: check_density_target.pl from ISPD 2006
+"""
+import argparse
+from pathlib import PurePath
+
+import numpy as np
+
+from bookshelf_class import (
+    DEFAULT_ROW_HEIGHT,
+    DEFAULT_SITE_SPACING,
+    ArrayObjectDB,
+    BookshelfPaths,
+    CMap,
+    ObjectDB,
+    Region,
+    make_c_map,
+    read_node_input,
+    read_placement_input,
+    read_row_input,
+)
+
+# default density target
+DENSITY_TARGET = 0.5
+# default bin size = 10 circuit row height x 10 circuit row height
+BIN_ROW_FACTOR = 10
+
+
+class DensityReport:
+    """density overflow of one placement
+
+    For every bin, free space = max(0, cap - FUSAGE) and
+    overflow = max(0, MUSAGE - density_target * free space).
+    The scaled overflow per bin normalizes the total overflow by the total
+    movable area and expresses it in units of one bin's target capacity:
+    total_overflow / total_movable_area * bin_area * density_target.
+    """
+
+    def __init__(self, c_map: CMap, density_target: float, total_movable_area: int):
+        self.density_target = density_target
+        self.num_bins = c_map.x_dim * c_map.y_dim
+        self.bin_area = c_map.x_unit * c_map.y_unit
+        self.total_movable_area = total_movable_area
+
+        free_space = np.maximum(c_map.cap - c_map.f_usage, 0)
+        overflow = np.maximum(c_map.m_usage - density_target * free_space, 0)
+        self.total_overflow = float(overflow.sum())
+        self.num_overflow_bins = int(np.count_nonzero(overflow))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            density = np.where(free_space > 0, c_map.m_usage / free_space, 0)
+        self.max_density = float(density.max()) if density.size else 0.0
+
+    @property
+    def overflow_ratio(self) -> float:
+        if not self.total_movable_area:
+            return 0.0
+        return self.total_overflow / self.total_movable_area
+
+    @property
+    def scaled_overflow_per_bin(self) -> float:
+        return self.overflow_ratio * self.bin_area * self.density_target
+
+    def print_summary(self):
+        print(f"Density target: {self.density_target}")
+        print(f"\tTotal {self.num_bins} bins of area {self.bin_area}")
+        print(f"\tOverflowing bins: {self.num_overflow_bins}")
+        print(f"\tMax density: {self.max_density:.4f}")
+        print(f"\tTotal overflow: {self.total_overflow:.1f}")
+        print(f"\tOverflow ratio: {self.overflow_ratio:.6f}")
+        print(f"\tScaled overflow per bin: {self.scaled_overflow_per_bin:.4f}")
+
+
+def check_density_target(
+    region: Region,
+    object_db: ObjectDB | ArrayObjectDB,
+    density_target: float = DENSITY_TARGET,
+    bin_row_factor: int = BIN_ROW_FACTOR,
+) -> DensityReport:
+    """scores the current node locations of object_db against density_target
+
+    Args:
+        region (Region)
+        object_db (ObjectDB | ArrayObjectDB): placed nodes
+        density_target (float, optional): Defaults to DENSITY_TARGET.
+        bin_row_factor (int, optional): bin side in rows. Defaults to BIN_ROW_FACTOR.
+
+    Returns:
+        DensityReport
+    """
+    c_map = make_c_map(region, region.default_row_height, bin_row_factor)
+    c_map.fill_usage(object_db)
+    return DensityReport(c_map, density_target, object_db.total_movable_area)
+
+
+def main(
+    aux_path_str: str,
+    pl_path_str: str | None = None,
+    density_target: float = DENSITY_TARGET,
+    bin_row_factor: int = BIN_ROW_FACTOR,
+) -> DensityReport:
+    paths = BookshelfPaths(PurePath(aux_path_str))
+    pl_path = PurePath(pl_path_str) if pl_path_str else paths.pl
+
+    region = read_row_input(paths.scl, DEFAULT_ROW_HEIGHT, DEFAULT_SITE_SPACING)
+    object_db = read_node_input(paths.nodes, columnar=True)
+    read_placement_input(pl_path, object_db)
+
+    report = check_density_target(region, object_db, density_target, bin_row_factor)
+    report.print_summary()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Density overflow of a Bookshelf placement (ISPD 2006 style)"
+    )
+    parser.add_argument("aux", help="*.aux file for Bookshelf format data")
+    parser.add_argument(
+        "pl", nargs="?", default=None, help="solution *.pl (default: from *.aux)"
+    )
+    parser.add_argument("-d", "--density", type=float, default=DENSITY_TARGET)
+    parser.add_argument("-b", "--bin-row-factor", type=int, default=BIN_ROW_FACTOR)
+    args = parser.parse_args()
+    main(args.aux, args.pl, args.density, args.bin_row_factor)
@@ -1,18 +1,22 @@
+import argparse
 import datetime
+import gzip
+import hashlib
+import json
 import logging
+import os
+import shutil
 import sys
 from pathlib import PurePath
+from typing import Iterable, Iterator, TextIO
 
-from bookshelf_class import (
-    read_net_input,
-    read_node_input,
-    read_placement_input,
-    read_row_input,
-)
-from macro_component_maker import (
-    PhysDesignData,
-    make_macros_and_components_from_bookshelf,
-)
+from bookshelf_class import BookshelfPaths
+from bookshelf_cache import cached_stamps, load_cache, save_cache, source_stamps
+from bookshelf_parallel import read_bookshelf_files_parallel
+from bookshelf_stream import local_path_of
+from lefdef_class import Component
+from macro_component_maker import PhysDesignData, make_components_from_bookshelf
+from stage_trace import StageTracer, trace_stage
 
 
 def proper_round(num, dec=0) -> float:
@@ -31,86 +35,89 @@ def proper_round(num, dec=0) -> float:
     return float(num[:-1])
 
 
-def read_bookshelf(aux_path: PurePath) -> PhysDesignData:
+def read_bookshelf(
+    aux_path: PurePath,
+    columnar: bool = False,
+    parallel: bool = False,
+    num_workers: int | None = None,
+    use_cache: bool = True,
+) -> PhysDesignData:
     """Read Bookshelf format data
     reference: check_density_target.pl from ISPD 2006
 
     Args:
         aux_path (PurePath): path to *.aux file
+        columnar (bool, optional): store nodes in an array-backed ArrayObjectDB.
+            Defaults to False.
+        parallel (bool, optional): parse the files in worker processes;
+            implies columnar. Defaults to False.
+        num_workers (int | None, optional): worker processes for parallel.
+            Defaults to the number of CPUs.
+        use_cache (bool, optional): load the parsed files from the binary cache
+            next to the *.aux file (see bookshelf_cache); a cached design is
+            always columnar. Defaults to True.
 
     Returns:
-        PhysDesignData
+        PhysDesignData: without cache or parallel, each file is read only
+            when its part is first accessed; see save_to_cache
     """
-    # DO NOT CHANGE. All circuit row height is 12
-    default_row_height = 12
-    default_site_spacing = 1
-    # default density target
-    # density_target = 0.5
-    # default bin size = 10 circuit row height x 10 circuit row height
-    # bin_row_factor = 10
-
-    # from .aux read filenames
-    filename_list: list[str] = []
-    with open(aux_path) as file:
-        row = file.readline()
-        filename_list = row.split()
-    scl_path = PurePath(aux_path.parent, filename_list[6])
-    node_path = PurePath(aux_path.parent, filename_list[2])
-    pl_path = PurePath(aux_path.parent, filename_list[5])
-    nets_path = PurePath(aux_path.parent, filename_list[3])
-
-    # 병렬화 시도했으나, 오히려 더 느림
-    # from concurrent.futures import ProcessPoolExecutor
-    # func_list = [read_net_input, read_node_input, read_row_input]
-    # args_list = [[nets_path], [node_path], [scl_path, default_row_height]]
-    # futures = []
-    # results = []
-
-    # with ProcessPoolExecutor(max_workers=3) as executor:
-    #     for func, args in zip(func_list, args_list):
-    #         futures.append(executor.submit(func, *args))
-    #     for future in futures:
-    #         results.append(future.result())
-
-    # nets, object_db, region = results
-
-    # read_placement_input(pl_path, object_db)
-
-    region = read_row_input(scl_path, default_row_height, default_site_spacing)
-    object_db = read_node_input(node_path)
-    read_placement_input(pl_path, object_db)
-    nets = read_net_input(nets_path)
-    macro_list, comp_list = make_macros_and_components_from_bookshelf(object_db, nets)
-
-    pd_data = PhysDesignData()
-    pd_data.region = region
-    pd_data.macros = macro_list
-    pd_data.components = comp_list
-    pd_data.nets = nets
+    pd_data = PhysDesignData(BookshelfPaths(aux_path), columnar)
+    cache_params = [pd_data.default_row_height, pd_data.default_site_spacing]
+
+    cached = None
+    if use_cache:
+        with trace_stage("load_cache"):
+            cached = load_cache(aux_path, cache_params)
+    if cached is not None:
+        pd_data.region, pd_data.object_db, pd_data.nets = cached
+        pd_data.placement = pd_data.object_db
+        pd_data.from_cache = True
+    elif parallel:
+        paths = pd_data.paths
+        with trace_stage("read_bookshelf_files_parallel"):
+            region, object_db, nets = read_bookshelf_files_parallel(
+                paths.scl,
+                paths.nodes,
+                paths.pl,
+                paths.nets,
+                pd_data.default_row_height,
+                pd_data.default_site_spacing,
+                num_workers,
+            )
+        pd_data.region, pd_data.object_db, pd_data.nets = region, object_db, nets
+        pd_data.placement = object_db
 
     return pd_data
 
 
-def write_to_lefdef(pd_data: PhysDesignData, aux_path: PurePath):
-    output_dir, output_filename = aux_path.parent, aux_path.stem + "_lefdef"
-    half_pin_width, half_pin_height = 0.045, 0.06
-    database_microns = 100
-    the_site_name = "ASite"
-    lefdef_row_height = pd_data.region.default_row_height / database_microns
-    lefdef_site_spacing = pd_data.region.default_site_spacing / database_microns
+def save_to_cache(
+    pd_data: PhysDesignData, aux_path: PurePath, sources: list[dict] | None = None
+):
+    """saves pd_data to the binary cache once every part of it was read from text
 
-    # write LEF
-    lef_path = PurePath(output_dir, output_filename + ".lef")
-    product_version = 5.8
-    with open(lef_path, "w") as file:
-        # LEF/DEF product version
-        file.write(f"VERSION {product_version} ;\n")
-        # Units
-        b_str = f"UNITS\n  DATABASE MICRONS {database_microns} ;\nEND UNITS\n\n"
-        file.write(b_str)
-
-        # LAYER definition
-        b_str = """LAYER poly
+    sources are the source_stamps of the input files, if already computed.
+    """
+    if pd_data.from_cache:
+        return
+    if not all(pd_data.is_loaded(part) for part in ("region", "placement", "nets")):
+        return
+    cache_params = [pd_data.default_row_height, pd_data.default_site_spacing]
+    with trace_stage("save_cache"):
+        save_cache(
+            aux_path,
+            cache_params,
+            pd_data.region,
+            pd_data.placement,
+            pd_data.nets,
+            sources,
+        )
+
+
+HALF_PIN_WIDTH, HALF_PIN_HEIGHT = 0.045, 0.06
+DATABASE_MICRONS = 100
+THE_SITE_NAME = "ASite"
+PRODUCT_VERSION = 5.8
+LEF_LAYERS = """LAYER poly
     TYPE MASTERSLICE ;
 END poly
 
@@ -153,105 +160,436 @@ END metal3
 LAYER OVERLAP
     TYPE OVERLAP ;
 END OVERLAP\n\n"""
-        file.write(b_str)
-
-        # SITE
-        b_str = f"SITE {the_site_name}\n"
-        size_str = f"{lefdef_site_spacing} BY {lefdef_row_height}"
-        b_str += f"  CLASS CORE ;\n  SIZE {size_str} ;\n"
-        b_str += f"END {the_site_name}\n"
-        file.write(b_str)
-
-        # MACRO
-        for macro in pd_data.macros:
-            m_name = macro.name
-            b_str = f"MACRO {m_name}\n  CLASS CORE ;\n"
-            b_str += "  SITE core ;\n"
-            lefdef_dx = macro.dx / database_microns
-            lefdef_dy = macro.dy / database_microns
-            b_str += f"  SIZE {lefdef_dx} BY {lefdef_dy} ;\n"
-            # pin
-            for pin_offset, pin_name in macro.pin_dict.items():
-                pin = pd_data.nets.pin_dict[pin_name]
-                direction = pin.io
-                x_offset, y_offset = pin_offset
-                # bookshelf offset starts from the center, LEF/DEF starts from origin
-                lefdef_x_center = x_offset / database_microns + lefdef_dx / 2
-                lefdef_y_center = y_offset / database_microns + lefdef_dy / 2
-
-                b_str += f"  PIN {pin_name}\n"
-                match direction:
-                    case "I":
-                        b_str += "    DIRECTION INPUT ;\n"
-                    case "O":
-                        b_str += "    DIRECTION OUTPUT ;\n"
-                    case "B":
-                        b_str += "    DIRECTION INOUT ;\n"
-
-                b_str += "    PORT\n      LAYER metal1 ;\n"
-                lx = lefdef_x_center - half_pin_width / database_microns
-                ly = lefdef_y_center - half_pin_height / database_microns
-                hx = lefdef_x_center + half_pin_width / database_microns
-                hy = lefdef_y_center + half_pin_height / database_microns
-                b_str += f"        RECT {lx} {ly} {hx} {hy} ;\n"
-                b_str += "    END\n"
-                b_str += f"  END {pin_name}\n"
-            b_str += f"END {m_name}\n\n"
-            file.write(b_str)
-
-        # EoF
-        file.write("\nEND LIBRARY\n")
+# the writer hands the file one joined string per this many characters
+WRITE_CHUNK_SIZE = 1 << 20
+
+
+def open_output(path: PurePath, gzip_output: bool = False) -> TextIO:
+    """opens an output text file; `path` gets a .gz suffix when gzip_output"""
+    if gzip_output:
+        return gzip.open(output_name(path, True), "wt", compresslevel=6)
+    return open(path, "w")
+
+
+def open_input(path: PurePath, gzip_output: bool = False) -> TextIO:
+    """opens a file written by open_output for reading"""
+    if gzip_output:
+        return gzip.open(output_name(path, True), "rt")
+    return open(path, "r")
+
+
+def output_name(path: PurePath, gzip_output: bool = False) -> str:
+    """name of the file open_output writes for path"""
+    return f"{path}.gz" if gzip_output else str(path)
+
+
+def iter_chunks(
+    records: Iterable[str], chunk_size: int = WRITE_CHUNK_SIZE
+) -> Iterator[str]:
+    """joins records into chunks of about chunk_size characters"""
+    buffer: list[str] = []
+    buffered = 0
+    for record in records:
+        buffer.append(record)
+        buffered += len(record)
+        if buffered >= chunk_size:
+            yield "".join(buffer)
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def write_chunked(
+    file: TextIO, records: Iterable[str], chunk_size: int = WRITE_CHUNK_SIZE
+):
+    """writes records to file in joined chunks of about chunk_size characters
+
+    Only one chunk is held in memory at a time, whatever the number of records.
+    """
+    for chunk in iter_chunks(records, chunk_size):
+        file.write(chunk)
+
+
+def iter_lef(pd_data: PhysDesignData) -> Iterator[str]:
+    """yields the LEF file text piece by piece, one MACRO at a time"""
+    # the same defaults the region is read with; the LEF does not need *.scl
+    lefdef_row_height = pd_data.default_row_height / DATABASE_MICRONS
+    lefdef_site_spacing = pd_data.default_site_spacing / DATABASE_MICRONS
+
+    # LEF/DEF product version
+    yield f"VERSION {PRODUCT_VERSION} ;\n"
+    # Units
+    yield f"UNITS\n  DATABASE MICRONS {DATABASE_MICRONS} ;\nEND UNITS\n\n"
+
+    # LAYER definition
+    yield LEF_LAYERS
+
+    # SITE
+    b_str = f"SITE {THE_SITE_NAME}\n"
+    size_str = f"{lefdef_site_spacing} BY {lefdef_row_height}"
+    b_str += f"  CLASS CORE ;\n  SIZE {size_str} ;\n"
+    b_str += f"END {THE_SITE_NAME}\n"
+    yield b_str
+
+    # MACRO
+    for macro in pd_data.macros:
+        m_name = macro.name
+        b_str = f"MACRO {m_name}\n  CLASS CORE ;\n"
+        b_str += "  SITE core ;\n"
+        lefdef_dx = macro.dx / DATABASE_MICRONS
+        lefdef_dy = macro.dy / DATABASE_MICRONS
+        b_str += f"  SIZE {lefdef_dx} BY {lefdef_dy} ;\n"
+        # pin
+        for pin_offset, pin_name in macro.pin_dict.items():
+            direction = macro.pin_io[pin_name]
+            x_offset, y_offset = pin_offset
+            # bookshelf offset starts from the center, LEF/DEF starts from origin
+            lefdef_x_center = x_offset / DATABASE_MICRONS + lefdef_dx / 2
+            lefdef_y_center = y_offset / DATABASE_MICRONS + lefdef_dy / 2
+
+            b_str += f"  PIN {pin_name}\n"
+            match direction:
+                case "I":
+                    b_str += "    DIRECTION INPUT ;\n"
+                case "O":
+                    b_str += "    DIRECTION OUTPUT ;\n"
+                case "B":
+                    b_str += "    DIRECTION INOUT ;\n"
+
+            b_str += "    PORT\n      LAYER metal1 ;\n"
+            lx = lefdef_x_center - HALF_PIN_WIDTH / DATABASE_MICRONS
+            ly = lefdef_y_center - HALF_PIN_HEIGHT / DATABASE_MICRONS
+            hx = lefdef_x_center + HALF_PIN_WIDTH / DATABASE_MICRONS
+            hy = lefdef_y_center + HALF_PIN_HEIGHT / DATABASE_MICRONS
+            b_str += f"        RECT {lx} {ly} {hx} {hy} ;\n"
+            b_str += "    END\n"
+            b_str += f"  END {pin_name}\n"
+        b_str += f"END {m_name}\n\n"
+        yield b_str
+
+    # EoF
+    yield "\nEND LIBRARY\n"
+
+
+def iter_components(
+    components: list[Component], macro_names: list[str]
+) -> Iterator[str]:
+    """yields one DEF COMPONENTS record per component"""
+    for compon in components:
+        macro_name = macro_names[compon.macro_id]
+        if compon.place_status == "FIXED":
+            yield f"- {compon.name} {macro_name} + FIXED ( {compon.lx} {compon.ly} ) N ;\n"
+        else:
+            yield f"- {compon.name} {macro_name} ;\n"
+
+
+def iter_def(
+    pd_data: PhysDesignData, design_name: str, rows_only: bool = False
+) -> Iterator[str]:
+    """yields the DEF file text piece by piece, one ROW/component/net at a time
+
+    With rows_only, COMPONENTS and NETS are left out; only *.scl is read then.
+    """
+    b_str = f"VERSION {PRODUCT_VERSION} ;\n"
+    b_str += f"DESIGN {design_name} ;\n"
+    b_str += f"UNITS DISTANCE MICRONS {DATABASE_MICRONS} ;\n"
+    lx, ly = pd_data.region.lx, pd_data.region.ly
+    hx, hy = pd_data.region.hx, pd_data.region.hy
+    b_str += f"DIEAREA ( {lx} {ly} ) ( {hx} {hy} ) ;\n"
+    yield b_str
+
+    # Rows
+    yield "\n"
+    for row_id, row_ly, row_lx, row_hx in pd_data.region.row_coord_iter():
+        num_sites_f = (row_hx - row_lx) / pd_data.region.default_site_spacing
+        num_sites: int = int(proper_round(num_sites_f))
+        r_str = f"ROW {row_id} {THE_SITE_NAME} {row_lx} {row_ly} N "
+        r_str += f"DO {num_sites} BY 1 ;\n"
+        # r_str += f"DO {num_sites} BY 1 STEP {lefdef_site_spacing} {lefdef_row_height} ;\n"
+        yield r_str
+
+    if rows_only:
+        yield "\nEND DESIGN\n"
+        return
+
+    # Components
+    yield f"\nCOMPONENTS {len(pd_data.components)} ;\n"
+    macro_names = [macro.name for macro in pd_data.macros]
+    yield from iter_components(pd_data.components, macro_names)
+    yield "END COMPONENTS\n"
+
+    # Nets
+    nets = pd_data.nets
+    yield f"\nNETS {nets.num_nets()} ;\n"
+    # "( cell pin )" of every pin id
+    pin_refs = [
+        f" ( {nets.cell_names[cell]} {pin_name} )"
+        for cell, pin_name in zip(nets.pin_cell.tolist(), nets.pin_names())
+    ]
+    net_ptr = nets.net_ptr.tolist()
+    net_pins = nets.net_pins.tolist()
+    for net_idx, net_name in enumerate(nets.net_names):
+        pins = net_pins[net_ptr[net_idx] : net_ptr[net_idx + 1]]
+        yield f"- {net_name}{''.join([pin_refs[pin] for pin in pins])} ;\n"
+    yield "END NETS\n"
+
+    yield "\nEND DESIGN\n"
+
+
+def lefdef_paths(aux_path: PurePath) -> tuple[PurePath, PurePath]:
+    """<design>.aux -> <design>_lefdef.lef, <design>_lefdef.def in the same directory
+
+    The DEF design name is the stem of the DEF path. A compressed or archived
+    *.aux is named as in bookshelf_stream.local_path_of.
+    """
+    aux_path = local_path_of(aux_path)
+    output_dir, output_filename = aux_path.parent, aux_path.stem + "_lefdef"
+    return (
+        PurePath(output_dir, output_filename + ".lef"),
+        PurePath(output_dir, output_filename + ".def"),
+    )
+
+
+# what write_to_lefdef writes: both files, or only one of them
+OUTPUT_MODES = ("all", "lef", "def", "rows")
+
+
+def write_to_lefdef(
+    pd_data: PhysDesignData,
+    aux_path: PurePath,
+    gzip_output: bool = False,
+    mode: str = "all",
+):
+    """writes *_lefdef.lef and *_lefdef.def next to the *.aux file
+
+    Both files are streamed: records are generated one at a time and written
+    in bounded chunks, so memory use does not grow with the design size.
+
+    Args:
+        pd_data (PhysDesignData)
+        aux_path (PurePath): path to *.aux file
+        gzip_output (bool, optional): write *.lef.gz and *.def.gz instead.
+            Defaults to False.
+        mode (str, optional): one of OUTPUT_MODES; "lef" writes the LEF only
+            (*.nodes + *.nets), "def" the DEF only and "rows" a DEF with
+            ROWS only (*.scl). Defaults to "all".
+
+    Raises:
+        ValueError: When mode is not one of OUTPUT_MODES
+    """
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode {mode}; expected one of {OUTPUT_MODES}")
+    lef_path, def_path = lefdef_paths(aux_path)
+
+    # write LEF
+    if mode in ("all", "lef"):
+        with trace_stage("write_lef"), open_output(lef_path, gzip_output) as file:
+            write_chunked(file, iter_lef(pd_data))
 
     # write DEF
-    def_path = PurePath(output_dir, output_filename + ".def")
-    with open(def_path, "w") as file:
-        b_str = f"VERSION {product_version} ;\n"
-        b_str += f"DESIGN {output_filename} ;\n"
-        b_str += f"UNITS DISTANCE MICRONS {database_microns} ;\n"
-        lx, ly = pd_data.region.lx, pd_data.region.ly
-        hx, hy = pd_data.region.hx, pd_data.region.hy
-        b_str += f"DIEAREA ( {lx} {ly} ) ( {hx} {hy} ) ;\n"
-        file.write(b_str)
-
-        # Rows
-        b_str = "\n"
-        for row_id, row_ly, row_lx, row_hx in pd_data.region.row_coord_iter():
-            num_sites_f = (row_hx - row_lx) / pd_data.region.default_site_spacing
-            num_sites: int = int(proper_round(num_sites_f))
-            r_str = f"ROW {row_id} {the_site_name} {row_lx} {row_ly} N "
-            r_str += f"DO {num_sites} BY 1 ;\n"
-            # r_str += f"DO {num_sites} BY 1 STEP {lefdef_site_spacing} {lefdef_row_height} ;\n"
-            b_str += r_str
-        file.write(b_str)
-
-        # Components
-        b_str = f"\nCOMPONENTS {len(pd_data.components)} ;\n"
-        for compon in pd_data.components:
-            r_str = f"- {compon.name} {compon.macro_name} "
-            if compon.place_status == "FIXED":
-                r_str += f"+ FIXED ( {compon.lx} {compon.ly} ) N "
-            r_str += ";\n"
-            b_str += r_str
-        b_str += "END COMPONENTS\n"
-        file.write(b_str)
-
-        # Nets
-        b_str = f"\nNETS {len(pd_data.nets.net_dict)} ;\n"
-        for net_name, net in pd_data.nets.net_dict.items():
-            r_str = f"- {net_name}"
-            for pin_name in net.pin_names:
-                pin = pd_data.nets.pin_dict[pin_name]
-                r_str += f" ( {pin.cell_name} {pin_name} )"
-            r_str += " ;\n"
-            b_str += r_str
-        b_str += "END NETS\n"
-        file.write(b_str)
-
-        file.write("\nEND DESIGN\n")
+    if mode in ("all", "def", "rows"):
+        with trace_stage("write_def"), open_output(def_path, gzip_output) as file:
+            write_chunked(
+                file, iter_def(pd_data, def_path.stem, rows_only=mode == "rows")
+            )
+    return True
+
+
+def netlist_digest(pd_data: PhysDesignData, sources: list[dict] | None = None) -> str:
+    """digest of everything a conversion depends on but the placement (*.pl)
+
+    Args:
+        sources (list[dict] | None, optional): source_stamps of the input files
+            with digests. By default the file hashes are taken from the
+            Bookshelf cache header where still valid, and computed otherwise.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    paths = pd_data.paths
+    if sources is None:
+        sources = source_stamps(paths, with_digest=True, known=cached_stamps(paths.aux))
+    file_digests = {stamp["path"]: stamp["digest"] for stamp in sources}
+    for path in (paths.scl, paths.nodes, paths.nets):
+        digest.update(file_digests[str(path)].encode())
+    params = [pd_data.default_row_height, pd_data.default_site_spacing]
+    digest.update(repr([params, PRODUCT_VERSION, DATABASE_MICRONS]).encode())
+    return digest.hexdigest()
+
+
+def netlist_stamp_path(aux_path: PurePath) -> PurePath:
+    """records which netlist the *_lefdef.lef / *_lefdef.def next to it come from"""
+    aux_path = local_path_of(aux_path)
+    return PurePath(aux_path.parent, aux_path.stem + "_lefdef.netlist")
+
+
+@trace_stage("write_netlist_stamp")
+def write_netlist_stamp(
+    pd_data: PhysDesignData,
+    aux_path: PurePath,
+    gzip_output: bool = False,
+    sources: list[dict] | None = None,
+):
+    """stamps a full conversion so that update_def_placement can build on it"""
+    stamp = {
+        "netlist": netlist_digest(pd_data, sources),
+        "gzip": gzip_output,
+    }
+    with open(netlist_stamp_path(aux_path), "w") as file:
+        json.dump(stamp, file)
+
+
+def remove_netlist_stamp(aux_path: PurePath):
+    try:
+        os.unlink(netlist_stamp_path(aux_path))
+    except FileNotFoundError:
+        pass
+
+
+@trace_stage("update_def_placement")
+def update_def_placement(aux_path: PurePath, gzip_output: bool = False) -> bool:
+    """rewrites only the COMPONENTS of the DEF of a previous full conversion
+
+    When *.scl, *.nodes and *.nets are those of the netlist stamp, the LEF
+    and the DEF header, ROWS and NETS are still valid. The DEF is then copied
+    with fresh COMPONENTS records for the current *.pl; the macro of every
+    component is taken over from the old records. Only *.nodes and *.pl are
+    parsed.
+
+    Args:
+        aux_path (PurePath): path to *.aux file
+        gzip_output (bool, optional): the outputs are *.lef.gz and *.def.gz.
+            Defaults to False.
+
+    Returns:
+        bool: False, with nothing written, when a full conversion is needed
+    """
+    lef_path, def_path = lefdef_paths(aux_path)
+    pd_data = PhysDesignData(BookshelfPaths(aux_path), columnar=True)
+
+    try:
+        with open(netlist_stamp_path(aux_path)) as file:
+            stamp = json.load(file)
+    except (OSError, ValueError):
+        print("No netlist stamp of a previous conversion; converting fully.")
+        return False
+    if stamp.get("gzip") != gzip_output:
+        print("The previous conversion wrote other outputs; converting fully.")
+        return False
+    if not all(
+        os.path.exists(output_name(path, gzip_output)) for path in (lef_path, def_path)
+    ):
+        print("Outputs of the previous conversion are missing; converting fully.")
+        return False
+    if stamp.get("netlist") != netlist_digest(pd_data):
+        print("Netlist changed since the previous conversion; converting fully.")
+        return False
+
+    object_db = pd_data.placement
+    node_names = object_db.nodes
+    tmp_path = def_path.with_suffix(".def.tmp")
+    def_name = output_name(def_path, gzip_output)
+    tmp_name = output_name(tmp_path, gzip_output)
+    try:
+        with open_input(def_path, gzip_output) as old_file, open_output(
+            tmp_path, gzip_output
+        ) as new_file:
+            # header and ROWS
+            for line in old_file:
+                if line.startswith("COMPONENTS "):
+                    break
+                new_file.write(line)
+            else:
+                raise ValueError("COMPONENTS section not found")
+
+            # the old records name the macro of every node, in ObjectDB order
+            macro_ids: dict[str, int] = {}
+            node_macro_ids: list[int] = []
+            for node_name, line in zip(node_names, old_file):
+                words = line.split()
+                if len(words) < 3 or words[1] != node_name:
+                    raise ValueError(f"unexpected COMPONENTS record {line.strip()}")
+                node_macro_ids.append(macro_ids.setdefault(words[2], len(macro_ids)))
+            if len(node_macro_ids) != object_db.num_entry():
+                raise ValueError("COMPONENTS section is incomplete")
+            if not next(old_file, "").startswith("END COMPONENTS"):
+                raise ValueError("COMPONENTS section does not match *.nodes")
+
+            components = make_components_from_bookshelf(object_db, node_macro_ids)
+            new_file.write(f"COMPONENTS {len(components)} ;\n")
+            write_chunked(new_file, iter_components(components, list(macro_ids)))
+            new_file.write("END COMPONENTS\n")
+            # NETS and the end of the design
+            shutil.copyfileobj(old_file, new_file, WRITE_CHUNK_SIZE)
+        os.replace(tmp_name, def_name)
+    except ValueError as err:
+        print(f"Cannot update {def_name} in place ({err}); converting fully.")
+        return False
+    finally:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+
+    print(f"COMPONENTS of {def_name} are updated.")
     return True
 
 
-def main(aux_path_str: str):
+def trace_path_of(aux_path: PurePath) -> PurePath:
+    """default JSON trace path: *_lefdef.trace.json next to the *.aux file"""
+    lef_path, _ = lefdef_paths(aux_path)
+    return PurePath(lef_path.parent, f"{lef_path.stem}.trace.json")
+
+
+def convert(
+    aux_path: PurePath,
+    columnar: bool = False,
+    gzip_output: bool = False,
+    parallel: bool = False,
+    num_workers: int | None = None,
+    use_cache: bool = True,
+    mode: str = "all",
+    incremental: bool = False,
+    pipelined: bool = False,
+):
+    if incremental and update_def_placement(aux_path, gzip_output):
+        return
+    # rows come from *.scl alone; loading the cached design would cost more
+    use_cache = use_cache and mode != "rows"
+    if pipelined and mode == "all":
+        # imported here: lefdef_pipeline builds on this module
+        from lefdef_pipeline import convert_pipelined
+
+        with trace_stage("convert_pipelined"):
+            pd_data = convert_pipelined(aux_path, gzip_output, num_workers, use_cache)
+    else:
+        pd_data = read_bookshelf(aux_path, columnar, parallel, num_workers, use_cache)
+        write_to_lefdef(pd_data, aux_path, gzip_output, mode)
+    sources = None
+    if mode == "all":
+        # the input files are hashed once, for the netlist stamp and the cache
+        sources = source_stamps(
+            BookshelfPaths(aux_path), with_digest=True, known=cached_stamps(aux_path)
+        )
+        write_netlist_stamp(pd_data, aux_path, gzip_output, sources)
+    else:
+        # the LEF and the DEF may no longer match each other
+        remove_netlist_stamp(aux_path)
+    if use_cache:
+        save_to_cache(pd_data, aux_path, sources)
+
+
+def main(
+    aux_path_str: str,
+    columnar: bool = False,
+    gzip_output: bool = False,
+    parallel: bool = False,
+    num_workers: int | None = None,
+    use_cache: bool = True,
+    mode: str = "all",
+    incremental: bool = False,
+    pipelined: bool = False,
+    trace_path_str: str | None = None,
+    profile: bool = False,
+    use_tracemalloc: bool = False,
+):
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
     # Logging to a .log file
@@ -264,19 +602,131 @@ def main(aux_path_str: str):
     logging.info(f"{__name__} program start @ {START_DT}"[:-3])
 
     aux_path = PurePath(aux_path_str)
-    pd_data = read_bookshelf(aux_path)
-    write_to_lefdef(pd_data, aux_path)
+    options = [columnar, gzip_output, parallel, num_workers, use_cache, mode]
+    options += [incremental, pipelined]
+    if trace_path_str is None:
+        convert(aux_path, *options)
+        return
+
+    # "" stands for the default trace path
+    trace_path = PurePath(trace_path_str) if trace_path_str else trace_path_of(aux_path)
+    tracer = StageTracer(use_tracemalloc=use_tracemalloc, profile=profile)
+    tracer.start()
+    try:
+        convert(aux_path, *options)
+    finally:
+        tracer.stop()
+        tracer.write(trace_path, {"aux": str(aux_path), "argv": sys.argv})
 
 
 if __name__ == "__main__":
     START_DT = datetime.datetime.now()
-    if len(sys.argv) != 2:
-        print("*.aux file for Bookshelf format data is required")
-        sys.exit(0)
-    if "-h" in sys.argv[1:] or "--help" in sys.argv[1:]:
-        print("*.aux file for Bookshelf format data is required")
-        sys.exit(0)
-    main(sys.argv[1])
+    parser = argparse.ArgumentParser(
+        description="Convert Bookshelf format data into LEF/DEF"
+    )
+    parser.add_argument("aux", help="*.aux file for Bookshelf format data")
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="keep nodes in NumPy arrays (less memory on large designs)",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="write gzip-compressed *.lef.gz and *.def.gz",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="parse the Bookshelf files in parallel worker processes",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="worker processes for --parallel and --pipeline"
+        " (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always parse the text files; do not read or write *.bookshelf_cache",
+    )
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument(
+        "--lef-only",
+        dest="mode",
+        action="store_const",
+        const="lef",
+        help="write the LEF only; *.scl and *.pl are not read",
+    )
+    output_group.add_argument(
+        "--def-only",
+        dest="mode",
+        action="store_const",
+        const="def",
+        help="write the DEF only",
+    )
+    output_group.add_argument(
+        "--rows-only",
+        dest="mode",
+        action="store_const",
+        const="rows",
+        help="write a DEF with ROWS only; only *.scl is read",
+    )
+    parser.set_defaults(mode="all")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="if only *.pl changed since the last full conversion, rewrite just"
+        " the DEF COMPONENTS",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="parse in worker processes while the LEF and the DEF are written"
+        " concurrently (same output)",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="",
+        default=None,
+        help="write the time, memory and object counts of every stage as JSON"
+        " (default path: *_lefdef.trace.json)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="run cProfile too; implies --trace, raw stats go to *.prof",
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="trace Python allocations for per-stage peaks; implies --trace",
+    )
+    args = parser.parse_args()
+    if (args.profile or args.tracemalloc) and args.trace is None:
+        args.trace = ""
+    if args.incremental and args.mode != "all":
+        parser.error("--incremental updates a full conversion; drop --*-only")
+    if args.pipeline and args.mode != "all":
+        parser.error("--pipeline writes both files; drop --*-only")
+    main(
+        args.aux,
+        args.columnar,
+        args.gzip,
+        args.parallel,
+        args.jobs,
+        not args.no_cache,
+        args.mode,
+        args.incremental,
+        args.pipeline,
+        args.trace,
+        args.profile,
+        args.tracemalloc,
+    )
     END_DT = datetime.datetime.now()
     elapsed_d = END_DT - START_DT
     logging.info(
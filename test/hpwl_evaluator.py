@@ -0,0 +1,192 @@
+"""Half-perimeter wirelength (HPWL) of a Bookshelf placement"""
+import argparse
+from pathlib import PurePath
+
+import numpy as np
+
+from bookshelf_class import (
+    ArrayObjectDB,
+    NetRecords,
+    Nets,
+    ObjectDB,
+    read_placement_input,
+)
+from from_bookshelf_to_lefdef import read_bookshelf, save_to_cache
+
+
+class NetCSR:
+    """nets in compressed sparse row form
+
+    The pins of net k are entries net_ptr[k] to net_ptr[k + 1] - 1 of the pin
+    columns: pin_node is the node index in ObjectDB order, pin_x / pin_y the
+    offset from the node center.
+    """
+
+    def __init__(
+        self,
+        net_names: list[str],
+        net_ptr: np.ndarray,
+        pin_node: np.ndarray,
+        pin_x: np.ndarray,
+        pin_y: np.ndarray,
+    ):
+        self.net_names = net_names
+        self.net_ptr = net_ptr
+        self.pin_node = pin_node
+        self.pin_x = pin_x
+        self.pin_y = pin_y
+
+    def num_nets(self) -> int:
+        return len(self.net_names)
+
+    def num_pins(self) -> int:
+        return len(self.pin_node)
+
+    @classmethod
+    def from_records(
+        cls, records: NetRecords, object_db: ObjectDB | ArrayObjectDB
+    ) -> "NetCSR":
+        """
+        Raises:
+            ValueError: When a pin refers to a node missing from object_db
+        """
+        net_ptr = np.array(records.net_ptr, dtype=np.int64)
+        first, last = int(net_ptr[0]), int(net_ptr[-1])
+        # one lookup per distinct cell name, then map the pins in bulk
+        cell_node = node_indices_of(object_db, records.cell_names)
+        pin_node = np.take(
+            cell_node, np.asarray(records.pin_cell, dtype=np.int64)[first:last]
+        )
+        return cls(
+            records.net_names,
+            net_ptr - first,
+            pin_node,
+            np.asarray(records.pin_x, dtype=np.float64)[first:last],
+            np.asarray(records.pin_y, dtype=np.float64)[first:last],
+        )
+
+    @classmethod
+    def from_nets(cls, nets: Nets, object_db: ObjectDB | ArrayObjectDB) -> "NetCSR":
+        """
+        Raises:
+            ValueError: When a pin refers to a node missing from object_db
+        """
+        cell_node = node_indices_of(object_db, nets.cell_names)
+        return cls(
+            nets.net_names,
+            nets.net_ptr,
+            cell_node[nets.pin_cell[nets.net_pins]],
+            nets.pin_x[nets.net_pins],
+            nets.pin_y[nets.net_pins],
+        )
+
+    def pin_locations(
+        self, object_db: ObjectDB | ArrayObjectDB
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """absolute pin coordinates for the current node locations"""
+        dx, dy, lx, ly, _ = object_db.geometry()
+        node_x = lx + dx / 2
+        node_y = ly + dy / 2
+        return node_x[self.pin_node] + self.pin_x, node_y[self.pin_node] + self.pin_y
+
+
+def node_indices_of(
+    object_db: ObjectDB | ArrayObjectDB, names: list[str]
+) -> np.ndarray:
+    """position of every named node in the object_db.geometry() arrays
+
+    Raises:
+        ValueError: When a name is missing from object_db
+    """
+    if isinstance(object_db, ArrayObjectDB):
+        indices = object_db.indices_of(names)
+    else:
+        node_index = dict(zip(object_db.nodes, range(object_db.num_entry())))
+        indices = np.fromiter(
+            (node_index.get(name, -1) for name in names),
+            dtype=np.int64,
+            count=len(names),
+        )
+    missing = np.flatnonzero(indices < 0)
+    if len(missing):
+        raise ValueError(f"Undefined object {names[missing[0]]} appear in nets.")
+    return indices
+
+
+def segment_extent(values: np.ndarray, net_ptr: np.ndarray) -> np.ndarray:
+    """max - min of values within every [net_ptr[k], net_ptr[k + 1]) segment"""
+    extent = np.zeros(len(net_ptr) - 1, dtype=np.float64)
+    non_empty = net_ptr[1:] > net_ptr[:-1]
+    starts = net_ptr[:-1][non_empty]
+    if len(starts):
+        extent[non_empty] = np.maximum.reduceat(values, starts) - np.minimum.reduceat(
+            values, starts
+        )
+    return extent
+
+
+class HpwlReport:
+    def __init__(self, net_names: list[str], hpwl_x: np.ndarray, hpwl_y: np.ndarray):
+        self.net_names = net_names
+        # per-net x / y half perimeters
+        self.hpwl_x = hpwl_x
+        self.hpwl_y = hpwl_y
+
+    @property
+    def total_x(self) -> float:
+        return float(self.hpwl_x.sum())
+
+    @property
+    def total_y(self) -> float:
+        return float(self.hpwl_y.sum())
+
+    @property
+    def total(self) -> float:
+        return self.total_x + self.total_y
+
+    def net_hpwl(self) -> np.ndarray:
+        return self.hpwl_x + self.hpwl_y
+
+    def print_summary(self):
+        # same layout as the placer log, e.g. HPWL(IP): 56434.9609 (28701.6172, 27733.3438)
+        print(f"   HPWL: {self.total:.4f} ({self.total_x:.4f}, {self.total_y:.4f})")
+        print(f"\tTotal {len(self.net_names)} nets")
+
+
+def evaluate_hpwl(csr: NetCSR, object_db: ObjectDB | ArrayObjectDB) -> HpwlReport:
+    """HPWL of every net for the current node locations of object_db"""
+    pin_x, pin_y = csr.pin_locations(object_db)
+    return HpwlReport(
+        csr.net_names,
+        segment_extent(pin_x, csr.net_ptr),
+        segment_extent(pin_y, csr.net_ptr),
+    )
+
+
+def main(aux_path_str: str, pl_path_str: str | None = None) -> HpwlReport:
+    aux_path = PurePath(aux_path_str)
+    # the Bookshelf cache applies here as in the converter
+    pd_data = read_bookshelf(aux_path, columnar=True)
+    object_db, nets = pd_data.placement, pd_data.nets
+    # save_to_cache stores complete designs only
+    pd_data.region
+    save_to_cache(pd_data, aux_path)
+    if pl_path_str:
+        # after save_to_cache: the cache keeps the locations of the *.aux *.pl
+        read_placement_input(PurePath(pl_path_str), object_db)
+    csr = NetCSR.from_nets(nets, object_db)
+    print(f"Net CSR: {csr.num_nets()} nets, {csr.num_pins()} pins")
+
+    report = evaluate_hpwl(csr, object_db)
+    report.print_summary()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HPWL of a Bookshelf placement")
+    parser.add_argument("aux", help="*.aux file for Bookshelf format data")
+    parser.add_argument(
+        "pl", nargs="?", default=None, help="solution *.pl (default: from *.aux)"
+    )
+    args = parser.parse_args()
+    main(args.aux, args.pl)
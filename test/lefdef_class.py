@@ -6,19 +6,22 @@ class Macro:
         self.dx = dx
         self.dy = dy
         self.pin_dict: dict[tuple[float, float], str] = {}
+        # pin name -> direction
+        self.pin_io: dict[str, str] = {}
 
     def pin_exists(self, x_offset: float, y_offset: float) -> bool:
         return (x_offset, y_offset) in self.pin_dict
 
-    def add_pin(self, x_offset: float, y_offset: float, pin_name: str):
+    def add_pin(self, x_offset: float, y_offset: float, pin_name: str, io: str):
         self.pin_dict[(x_offset, y_offset)] = pin_name
+        self.pin_io[pin_name] = io
 
 
 class Component:
     lx: float
     ly: float
 
-    def __init__(self, name: str, macro_name: str, place_status: str):
+    def __init__(self, name: str, macro_id: int, place_status: str):
         self.name = name
-        self.macro_name = macro_name
+        self.macro_id = macro_id  # index of the master in the macro list
         self.place_status = place_status
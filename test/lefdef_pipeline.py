@@ -0,0 +1,249 @@
+"""Pipelined Bookshelf -> LEF/DEF conversion
+
+The sequential converter parses every file, builds the macros and only then
+writes the LEF and the DEF. Here the stages overlap:
+
+    parse (worker processes) -> transform (main thread) -> format -> write
+
+*.scl, *.nodes + *.pl and *.nets ranges are parsed in worker processes. The
+main thread hands every part over to PipelinedDesignData as soon as it is
+made. The LEF and DEF formatters each run in a thread of their own and block
+only on the parts they need, so the DEF header and ROWS are written as soon as
+*.scl is parsed. COMPONENTS follow once the macros exist; the macro of a
+component depends on its pins, so they cannot start before *.nets is read.
+Formatted chunks go through bounded queues to one writer thread per file,
+which keeps the disk (and gzip) busy while the next chunks are formatted.
+
+The output is byte-identical to write_to_lefdef: the same generators make it.
+"""
+import os
+import queue
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property
+from pathlib import PurePath
+from typing import Iterable
+
+from bookshelf_cache import load_cache
+from bookshelf_class import (
+    ArrayObjectDB,
+    BookshelfPaths,
+    Nets,
+    Region,
+    read_row_input,
+)
+from bookshelf_parallel import (
+    collect_net_ranges,
+    discard_exports,
+    import_arrays,
+    load_nodes_and_placement,
+    submit_net_ranges,
+)
+from from_bookshelf_to_lefdef import (
+    iter_chunks,
+    iter_def,
+    iter_lef,
+    lefdef_paths,
+    open_output,
+)
+from lefdef_class import Component, Macro
+from macro_component_maker import (
+    PhysDesignData,
+    make_components_from_bookshelf,
+    make_macros_from_bookshelf,
+)
+from stage_trace import trace_stage
+
+# formatted chunks (of WRITE_CHUNK_SIZE characters) buffered per output file
+QUEUE_DEPTH = 8
+# parts in the order the transform stage makes them
+PARTS = ("region", "object_db", "nets", "macros", "components")
+
+
+class PipelinedDesignData(PhysDesignData):
+    """PhysDesignData filled in by the transform stage of the pipeline
+
+    Reading a part waits until it is published; a part that can no longer be
+    made raises the error of the stage that failed.
+    """
+
+    def __init__(self, paths: BookshelfPaths):
+        super().__init__(paths, columnar=True)
+        self.futures: dict[str, Future] = {part: Future() for part in PARTS}
+
+    def publish(self, part: str, value):
+        self.futures[part].set_result(value)
+
+    def abort(self, err: BaseException):
+        """fails every part that is not published yet"""
+        for future in self.futures.values():
+            if not future.done():
+                future.set_exception(err)
+
+    @cached_property
+    def region(self) -> Region:
+        return self.futures["region"].result()
+
+    @cached_property
+    def object_db(self) -> ArrayObjectDB:
+        return self.futures["object_db"].result()
+
+    @cached_property
+    def placement(self) -> ArrayObjectDB:
+        # *.pl is read together with *.nodes
+        return self.object_db
+
+    @cached_property
+    def nets(self) -> Nets:
+        return self.futures["nets"].result()
+
+    @cached_property
+    def macros(self) -> list[Macro]:
+        return self.futures["macros"].result()
+
+    @cached_property
+    def components(self) -> list[Component]:
+        return self.futures["components"].result()
+
+
+def format_stage(name: str, records: Iterable[str], chunks: queue.Queue):
+    """puts the records, joined into chunks, on a bounded queue
+
+    None marks the end of the stream, also when formatting fails.
+
+    Args:
+        name (str): stage name for the tracer, e.g. format_def
+    """
+    try:
+        with trace_stage(name):
+            for chunk in iter_chunks(records):
+                chunks.put(chunk)
+    finally:
+        chunks.put(None)
+
+
+def write_stage(name: str, path: PurePath, gzip_output: bool, chunks: queue.Queue):
+    """writes chunks from a queue until its end mark
+
+    After a write error the queue is still drained, so that the format stage
+    never blocks on a full queue.
+
+    Args:
+        name (str): stage name for the tracer, e.g. write_def
+    """
+    try:
+        with trace_stage(name), open_output(path, gzip_output) as file:
+            while (chunk := chunks.get()) is not None:
+                file.write(chunk)
+    except BaseException:
+        while chunks.get() is not None:
+            pass
+        raise
+
+
+def transform_stage(
+    pd_data: PipelinedDesignData,
+    aux_path: PurePath,
+    num_workers: int,
+    use_cache: bool,
+):
+    """parses the files in worker processes and publishes the parts in order
+
+    The tasks are submitted in the order their results are awaited, so that
+    they simply queue when there are fewer workers than file groups.
+    """
+    paths = pd_data.paths
+    cache_params = [pd_data.default_row_height, pd_data.default_site_spacing]
+    cached = None
+    if use_cache:
+        with trace_stage("load_cache"):
+            cached = load_cache(aux_path, cache_params)
+    if cached is not None:
+        region, object_db, nets = cached
+        pd_data.from_cache = True
+        pd_data.publish("region", region)
+        pd_data.publish("object_db", object_db)
+        pd_data.publish("nets", nets)
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            region_future = executor.submit(
+                read_row_input,
+                paths.scl,
+                pd_data.default_row_height,
+                pd_data.default_site_spacing,
+            )
+            nodes_future = executor.submit(
+                load_nodes_and_placement, paths.nodes, paths.pl
+            )
+            range_futures = submit_net_ranges(executor, paths.nets, num_workers)
+            # each stage waits for its worker result, then imports it
+            try:
+                with trace_stage("read_row_input"):
+                    pd_data.publish("region", region_future.result())
+                with trace_stage("read_node_and_placement_input"):
+                    object_db = ArrayObjectDB.from_arrays(
+                        import_arrays(*nodes_future.result())
+                    )
+                pd_data.publish("object_db", object_db)
+            except BaseException:
+                discard_exports([nodes_future])
+                discard_exports(future for _, _, future in range_futures)
+                raise
+            with trace_stage("read_net_input"):
+                nets = collect_net_ranges(paths.nets, range_futures)
+            pd_data.publish("nets", nets)
+
+    with trace_stage("make_macros"):
+        macro_list, node_macro_ids = make_macros_from_bookshelf(object_db, nets)
+    pd_data.publish("macros", macro_list)
+    with trace_stage("make_components"):
+        components = make_components_from_bookshelf(object_db, node_macro_ids)
+    pd_data.publish("components", components)
+
+
+def convert_pipelined(
+    aux_path: PurePath,
+    gzip_output: bool = False,
+    num_workers: int | None = None,
+    use_cache: bool = True,
+) -> PhysDesignData:
+    """converts *.aux into *_lefdef.lef and *_lefdef.def with overlapped stages
+
+    Args:
+        aux_path (PurePath): path to *.aux file
+        gzip_output (bool, optional): write *.lef.gz and *.def.gz instead.
+            Defaults to False.
+        num_workers (int | None, optional): worker processes that parse *.nets.
+            Defaults to the number of CPUs.
+        use_cache (bool, optional): take the parsed files from the binary cache
+            when it is fresh. Defaults to True.
+
+    Returns:
+        PhysDesignData: with every part loaded
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    pd_data = PipelinedDesignData(BookshelfPaths(aux_path))
+    lef_path, def_path = lefdef_paths(aux_path)
+    lef_chunks: queue.Queue = queue.Queue(maxsize=QUEUE_DEPTH)
+    def_chunks: queue.Queue = queue.Queue(maxsize=QUEUE_DEPTH)
+
+    with ThreadPoolExecutor(max_workers=4) as threads:
+        stages = [
+            threads.submit(write_stage, "write_def", def_path, gzip_output, def_chunks),
+            threads.submit(write_stage, "write_lef", lef_path, gzip_output, lef_chunks),
+            threads.submit(
+                format_stage, "format_def", iter_def(pd_data, def_path.stem), def_chunks
+            ),
+            threads.submit(format_stage, "format_lef", iter_lef(pd_data), lef_chunks),
+        ]
+        try:
+            transform_stage(pd_data, aux_path, num_workers, use_cache)
+        except BaseException as err:
+            # let the format stages finish, so that the threads can be joined
+            pd_data.abort(err)
+            raise
+        for stage in stages:
+            stage.result()
+
+    for part in (*PARTS, "placement"):
+        getattr(pd_data, part)
+    return pd_data
@@ -1,56 +1,165 @@
+from functools import cached_property
+
 from lefdef_class import Component, Macro
-from bookshelf_class import ObjectDB, Nets, Region
+from bookshelf_class import (
+    DEFAULT_ROW_HEIGHT,
+    DEFAULT_SITE_SPACING,
+    ArrayObjectDB,
+    BookshelfPaths,
+    ObjectDB,
+    Nets,
+    Region,
+    gc_paused,
+    read_net_input,
+    read_node_input,
+    read_placement_input,
+    read_row_input,
+)
+from stage_trace import trace_stage
 
 
-def make_macros_and_components_from_bookshelf(
-    object_db: ObjectDB, nets: Nets
-) -> tuple[list[Macro], list[Component]]:
-    macro_dict: dict[str, Macro] = {}
-    comp_list: list[Component] = []
-    macro_idx = 0
-    for node_name, node in object_db.nodes.items():
-        """
-        Unique objects in ObjectDB are made into Macro instances.
-        It should be unique by the combination of:
-        - size
-        - fixed/movable
-        - pin composition (direction & offset coordinates)
-        """
-        size_str = f"({node.dx},{node.dy})"
-        if node.is_fixed:
-            size_str += "f"
+@gc_paused()
+def make_macros_from_bookshelf(
+    object_db: ObjectDB | ArrayObjectDB, nets: Nets
+) -> tuple[list[Macro], list[int]]:
+    """
+    Unique objects in ObjectDB are made into Macro instances.
+    It should be unique by the combination of:
+    - size
+    - fixed/movable
+    - pin composition (direction & offset coordinates)
+
+    That combination is one tuple signature per node, so equal nodes share a
+    dictionary slot; nodes refer to their macro by its index (Mac_<index>).
+    Node locations are not used.
+
+    Returns:
+        tuple[list[Macro], list[int]]: macros, and the macro index of every node
+            in ObjectDB order
+    """
+    macro_ids: dict[tuple, int] = {}
+    macro_list: list[Macro] = []
+    node_macro_ids: list[int] = []
+    cell_idx = nets.cell_idx
+    cell_pin_ptr = nets.cell_pin_ptr.tolist()
+    cell_pins = nets.cell_pins.tolist()
+    pin_io = nets.pin_io.tolist()
+    pin_coord = list(zip(nets.pin_x.tolist(), nets.pin_y.tolist()))
+    pin_names = nets.pin_names()
+    io_names = nets.io_names
+    no_pins: list[int] = []
+    dxs, dys, _, _, fixed_flags = (column.tolist() for column in object_db.geometry())
+    for node_idx, node_name in enumerate(object_db.nodes):
+        dx, dy, is_fixed = dxs[node_idx], dys[node_idx], fixed_flags[node_idx]
+        cell = cell_idx.get(node_name)
+        if cell is None:
+            node_pins = no_pins
         else:
-            size_str += "m"
-        pins_str = "".join(
-            [
-                f"{nets.pin_dict[pin_name].io}({coord[0]},{coord[1]})"
-                for coord, pin_name in nets.pin_coord_dict[node_name].items()
-            ]
+            node_pins = cell_pins[cell_pin_ptr[cell] : cell_pin_ptr[cell + 1]]
+        signature = (
+            dx,
+            dy,
+            is_fixed,
+            *[(pin_io[pin], pin_coord[pin]) for pin in node_pins],
         )
-        macro_dict_key = size_str + pins_str
 
-        if macro_dict_key in macro_dict:
-            macro_name = macro_dict[macro_dict_key].name
-        else:
-            macro_name = f"Mac_{macro_idx}"
-            macro_dict[macro_dict_key] = Macro(macro_name, node.dx, node.dy)
-            for coord, pin_name in nets.pin_coord_dict[node_name].items():
-                macro_dict[macro_dict_key].pin_dict[coord] = pin_name
-            macro_idx += 1
-
-        if node.is_fixed:
-            component = Component(node_name, macro_name, "FIXED")
-            component.lx, component.ly = node.lx, node.ly
+        macro_id = macro_ids.get(signature)
+        if macro_id is None:
+            macro_id = macro_ids[signature] = len(macro_list)
+            macro = Macro(f"Mac_{macro_id}", dx, dy)
+            for pin in node_pins:
+                x_offset, y_offset = pin_coord[pin]
+                macro.add_pin(x_offset, y_offset, pin_names[pin], io_names[pin_io[pin]])
+            macro_list.append(macro)
+        node_macro_ids.append(macro_id)
+
+    print(f"{len(macro_list)} macros from {len(node_macro_ids)} nodes")
+    return macro_list, node_macro_ids
+
+
+@gc_paused()
+def make_components_from_bookshelf(
+    object_db: ObjectDB | ArrayObjectDB, node_macro_ids: list[int]
+) -> list[Component]:
+    """one Component per node; fixed ones take their location from object_db"""
+    comp_list: list[Component] = []
+    _, _, lxs, lys, fixed_flags = (column.tolist() for column in object_db.geometry())
+    for node_idx, node_name in enumerate(object_db.nodes):
+        macro_id = node_macro_ids[node_idx]
+        if fixed_flags[node_idx]:
+            component = Component(node_name, macro_id, "FIXED")
+            component.lx, component.ly = lxs[node_idx], lys[node_idx]
         else:
-            component = Component(node_name, macro_name, "UNPLACED")
+            component = Component(node_name, macro_id, "UNPLACED")
         comp_list.append(component)
+    return comp_list
+
 
-    print(f"{macro_idx} macros from {len(comp_list)} components")
-    return list(macro_dict.values()), comp_list
+def make_macros_and_components_from_bookshelf(
+    object_db: ObjectDB | ArrayObjectDB, nets: Nets
+) -> tuple[list[Macro], list[Component]]:
+    macro_list, node_macro_ids = make_macros_from_bookshelf(object_db, nets)
+    return macro_list, make_components_from_bookshelf(object_db, node_macro_ids)
 
 
 class PhysDesignData:
-    region: Region
-    macros: list[Macro]
-    components: list[Component]
-    nets: Nets
+    """design data read from Bookshelf files part by part, on first access
+
+    region needs *.scl, object_db *.nodes, placement *.nodes + *.pl and nets
+    *.nets; macros need object_db and nets, components additionally the
+    placement. Any part may also be assigned directly, e.g. when it was read
+    by other means; it is then never read from its file.
+    """
+
+    def __init__(self, paths: BookshelfPaths | None = None, columnar: bool = False):
+        self.paths = paths
+        self.columnar = columnar
+        self.default_row_height = DEFAULT_ROW_HEIGHT
+        self.default_site_spacing = DEFAULT_SITE_SPACING
+        # set when the parts were loaded from the binary cache
+        self.from_cache = False
+
+    @cached_property
+    @trace_stage("read_row_input")
+    def region(self) -> Region:
+        return read_row_input(
+            self.paths.scl, self.default_row_height, self.default_site_spacing
+        )
+
+    @cached_property
+    @trace_stage("read_node_input")
+    def object_db(self) -> ObjectDB | ArrayObjectDB:
+        """nodes; located at (0, 0) until placement is accessed"""
+        return read_node_input(self.paths.nodes, self.columnar)
+
+    @cached_property
+    @trace_stage("read_placement_input")
+    def placement(self) -> ObjectDB | ArrayObjectDB:
+        """object_db with the node locations of *.pl"""
+        read_placement_input(self.paths.pl, self.object_db)
+        return self.object_db
+
+    @cached_property
+    @trace_stage("read_net_input")
+    def nets(self) -> Nets:
+        return read_net_input(self.paths.nets)
+
+    @cached_property
+    @trace_stage("make_macros")
+    def _macros_and_node_macro_ids(self) -> tuple[list[Macro], list[int]]:
+        return make_macros_from_bookshelf(self.object_db, self.nets)
+
+    @cached_property
+    def macros(self) -> list[Macro]:
+        return self._macros_and_node_macro_ids[0]
+
+    @cached_property
+    @trace_stage("make_components")
+    def components(self) -> list[Component]:
+        return make_components_from_bookshelf(
+            self.placement, self._macros_and_node_macro_ids[1]
+        )
+
+    def is_loaded(self, part: str) -> bool:
+        """tells whether a part was accessed, i.e. read or assigned, already"""
+        return part in self.__dict__
@@ -0,0 +1,393 @@
+"""Warm-start cache of placements after initial (or Nesterov) placement
+
+Runs of one netlist that differ only in Nesterov parameters such as
+set_density or set_target_overflow all repeat the same initial placement.
+The cache keeps the placement after a chosen stage as a DEF file, keyed on
+- the content of the LEF / DEF (and Verilog / SDC / Liberty) inputs,
+- every replace_external command up to that stage, with Tcl variables
+  substituted, except those that cannot change its placement: outputs,
+  verbosity and plots, and for initial placement the Nesterov parameters, and
+- the size and mtime of the replace binary.
+
+On a miss, the script is run up to the stage once and the placement exported
+with export_def. A script is warm-started by importing the cached DEF in
+place of its own with set_seed_init_enable, which keeps the DEF locations,
+and without the stage commands up to the cached one.
+
+    python placement_cache.py gcd_nontd_test.tcl    # writes gcd_nontd_test_warm.tcl
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path, PurePath
+
+# bump whenever cached entries change meaning
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = "warm_start_cache"
+HASH_BLOCK_SIZE = 1 << 20
+# placement stages in flow order; an entry holds the placement after one
+STAGES = ("place_cell_init_place", "place_cell_nesterov_place")
+DEFAULT_STAGE = STAGES[0]
+# commands whose argument is an input file; the key takes their content
+INPUT_COMMANDS = (
+    "import_lef",
+    "import_def",
+    "import_verilog",
+    "import_sdc",
+    "import_lib",
+)
+# commands that do not change the placement of any stage
+OUTPUT_COMMANDS = {
+    "set_output",
+    "set_output_experiment_name",
+    "set_verbose_level",
+    "set_plot_enable",
+    "set_plot_color_file",
+    "set_write_bookshelf_enable",
+    "help",
+}
+# parameters used from setup_before_opt on, i.e. not by initial placement
+NESTEROV_COMMANDS = {
+    "set_density",
+    "set_target_overflow",
+    "set_number_of_bin_grids",
+    "set_min_pcof",
+    "set_max_pcof",
+    "set_lambda",
+    "set_step_scale",
+}
+OBJECT_PATTERN = re.compile(r"^\s*replace_external\s+(\w+)")
+# set lib_dir ../library/nangate45/
+SET_PATTERN = re.compile(r"^\s*set\s+(\w+)\s+(\S+)\s*$")
+TCL_VAR_PATTERN = re.compile(r"\$\{(\w+)\}|\$(\w+)")
+
+
+def replace_object(lines: list[str]) -> str:
+    """name of the replace_external object the script creates
+
+    Raises:
+        ValueError: when it creates none
+    """
+    for line in lines:
+        if match := OBJECT_PATTERN.match(line):
+            return match.group(1)
+    raise ValueError("no replace_external object in the script\n")
+
+
+def command_pattern(obj: str) -> re.Pattern:
+    """matches "<obj> <command> <argument>" lines"""
+    return re.compile(rf"^\s*{obj}\s+(\w+)\s*(.*?)\s*$")
+
+
+def substitute(text: str, tcl_vars: dict[str, str]) -> str:
+    """${name} and $name replaced by values of plain "set name value" lines"""
+    return TCL_VAR_PATTERN.sub(
+        lambda match: tcl_vars.get(match.group(1) or match.group(2), match.group(0)),
+        text,
+    )
+
+
+def file_digest(path: PurePath) -> str:
+    """BLAKE2b hex digest of the file content"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while block := file.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def prefix_script(
+    lines: list[str], stage: str, def_path: PurePath, output_dir: PurePath
+) -> str:
+    """the script up to the stage command, exporting the placement after it"""
+    obj = replace_object(lines)
+    pattern = command_pattern(obj)
+    prefix: list[str] = []
+    for line in lines:
+        match = pattern.match(line)
+        command = match.group(1) if match else None
+        if command == "set_output":
+            continue
+        if command == "init_replace":
+            prefix.append(f"{obj} set_output {output_dir}/")
+        prefix.append(line.rstrip("\n"))
+        if command == stage:
+            break
+    prefix += [f"{obj} export_def {def_path}", "exit"]
+    return "\n".join(prefix) + "\n"
+
+
+def warm_script(lines: list[str], stage: str, def_path: PurePath) -> str:
+    """the script starting from the placement of def_path after the stage"""
+    obj = replace_object(lines)
+    pattern = command_pattern(obj)
+    skipped = STAGES[: STAGES.index(stage) + 1]
+    warm: list[str] = []
+    has_def = False
+    for line in lines:
+        match = pattern.match(line)
+        command = match.group(1) if match else None
+        if command in skipped or command == "set_seed_init_enable":
+            continue
+        if command == "import_def" and not has_def:
+            # only the first DEF is read
+            line = f"{obj} import_def {def_path}"
+            has_def = True
+        elif command == "init_replace":
+            warm.append(f"{obj} set_seed_init_enable 1")
+        warm.append(line.rstrip("\n"))
+    return "\n".join(warm) + "\n"
+
+
+class PlacementCache:
+    """cached placements of one stage in cache_dir: <key>.def, <key>.json
+
+    Safe to use from several threads; concurrent misses of one key build it
+    once.
+    """
+
+    def __init__(self, cache_dir: PurePath, stage: str = DEFAULT_STAGE):
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage {stage}; expected one of {STAGES}\n")
+        self.dir = Path(cache_dir)
+        self.stage = stage
+        self.ignored = OUTPUT_COMMANDS | (
+            NESTEROV_COMMANDS if stage == DEFAULT_STAGE else set()
+        )
+        # path -> (size, mtime_ns, digest) of input files seen so far
+        self.digests: dict[str, tuple[int, int, str]] = {}
+        # key -> lock held while the entry is built
+        self.locks: dict[str, threading.Lock] = {}
+        self.lock = threading.Lock()
+        # keys whose build failed in this process; they are not tried again
+        self.failed: set[str] = set()
+
+    def input_digest(self, path: PurePath) -> str:
+        stat = os.stat(path)
+        with self.lock:
+            cached = self.digests.get(str(path))
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+        digest = file_digest(path)
+        with self.lock:
+            self.digests[str(path)] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+    def key_of(
+        self, lines: list[str], work_dir: PurePath, replace_path: PurePath
+    ) -> str | None:
+        """cache key of the placement after the stage; None if the script has no
+        stage command
+
+        Raises:
+            ValueError: when the script creates no replace_external object
+            OSError: when an input file cannot be read
+        """
+        pattern = command_pattern(replace_object(lines))
+        if not any(
+            (match := pattern.match(line)) and match.group(1) == self.stage
+            for line in lines
+        ):
+            return None
+        replace_stat = os.stat(replace_path)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{CACHE_VERSION} {self.stage}\n".encode())
+        digest.update(f"{replace_stat.st_size} {replace_stat.st_mtime_ns}\n".encode())
+        tcl_vars: dict[str, str] = {}
+        for line in lines:
+            if match := SET_PATTERN.match(line):
+                name, value = match.groups()
+                if not value.startswith("["):
+                    tcl_vars[name] = substitute(value.strip('"'), tcl_vars)
+                continue
+            match = pattern.match(line)
+            if match is None:
+                continue
+            command, argument = match.group(1), substitute(match.group(2), tcl_vars)
+            if command in self.ignored:
+                continue
+            if command in INPUT_COMMANDS:
+                argument = self.input_digest(PurePath(work_dir, argument))
+            digest.update(f"{command} {argument}\n".encode())
+            if command == self.stage:
+                return digest.hexdigest()
+        return None
+
+    def def_path_of(self, key: str) -> Path:
+        return self.dir / f"{key}.def"
+
+    def build(
+        self,
+        key: str,
+        lines: list[str],
+        work_dir: PurePath,
+        replace_cmd: list[str],
+        timeout: float | None = None,
+    ) -> bool:
+        """runs the script up to the stage and stores the placement under key
+
+        Failing to build is not an error; the caller runs cold instead.
+        """
+        self.dir.mkdir(parents=True, exist_ok=True)
+        def_path = self.def_path_of(key)
+        log_path = self.dir / f"{key}.log"
+        fd, tmp_def_str = tempfile.mkstemp(prefix=key, suffix=".def.tmp", dir=self.dir)
+        os.close(fd)
+        tmp_def = Path(tmp_def_str)
+        output_dir = Path(tempfile.mkdtemp(prefix=key, dir=self.dir))
+        script_path = self.dir / f"{key}.tcl"
+        with open(script_path, "w") as file:
+            file.write(prefix_script(lines, self.stage, tmp_def, output_dir))
+
+        start_time = time.time()
+        status = "fail"
+        try:
+            with open(script_path) as tcl_file, open(log_path, "w") as log_file:
+                # own session: a timeout kills replace and everything it started
+                proc = subprocess.Popen(
+                    replace_cmd,
+                    cwd=work_dir,
+                    stdin=tcl_file,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                )
+                try:
+                    if proc.wait(timeout=timeout) == 0 and tmp_def.stat().st_size > 0:
+                        status = "ok"
+                except subprocess.TimeoutExpired:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                    proc.wait()
+                    status = "timeout"
+        except OSError as err:
+            print(Warning(f"Warm start {key} is not built: {err}"))
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+        if status != "ok":
+            tmp_def.unlink(missing_ok=True)
+            print(Warning(f"Warm start {key} is not built ({status}); see {log_path}"))
+            return False
+        os.replace(tmp_def, def_path)
+        with open(self.dir / f"{key}.json", "w") as file:
+            json.dump(
+                {
+                    "version": CACHE_VERSION,
+                    "stage": self.stage,
+                    "runtime": round(time.time() - start_time, 2),
+                    "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                file,
+                indent=2,
+            )
+        print(f"Warm start {key} is cached in {def_path}.")
+        return True
+
+    def warm_start(
+        self,
+        script: str,
+        work_dir: PurePath,
+        replace_cmd: list[str],
+        timeout: float | None = None,
+    ) -> str | None:
+        """script rewritten to start from the cached placement after the stage
+
+        The entry is built first on a miss.
+
+        Returns:
+            str | None: None when the script cannot be warm-started: it has no
+                stage command, an input cannot be read or the entry could not
+                be built
+        """
+        lines = script.splitlines()
+        try:
+            key = self.key_of(lines, work_dir, PurePath(replace_cmd[0]))
+        except OSError as err:
+            print(Warning(f"No warm start: {err}"))
+            return None
+        if key is None:
+            return None
+        with self.lock:
+            key_lock = self.locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key in self.failed:
+                return None
+            def_path = self.def_path_of(key)
+            if not os.path.exists(def_path):
+                if not self.build(key, lines, work_dir, replace_cmd, timeout):
+                    self.failed.add(key)
+                    return None
+        return warm_script(lines, self.stage, def_path.resolve())
+
+    def clear(self):
+        if self.dir.is_dir():
+            shutil.rmtree(self.dir)
+            print(f"Warm start cache {self.dir} is removed.")
+
+
+def main(
+    tcl_path_str: str,
+    stage: str = DEFAULT_STAGE,
+    cache_dir_str: str | None = None,
+    replace_path_str: str = "replace",
+    output_str: str | None = None,
+    clear: bool = False,
+):
+    tcl_path = Path(tcl_path_str).resolve()
+    cache = PlacementCache(
+        Path(cache_dir_str or tcl_path.with_name(DEFAULT_CACHE_DIR)), stage
+    )
+    if clear:
+        cache.clear()
+        return
+    replace_path = shutil.which(replace_path_str)
+    if replace_path is None:
+        raise SystemExit(f"no replace binary at {replace_path_str}")
+
+    with open(tcl_path) as file:
+        script = file.read()
+    replace_cmd = [str(Path(replace_path).resolve())]
+    warm = cache.warm_start(script, tcl_path.parent, replace_cmd)
+    if warm is None:
+        raise SystemExit(f"{tcl_path.name} cannot be warm-started after {stage}")
+    # next to the original, so that its relative paths still hold
+    output_path = Path(output_str or tcl_path.with_name(f"{tcl_path.stem}_warm.tcl"))
+    with open(output_path, "w") as file:
+        file.write(warm)
+    print(f"Warm-started script written to {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Cache the placement after a stage and warm-start a Tcl script"
+    )
+    parser.add_argument("tcl", help="Tcl script, e.g. gcd_nontd_test.tcl")
+    parser.add_argument(
+        "--stage",
+        choices=STAGES,
+        default=DEFAULT_STAGE,
+        help="stage whose placement is cached (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=f"cache directory (default: {DEFAULT_CACHE_DIR} next to tcl)",
+    )
+    parser.add_argument(
+        "--replace", default="replace", help="replace binary (default: from PATH)"
+    )
+    parser.add_argument(
+        "--output", help="warm-started script (default: <tcl stem>_warm.tcl)"
+    )
+    parser.add_argument(
+        "--clear", action="store_true", help="remove the cache directory and exit"
+    )
+    args = parser.parse_args()
+    main(args.tcl, args.stage, args.cache_dir, args.replace, args.output, args.clear)
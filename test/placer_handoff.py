@@ -0,0 +1,271 @@
+"""Hand a converted design to RePlAce in the same process, without LEF/DEF text
+
+PhysDesignData is passed as float64 / int64 NumPy columns through the
+import_bookshelf_* methods of the replace Python module (built with
+-DBUILD_PYTHON_MODULE=ON), which reads them in place; RePlAce fills its
+Bookshelf data model from them the way it would from *.aux files.
+After placement the movable node locations are copied back into object_db.
+
+    python placer_handoff.py design.aux --density 0.7 --pl placed.pl
+
+--check compares the initial HPWL against the LEF/DEF of the same design.
+"""
+import argparse
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import PurePath
+
+import numpy as np
+
+from bookshelf_class import ArrayObjectDB, ObjectDB
+from from_bookshelf_to_lefdef import convert, lefdef_paths, read_bookshelf
+from macro_component_maker import PhysDesignData
+
+# node types and pin directions as replace_external takes them
+MOVABLE, TERMINAL = 0, 1
+IO_CODES = {"I": 0, "O": 1}
+BIDIRECTIONAL = 2
+
+
+def node_indices(object_db: ObjectDB | ArrayObjectDB, names: list[str]) -> np.ndarray:
+    """index in object_db order of every named node, -1 for unknown names"""
+    if isinstance(object_db, ArrayObjectDB):
+        return object_db.indices_of(names)
+    node_idx = dict(zip(object_db.nodes, range(object_db.num_entry())))
+    return np.fromiter(
+        (node_idx.get(name, -1) for name in names), dtype=np.int64, count=len(names)
+    )
+
+
+def node_names(object_db: ObjectDB | ArrayObjectDB) -> list[str]:
+    return list(object_db.nodes)
+
+
+def handoff_arrays(pd_data: PhysDesignData) -> dict[str, np.ndarray | list]:
+    """the design as the columns of replace_external.import_bookshelf_*
+
+    Nodes keep their object_db order and net pins their *.nets order, so every
+    net pin becomes a pin of its own as in RePlAce's *.nets reader.
+
+    Raises:
+        ValueError: when a net refers to a node missing in *.nodes
+
+    Returns:
+        dict[str, np.ndarray | list]: node_*, net_*, pin_* and row_* columns,
+            float64 for geometry and int64 for the rest, plus the scalar
+            row_height and site_spacing
+    """
+    object_db, nets, region = pd_data.placement, pd_data.nets, pd_data.region
+    nets.finalize()
+    dx, dy, lx, ly, is_fixed = object_db.geometry()
+
+    cell_node = node_indices(object_db, nets.cell_names)
+    missing = np.flatnonzero(cell_node < 0)
+    if len(missing):
+        cell_name = nets.cell_names[missing[0]]
+        raise ValueError(f"net pin of {cell_name}, which is not in *.nodes\n")
+    io_codes = np.array(
+        [IO_CODES.get(io_name[:1], BIDIRECTIONAL) for io_name in nets.io_names],
+        dtype=np.int64,
+    )
+    net_pins = nets.net_pins
+
+    row_x = np.array(region.RowDBstartX, dtype=np.int64)
+    return {
+        "node_names": node_names(object_db),
+        "node_width": dx.astype(np.float64),
+        "node_height": dy.astype(np.float64),
+        "node_type": np.where(is_fixed, TERMINAL, MOVABLE).astype(np.int64),
+        "node_x": lx.astype(np.float64),
+        "node_y": ly.astype(np.float64),
+        "net_names": nets.net_names,
+        "net_ptr": nets.net_ptr.astype(np.int64, copy=False),
+        "pin_node": cell_node[nets.pin_cell[net_pins]],
+        "pin_io": io_codes[nets.pin_io[net_pins]],
+        "pin_x": nets.pin_x[net_pins].astype(np.float64, copy=False),
+        "pin_y": nets.pin_y[net_pins].astype(np.float64, copy=False),
+        "row_y": np.array(region.RowDB, dtype=np.float64),
+        "row_x": row_x.astype(np.float64),
+        "row_num_sites": np.array(region.RowDBendX, dtype=np.int64) - row_x,
+        "row_height": region.default_row_height,
+        "site_spacing": region.default_site_spacing,
+    }
+
+
+def master_names(pd_data: PhysDesignData) -> list[str]:
+    """macro name of every node, as written to the LEF"""
+    macros = pd_data.macros
+    return [macros[component.macro_id].name for component in pd_data.components]
+
+
+def import_design(rep, pd_data: PhysDesignData, design_name: str):
+    """stages pd_data in a replace_external instance; init_replace reads it
+
+    The columns already have the dtypes replace_external reads in place.
+    """
+    arrays = handoff_arrays(pd_data)
+    rep.set_design_name(design_name)
+    rep.import_bookshelf_nodes(
+        arrays["node_names"],
+        arrays["node_width"],
+        arrays["node_height"],
+        arrays["node_type"],
+    )
+    rep.import_bookshelf_masters(master_names(pd_data))
+    rep.import_bookshelf_placement(arrays["node_x"], arrays["node_y"])
+    rep.import_bookshelf_nets(
+        arrays["net_names"],
+        arrays["net_ptr"],
+        arrays["pin_node"],
+        arrays["pin_io"],
+        arrays["pin_x"],
+        arrays["pin_y"],
+    )
+    rep.import_bookshelf_rows(
+        arrays["row_y"],
+        arrays["row_x"],
+        arrays["row_num_sites"],
+        arrays["row_height"],
+        arrays["site_spacing"],
+        arrays["site_spacing"],
+    )
+
+
+def apply_placement(rep, object_db: ObjectDB | ArrayObjectDB):
+    """copies the instance locations of rep into the movable nodes of object_db
+
+    Instances are the movable nodes in object_db order; locations are rounded
+    to integers as *.pl has them.
+    """
+    names, _, xs, ys = rep.get_placement()
+    lxs = np.rint(xs).astype(np.int64)
+    lys = np.rint(ys).astype(np.int64)
+    if isinstance(object_db, ArrayObjectDB):
+        idxs = object_db.indices_of(names)
+        object_db.lx[idxs] = lxs
+        object_db.ly[idxs] = lys
+        return
+    for name, lx, ly in zip(names, lxs.tolist(), lys.tolist()):
+        object_db.set_node_loc(name, lx, ly)
+
+
+def write_pl(object_db: ObjectDB | ArrayObjectDB, pl_path: PurePath):
+    _, _, lxs, lys, fixed_flags = (column.tolist() for column in object_db.geometry())
+    with open(pl_path, "w") as file:
+        file.write("UCLA pl 1.0\n\n")
+        for name, lx, ly, is_fixed in zip(node_names(object_db), lxs, lys, fixed_flags):
+            fixed = " /FIXED" if is_fixed else ""
+            file.write(f"{name}\t{lx}\t{ly}\t: N{fixed}\n")
+    print(f"Placement written to {pl_path}")
+
+
+def import_replace():
+    try:
+        import replace
+    except ImportError as err:
+        raise SystemExit(
+            f"{err}: build RePlAce with -DBUILD_PYTHON_MODULE=ON and add the"
+            " directory of _replace to PYTHONPATH"
+        )
+    return replace
+
+
+def initial_hpwl(aux_path: PurePath, in_memory: bool, use_cache: bool = True) -> float:
+    """HPWL after init_replace, from the handed-over design or from its LEF/DEF"""
+    rep = import_replace().replace_external()
+    if in_memory:
+        pd_data = read_bookshelf(aux_path, columnar=True, use_cache=use_cache)
+        import_design(rep, pd_data, aux_path.stem)
+    else:
+        lef_path, def_path = lefdef_paths(aux_path)
+        rep.import_lef(str(lef_path))
+        rep.import_def(str(def_path))
+    rep.init_replace()
+    return rep.get_hpwl()
+
+
+def check_handoff(
+    aux_path: PurePath, use_cache: bool = True, rel_tol: float = 1e-6
+) -> tuple[float, float]:
+    """initial HPWL of the in-memory design and of its LEF/DEF, which must agree
+
+    RePlAce keeps the design in global state, so each side runs in a process
+    of its own.
+
+    Raises:
+        ValueError: when the two HPWLs differ by more than rel_tol
+
+    Returns:
+        tuple[float, float]: in-memory and LEF/DEF HPWL
+    """
+    aux_path = PurePath(aux_path)
+    convert(aux_path, use_cache=use_cache)
+    hpwls = []
+    for in_memory in (True, False):
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            future = pool.submit(initial_hpwl, aux_path, in_memory, use_cache)
+            hpwls.append(future.result())
+    in_memory_hpwl, lefdef_hpwl = hpwls
+    if not math.isclose(in_memory_hpwl, lefdef_hpwl, rel_tol=rel_tol):
+        raise ValueError(
+            f"in-memory HPWL {in_memory_hpwl} differs from LEF/DEF HPWL {lefdef_hpwl}\n"
+        )
+    return in_memory_hpwl, lefdef_hpwl
+
+
+def main(
+    aux_path_str: str,
+    density: float | None = None,
+    output: str | None = None,
+    pl_path_str: str | None = None,
+    use_cache: bool = True,
+    check: bool = False,
+):
+    aux_path = PurePath(aux_path_str)
+    if check:
+        in_memory_hpwl, lefdef_hpwl = check_handoff(aux_path, use_cache)
+        print(f"Initial HPWL: {in_memory_hpwl} in memory, {lefdef_hpwl} from LEF/DEF")
+        return
+
+    replace = import_replace()
+    pd_data = read_bookshelf(aux_path, columnar=True, use_cache=use_cache)
+    rep = replace.replace_external()
+    import_design(rep, pd_data, aux_path.stem)
+    if density is not None:
+        rep.set_density(density)
+    if output is not None:
+        rep.set_output(output)
+
+    rep.init_replace()
+    rep.place_cell_init_place()
+    rep.place_cell_nesterov_place()
+    print(f"HPWL: {rep.get_hpwl()}")
+
+    if pl_path_str is not None:
+        apply_placement(rep, pd_data.placement)
+        write_pl(pd_data.placement, PurePath(pl_path_str))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Place a Bookshelf design with RePlAce, handed over in memory"
+    )
+    parser.add_argument("aux", help="*.aux file for Bookshelf format data")
+    parser.add_argument("--density", type=float, help="target density")
+    parser.add_argument("--output", help="RePlAce output directory")
+    parser.add_argument("--pl", help="write the global placement as *.pl")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always parse the text files; do not read or write *.bookshelf_cache",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only compare the initial HPWL against that of the design's LEF/DEF",
+    )
+    args = parser.parse_args()
+    main(args.aux, args.density, args.output, args.pl, not args.no_cache, args.check)
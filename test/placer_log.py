@@ -0,0 +1,484 @@
+"""Placer log analytics: parse RePlAce logs and compare a run to a golden log
+
+The golden logs live in test/ok, e.g. ok/nangate45_gcd_0.9.log. A log is parsed
+into per-stage results (HPWL(IP), HPWL(cGP2D), RUNTIME(s)), per-iteration
+metrics of initial placement (IP lines) and Nesterov placement (ITER blocks),
+the CPU summary and the WNS / TNS reports. compare_logs flags every metric of
+a fresh run that is worse than the golden one beyond a tolerance.
+
+The output of a running placer can be followed line by line as well:
+IterationStream picks the Nesterov iterations out of it, and DivergenceCheck
+tells from their overflow trajectory when a run is diverging.
+"""
+import argparse
+import json
+import math
+import re
+import sys
+from pathlib import PurePath
+
+# INFO:  IP  0,  CG Error 0.000000,  HPWL 41065.140625,  CPUtime 0.04
+IP_PATTERN = re.compile(
+    r"^INFO:\s+IP\s+(\d+),\s+CG Error (\S+),\s+HPWL (\S+),\s+CPUtime (\S+)"
+)
+# PROC:  Standard Cell 2D Global Placement (cGP2D)
+STAGE_PATTERN = re.compile(r"^PROC:.*\((\w+)\)\s*$")
+# [INFO] Nesterov: 120 OverFlow: 0.313504 ScaledHpwl: 44012.3
+NESTEROV_PATTERN = re.compile(
+    r"^\[INFO\] Nesterov: (\d+) OverFlow: (\S+) ScaledHpwl: (\S+)"
+)
+# ITER: 12
+ITER_PATTERN = re.compile(r"^ITER:\s+(\d+)")
+#    HPWL=40769.421875 / HPWL=(20795.394531, 19974.029297) / CPU =0.058282
+ITER_VALUE_PATTERN = re.compile(r"^\s+(\w+)\s*=\s*(\S+)\s*$")
+ITER_XY_PATTERN = re.compile(r"^\s+HPWL=\((\S+), (\S+)\)")
+#    HPWL(IP): 56434.9609 (28701.6172, 27733.3438)
+RESULT_PATTERN = re.compile(r"^\s+HPWL\((\w+)\):\s+(\S+) \((\S+), (\S+)\)")
+#    RUNTIME(s) : 2.4413
+RUNTIME_PATTERN = re.compile(r"^\s+RUNTIME\(s\) : (\S+)")
+#  ### CPU_{IP, TP, mGP, LG, cGP, DP} is 0.06, 0.00, 0.00, 0.00, 2.44, 0.00.
+CPU_PATTERN = re.compile(r"### CPU_\{(.*)\} is (.*)\.\s*$")
+#  ### CPU_TOT is 2.56 seconds (0.04 min).
+CPU_TOT_PATTERN = re.compile(r"### CPU_TOT is (\S+) seconds")
+#  ### HPWL (x, y) of the design is 44384.16 (22384.05, 22000.11).
+FINAL_PATTERN = re.compile(r"### HPWL \(x, y\) of the design is (\S+) \((\S+), (\S+)\)")
+# WNS = 9.28882e-09 seconds
+TIMING_PATTERN = re.compile(r"^(WNS|TNS) = (\S+) seconds")
+
+DEFAULT_HPWL_TOL = 0.01
+DEFAULT_OVFL_TOL = 0.01
+DEFAULT_RUNTIME_TOL = 0.2
+# runtimes below this many seconds are too noisy to compare
+DEFAULT_RUNTIME_FLOOR = 1.0
+DEFAULT_ITER_TOL = 0.1
+DEFAULT_TIMING_TOL = 0.05
+
+# divergence: overflow swings by 0.3 and more for hundreds of iterations on
+# small designs before it converges (ok/nangate45_gcd_*.log), and HPWL grows
+# up to 3.5x while cells spread (ok/nangate45_ibex_core.log); none of the
+# golden logs trips these limits, sampled every iteration or every 10th
+DEFAULT_WARMUP_ITERS = 50
+DEFAULT_WINDOW_ITERS = 100
+DEFAULT_WINDOW_RISE = 0.03
+DEFAULT_NUM_RISES = 3
+DEFAULT_HPWL_GROWTH = 10.0
+
+
+class PlacerLog:
+    def __init__(self, path: PurePath):
+        self.path = path
+        # IP lines: index, cg_error, hpwl, cpu columns
+        self.ip: dict[str, list[float]] = {
+            "index": [],
+            "cg_error": [],
+            "hpwl": [],
+            "cpu": [],
+        }
+        # stage -> ITER block key (hpwl, ovfl, hpwl_x, ..., cpu) -> one value per iteration
+        self.iterations: dict[str, dict[str, list[float]]] = {}
+        # stage -> (hpwl, hpwl_x, hpwl_y) of its RESULT block
+        self.results: dict[str, tuple[float, float, float]] = {}
+        # stage -> RUNTIME(s) of its RESULT block
+        self.runtimes: dict[str, float] = {}
+        # CPU_{IP, TP, mGP, LG, cGP, DP} summary, plus "TOT"
+        self.cpu: dict[str, float] = {}
+        self.final_hpwl: tuple[float, float, float] | None = None
+        # every WNS / TNS report, in log order
+        self.wns: list[float] = []
+        self.tns: list[float] = []
+
+    def num_iterations(self) -> int:
+        return sum(len(columns.get("iter", [])) for columns in self.iterations.values())
+
+    def final_overflow(self) -> float | None:
+        """OVFL of the last Nesterov iteration"""
+        for columns in reversed(list(self.iterations.values())):
+            if columns.get("ovfl"):
+                return columns["ovfl"][-1]
+        return None
+
+    def metrics(self) -> dict[str, float]:
+        """flat metric name -> value; the names compare_logs reports"""
+        metrics: dict[str, float] = {}
+        if self.final_hpwl is not None:
+            metrics["hpwl"] = self.final_hpwl[0]
+        for stage, (hpwl, _, _) in self.results.items():
+            metrics[f"hpwl.{stage}"] = hpwl
+        overflow = self.final_overflow()
+        if overflow is not None:
+            metrics["overflow"] = overflow
+        if self.iterations:
+            metrics["iterations"] = self.num_iterations()
+        for stage, runtime in self.runtimes.items():
+            metrics[f"runtime.{stage}"] = runtime
+        for name, cpu in self.cpu.items():
+            metrics[f"cpu.{name}"] = cpu
+        if self.wns:
+            metrics["wns"] = self.wns[-1]
+        if self.tns:
+            metrics["tns"] = self.tns[-1]
+        return metrics
+
+
+def parse_placer_log(log_path: PurePath) -> PlacerLog:
+    """parses a RePlAce log into a PlacerLog
+
+    Args:
+        log_path (PurePath): *.log written by replace
+
+    Returns:
+        PlacerLog
+    """
+    log = PlacerLog(log_path)
+    stage = "GP"
+    iteration: dict[str, list[float]] | None = None
+    result_stage = None
+    with open(log_path, errors="replace") as file:
+        for line in file:
+            if match := IP_PATTERN.match(line):
+                for key, value in zip(log.ip, match.groups()):
+                    log.ip[key].append(float(value))
+                continue
+            if match := STAGE_PATTERN.match(line):
+                stage = match.group(1)
+                continue
+            if match := ITER_PATTERN.match(line):
+                iteration = log.iterations.setdefault(stage, {})
+                iteration.setdefault("iter", []).append(int(match.group(1)))
+                continue
+            if iteration is not None and line.startswith("    "):
+                if match := ITER_XY_PATTERN.match(line):
+                    iteration.setdefault("hpwl_x", []).append(float(match.group(1)))
+                    iteration.setdefault("hpwl_y", []).append(float(match.group(2)))
+                    continue
+                if match := ITER_VALUE_PATTERN.match(line):
+                    try:
+                        value = float(match.group(2))
+                    except ValueError:
+                        continue
+                    iteration.setdefault(match.group(1).lower(), []).append(value)
+                    continue
+            iteration = None
+            if match := RESULT_PATTERN.match(line):
+                result_stage = match.group(1)
+                log.results[result_stage] = tuple(map(float, match.groups()[1:]))
+            elif (match := RUNTIME_PATTERN.match(line)) and result_stage:
+                log.runtimes[result_stage] = float(match.group(1))
+            elif match := CPU_PATTERN.search(line):
+                names = [name.strip() for name in match.group(1).split(",")]
+                values = [float(value) for value in match.group(2).split(",")]
+                log.cpu.update(zip(names, values))
+            elif match := CPU_TOT_PATTERN.search(line):
+                log.cpu["TOT"] = float(match.group(1))
+            elif match := FINAL_PATTERN.search(line):
+                log.final_hpwl = tuple(map(float, match.groups()))
+            elif match := TIMING_PATTERN.match(line):
+                getattr(log, match.group(1).lower()).append(float(match.group(2)))
+    return log
+
+
+class IterationStream:
+    """picks Nesterov iterations out of placer output as it comes
+
+    replace prints an ITER block per iteration at verbose level 2 and above, and
+    an "[INFO] Nesterov:" line every 10 iterations below; both are read.
+    """
+
+    def __init__(self):
+        # the ITER block being read
+        self.iteration: int | None = None
+        self.hpwl: float | None = None
+
+    def feed(self, line: str) -> tuple[int, float, float] | None:
+        """(iteration, overflow, hpwl) when line completes an iteration"""
+        if match := NESTEROV_PATTERN.match(line):
+            self.iteration = None
+            try:
+                return int(match.group(1)), float(match.group(2)), float(match.group(3))
+            except ValueError:
+                return None
+        if match := ITER_PATTERN.match(line):
+            self.iteration, self.hpwl = int(match.group(1)), None
+            return None
+        if self.iteration is None or not line.startswith("    "):
+            if line.strip():
+                self.iteration = None
+            return None
+        match = ITER_VALUE_PATTERN.match(line)
+        if match is None or match.group(1) not in ("HPWL", "OVFL"):
+            return None
+        try:
+            value = float(match.group(2))
+        except ValueError:
+            return None
+        if match.group(1) == "HPWL":
+            self.hpwl = value
+            return None
+        if self.hpwl is None:
+            return None
+        iteration, self.iteration = self.iteration, None
+        return iteration, value, self.hpwl
+
+
+class DivergenceCheck:
+    """tells from a streamed overflow trajectory that a run is diverging
+
+    Single samples say little, as overflow of a healthy run may swing widely
+    before it converges. After warmup iterations the trajectory is judged by
+    the mean overflow of consecutive windows of window iterations. A run is
+    diverging when
+    - its overflow or HPWL is not finite,
+    - its HPWL grew beyond hpwl_growth times the first one,
+    - the mean overflow of a window is back at the highest overflow of the
+      warmup, where placement starts from, or
+    - the mean overflow rose by more than rise in num_rises windows in a row.
+    An iteration number below the last one starts a new placement stage, and
+    the check starts over.
+    """
+
+    def __init__(
+        self,
+        warmup: int = DEFAULT_WARMUP_ITERS,
+        window: int = DEFAULT_WINDOW_ITERS,
+        rise: float = DEFAULT_WINDOW_RISE,
+        num_rises: int = DEFAULT_NUM_RISES,
+        hpwl_growth: float = DEFAULT_HPWL_GROWTH,
+    ):
+        self.warmup = warmup
+        self.window = window
+        self.rise = rise
+        self.num_rises = num_rises
+        self.hpwl_growth = hpwl_growth
+        self.reason: str | None = None
+        self.restart()
+
+    def restart(self):
+        self.last_iteration = -1
+        self.first_hpwl: float | None = None
+        self.start_overflow = 0.0
+        self.window_idx = 0
+        self.window_overflows: list[float] = []
+        self.window_means: list[float] = []
+        self.num_rising = 0
+
+    def add(self, iteration: int, overflow: float, hpwl: float) -> str | None:
+        """takes one iteration
+
+        Returns:
+            str | None: why the run is diverging, from the iteration it is on
+        """
+        if self.reason is not None:
+            return self.reason
+        if iteration < self.last_iteration:
+            self.restart()
+        self.last_iteration = iteration
+        if not (math.isfinite(overflow) and math.isfinite(hpwl)):
+            self.reason = f"non-finite overflow {overflow} / HPWL {hpwl} at {iteration}"
+            return self.reason
+        if self.first_hpwl is None:
+            self.first_hpwl = hpwl
+        elif hpwl > self.hpwl_growth * self.first_hpwl > 0:
+            self.reason = (
+                f"HPWL {hpwl:.6g} at {iteration} is over {self.hpwl_growth:g}x"
+                f" the first {self.first_hpwl:.6g}"
+            )
+            return self.reason
+        if iteration < self.warmup:
+            self.start_overflow = max(self.start_overflow, overflow)
+            return None
+        window_idx = (iteration - self.warmup) // self.window
+        if window_idx != self.window_idx and self.window_overflows:
+            self.reason = self.close_window()
+        self.window_idx = window_idx
+        self.window_overflows.append(overflow)
+        return self.reason
+
+    def close_window(self) -> str | None:
+        mean = sum(self.window_overflows) / len(self.window_overflows)
+        self.window_overflows = []
+        end = self.warmup + (self.window_idx + 1) * self.window
+        if mean >= self.start_overflow:
+            return (
+                f"mean overflow {mean:.4f} up to {end} is back at the starting"
+                f" {self.start_overflow:.4f}"
+            )
+        if self.window_means and mean > self.window_means[-1] + self.rise:
+            self.num_rising += 1
+        else:
+            self.num_rising = 0
+        self.window_means.append(mean)
+        if self.num_rising >= self.num_rises:
+            return (
+                f"mean overflow rose in {self.num_rising} windows of"
+                f" {self.window} iterations in a row, to {mean:.4f} up to {end}"
+            )
+        return None
+
+
+class Finding:
+    def __init__(
+        self, metric: str, golden: float, fresh: float, limit: float, regression: bool
+    ):
+        self.metric = metric
+        self.golden = golden
+        self.fresh = fresh
+        # the worst fresh value still accepted
+        self.limit = limit
+        self.regression = regression
+
+    @property
+    def change(self) -> float | None:
+        """relative change from golden to fresh"""
+        if self.golden == 0:
+            return None
+        return (self.fresh - self.golden) / abs(self.golden)
+
+    def to_dict(self) -> dict:
+        return {
+            "metric": self.metric,
+            "golden": self.golden,
+            "fresh": self.fresh,
+            "change": self.change,
+            "limit": self.limit,
+            "regression": self.regression,
+        }
+
+
+class Tolerances:
+    def __init__(
+        self,
+        hpwl: float = DEFAULT_HPWL_TOL,
+        overflow: float = DEFAULT_OVFL_TOL,
+        runtime: float = DEFAULT_RUNTIME_TOL,
+        runtime_floor: float = DEFAULT_RUNTIME_FLOOR,
+        iterations: float = DEFAULT_ITER_TOL,
+        timing: float = DEFAULT_TIMING_TOL,
+    ):
+        # relative, except overflow (absolute) and runtime_floor (seconds)
+        self.hpwl = hpwl
+        self.overflow = overflow
+        self.runtime = runtime
+        self.runtime_floor = runtime_floor
+        self.iterations = iterations
+        self.timing = timing
+
+    def limit_of(self, metric: str, golden: float) -> float:
+        """the worst accepted value of a metric whose golden value is `golden`"""
+        kind = metric.split(".")[0]
+        match kind:
+            case "hpwl":
+                return golden * (1 + self.hpwl)
+            case "overflow":
+                return golden + self.overflow
+            case "iterations":
+                return golden * (1 + self.iterations)
+            case "runtime" | "cpu":
+                return max(golden * (1 + self.runtime), golden + self.runtime_floor)
+            case "wns" | "tns":
+                # slack: lower is worse
+                return golden - self.timing * abs(golden)
+        raise ValueError(f"Unknown metric {metric}")
+
+
+def compare_logs(
+    golden: PlacerLog, fresh: PlacerLog, tolerances: Tolerances | None = None
+) -> list[Finding]:
+    """compares every metric the two logs share
+
+    Returns:
+        list[Finding]: one per shared metric, regressions flagged
+    """
+    tolerances = tolerances or Tolerances()
+    golden_metrics, fresh_metrics = golden.metrics(), fresh.metrics()
+    findings: list[Finding] = []
+    for metric, golden_value in golden_metrics.items():
+        if metric not in fresh_metrics:
+            continue
+        fresh_value = fresh_metrics[metric]
+        limit = tolerances.limit_of(metric, golden_value)
+        if metric in ("wns", "tns"):
+            regression = fresh_value < limit
+        else:
+            regression = fresh_value > limit
+        findings.append(Finding(metric, golden_value, fresh_value, limit, regression))
+    return findings
+
+
+def print_findings(findings: list[Finding]):
+    print(f"{'metric':<18} {'golden':>14} {'fresh':>14} {'change':>9}")
+    for finding in findings:
+        change = finding.change
+        change_str = "-" if change is None else f"{change:+.2%}"
+        flag = "  REGRESSION" if finding.regression else ""
+        print(
+            f"{finding.metric:<18} {finding.golden:>14.6g} {finding.fresh:>14.6g}"
+            f" {change_str:>9}{flag}"
+        )
+    num_regressions = sum(finding.regression for finding in findings)
+    print(f"\t{num_regressions} regressions in {len(findings)} metrics")
+
+
+def main(
+    golden_path_str: str,
+    fresh_path_str: str,
+    tolerances: Tolerances,
+    json_path_str: str | None = None,
+) -> bool:
+    """
+    Returns:
+        bool: True when there is no regression
+    """
+    golden_path = PurePath(golden_path_str)
+    fresh_path = PurePath(fresh_path_str)
+    if golden_path.suffix != ".log":
+        # a directory of golden logs, e.g. test/ok: pick the one of the same name
+        golden_path = PurePath(golden_path, fresh_path.name)
+    golden = parse_placer_log(golden_path)
+    fresh = parse_placer_log(fresh_path)
+    findings = compare_logs(golden, fresh, tolerances)
+    print(f"golden: {golden_path}\nfresh : {fresh_path}")
+    print_findings(findings)
+    if json_path_str:
+        with open(json_path_str, "w") as file:
+            json.dump([finding.to_dict() for finding in findings], file, indent=2)
+    return not any(finding.regression for finding in findings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare a placer log against a golden log (see test/ok)"
+    )
+    parser.add_argument("golden", help="golden *.log, or a directory such as ok/")
+    parser.add_argument("fresh", help="*.log of the run to check")
+    parser.add_argument(
+        "--hpwl-tol", type=float, default=DEFAULT_HPWL_TOL, help="relative"
+    )
+    parser.add_argument(
+        "--ovfl-tol", type=float, default=DEFAULT_OVFL_TOL, help="absolute"
+    )
+    parser.add_argument(
+        "--runtime-tol", type=float, default=DEFAULT_RUNTIME_TOL, help="relative"
+    )
+    parser.add_argument(
+        "--runtime-floor",
+        type=float,
+        default=DEFAULT_RUNTIME_FLOOR,
+        help="seconds a runtime may grow by regardless of --runtime-tol",
+    )
+    parser.add_argument(
+        "--iter-tol", type=float, default=DEFAULT_ITER_TOL, help="relative"
+    )
+    parser.add_argument(
+        "--timing-tol", type=float, default=DEFAULT_TIMING_TOL, help="relative"
+    )
+    parser.add_argument("--json", default=None, help="also write the findings here")
+    args = parser.parse_args()
+    tolerances = Tolerances(
+        args.hpwl_tol,
+        args.ovfl_tol,
+        args.runtime_tol,
+        args.runtime_floor,
+        args.iter_tol,
+        args.timing_tol,
+    )
+    sys.exit(0 if main(args.golden, args.fresh, tolerances, args.json) else 1)
@@ -0,0 +1,400 @@
+"""Follow the logs of running replace jobs and show their progress live
+
+Every log is tailed by an asyncio task of its own: it keeps its read position
+and reads only what was appended since, so a log is never read twice. The
+initial placement lines (IP n, CG Error, HPWL, CPUtime) and the Nesterov
+iterations (ITER blocks, or "[INFO] Nesterov:" lines at low verbose levels)
+are parsed as they appear into a per-job progress table with iteration rate,
+ETA and divergence warnings (see placer_log.DivergenceCheck), redrawn every
+few seconds.
+
+    python placer_monitor.py td-test-01/exp td-test-02/exp gcd_nontd_test_sweep
+    python placer_monitor.py    # the logs the running replace processes write
+
+Directories are searched for *.log again and again, so logs of jobs started
+later are picked up as well.
+"""
+import argparse
+import asyncio
+import codecs
+import math
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path, PurePath
+
+from placer_log import IP_PATTERN, DivergenceCheck, IterationStream
+
+# iterations of initial placement at most (numInitPlaceIter) and of Nesterov
+# placement (max_iter of ns.cpp)
+MAX_IP_ITERS = 30
+MAX_NESTEROV_ITERS = 2500
+DEFAULT_TARGET_OVERFLOW = 0.1
+DEFAULT_INTERVAL = 2.0
+DEFAULT_POLL = 0.5
+DEFAULT_RESCAN = 10.0
+# bytes read at once before other tasks get their turn
+READ_CHUNK_SIZE = 1 << 20
+# seconds of progress the iteration rate is taken over
+RATE_WINDOW_S = 30.0
+# Nesterov iterations the overflow slope of the ETA is fitted over
+ETA_WINDOW_ITERS = 100
+# lines that end the global placement of a run
+DONE_MARKERS = (
+    "[INFO] Nesterov: NumIters",
+    "PROC:  END GLOBAL 2D PLACEMENT",
+    "### CPU_TOT",
+)
+
+
+def mean(values) -> float:
+    return sum(values) / len(values)
+
+
+class JobProgress:
+    """progress of one replace job, taken from the lines of its log"""
+
+    def __init__(self, path: PurePath, target_overflow: float):
+        self.path = path
+        self.target_overflow = target_overflow
+        self.reset()
+
+    def reset(self):
+        """forgets everything, e.g. when the log was started over"""
+        # start, IP, Nesterov or done
+        self.stage = "start"
+        self.ip_iter: int | None = None
+        self.cg_error: float | None = None
+        self.ip_cpu = 0.0
+        self.iteration: int | None = None
+        self.overflow: float | None = None
+        self.hpwl: float | None = None
+        self.stream = IterationStream()
+        self.check = DivergenceCheck()
+        self.warning: str | None = None
+        # (iteration, overflow) of the last ETA_WINDOW_ITERS iterations
+        self.trajectory: deque[tuple[int, float]] = deque()
+        # (wall-clock time, iterations of the stage) when lines arrived
+        self.samples: deque[tuple[float, int]] = deque()
+        self.last_growth: float | None = None
+
+    def enter(self, stage: str):
+        if stage != self.stage:
+            self.stage = stage
+            self.samples.clear()
+
+    def add_sample(self, now: float, progress: int):
+        self.samples.append((now, progress))
+        while self.samples and self.samples[0][0] < now - RATE_WINDOW_S:
+            self.samples.popleft()
+
+    def feed(self, line: str, now: float):
+        if match := IP_PATTERN.match(line):
+            self.enter("IP")
+            self.ip_iter = int(match.group(1))
+            self.cg_error = float(match.group(2))
+            self.hpwl = float(match.group(3))
+            self.ip_cpu += float(match.group(4))
+            self.add_sample(now, self.ip_iter)
+            return
+        if sample := self.stream.feed(line):
+            self.enter("Nesterov")
+            self.iteration, self.overflow, self.hpwl = sample
+            if self.trajectory and self.iteration < self.trajectory[-1][0]:
+                self.trajectory.clear()
+            self.trajectory.append((self.iteration, self.overflow))
+            while self.trajectory[0][0] < self.iteration - ETA_WINDOW_ITERS:
+                self.trajectory.popleft()
+            self.add_sample(now, self.iteration)
+            if self.warning is None:
+                self.warning = self.check.add(*sample)
+            return
+        if line.lstrip().startswith(DONE_MARKERS):
+            self.enter("done")
+
+    def rate(self) -> float | None:
+        """iterations per second of the current stage, while it is watched"""
+        if len(self.samples) < 2:
+            return None
+        (start_time, start), (end_time, end) = self.samples[0], self.samples[-1]
+        if end_time <= start_time or end <= start:
+            return None
+        return (end - start) / (end_time - start_time)
+
+    def remaining_iterations(self) -> float | None:
+        match self.stage:
+            case "IP":
+                return MAX_IP_ITERS - 1 - self.ip_iter
+            case "Nesterov":
+                if self.overflow <= self.target_overflow:
+                    return 0.0
+                # least-squares slope of overflow over the recent iterations
+                if len(self.trajectory) < 2:
+                    return None
+                iters = [iteration for iteration, _ in self.trajectory]
+                overflows = [overflow for _, overflow in self.trajectory]
+                iter_mean, overflow_mean = mean(iters), mean(overflows)
+                var = sum((x - iter_mean) ** 2 for x in iters)
+                cov = sum(
+                    (x - iter_mean) * (y - overflow_mean)
+                    for x, y in zip(iters, overflows)
+                )
+                if var == 0 or cov >= 0:
+                    return None
+                remaining = (self.overflow - self.target_overflow) / (-cov / var)
+                return min(remaining, MAX_NESTEROV_ITERS - self.iteration)
+        return None
+
+    def eta(self) -> float | None:
+        """seconds until the current stage ends, by its recent pace"""
+        rate, remaining = self.rate(), self.remaining_iterations()
+        if rate is None or remaining is None:
+            return None
+        return remaining / rate
+
+    def row(self, now: float) -> dict[str, str]:
+        def number(value: float | None, fmt: str) -> str:
+            if value is None or not math.isfinite(value):
+                return "-"
+            return f"{value:{fmt}}"
+
+        match self.stage:
+            case "IP":
+                iteration = f"{self.ip_iter}/{MAX_IP_ITERS}"
+            case "Nesterov" | "done" if self.iteration is not None:
+                iteration = str(self.iteration)
+            case _:
+                iteration = "-"
+        idle = None if self.last_growth is None else now - self.last_growth
+        return {
+            "job": str(self.path),
+            "stage": self.stage,
+            "iter": iteration,
+            "overflow": number(self.overflow, ".4f"),
+            "HPWL": number(self.hpwl, ".6g"),
+            "CG error": number(self.cg_error, ".2e"),
+            "IP CPU": number(self.ip_cpu if self.ip_iter is not None else None, ".2f"),
+            "it/s": number(self.rate(), ".1f"),
+            "ETA": number(None if self.stage == "done" else self.eta(), ".0f"),
+            "idle": number(idle, ".0f"),
+            "note": self.warning or "",
+        }
+
+
+class LogTail:
+    """the part of a log not read yet"""
+
+    def __init__(self, job: JobProgress):
+        self.job = job
+        self.file = None
+        self.inode: int | None = None
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.partial = ""
+
+    def reopen(self) -> bool:
+        """opens the log, again if it was replaced or cut; False if it is gone"""
+        try:
+            stat = os.stat(self.job.path)
+        except OSError:
+            return self.file is not None
+        if self.file is not None:
+            if stat.st_ino == self.inode and stat.st_size >= self.file.tell():
+                return True
+            self.file.close()
+        self.file = open(self.job.path, "rb")
+        self.inode = stat.st_ino
+        self.decoder.reset()
+        self.partial = ""
+        self.job.reset()
+        return True
+
+    def read_chunk(self, now: float) -> bool:
+        """feeds the complete lines of up to READ_CHUNK_SIZE new bytes
+
+        Returns:
+            bool: True when there may be more to read right away
+        """
+        if not self.reopen():
+            return False
+        data = self.file.read(READ_CHUNK_SIZE)
+        if not data:
+            return False
+        self.job.last_growth = now
+        lines = (self.partial + self.decoder.decode(data)).split("\n")
+        self.partial = lines.pop()
+        for line in lines:
+            self.job.feed(line, now)
+        return len(data) == READ_CHUNK_SIZE
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+async def follow(tail: LogTail, poll: float):
+    """reads what is appended to a log, for as long as the monitor runs"""
+    try:
+        while True:
+            while tail.read_chunk(time.time()):
+                # a long backlog: let the other logs and the table have a turn
+                await asyncio.sleep(0)
+            await asyncio.sleep(poll)
+    finally:
+        tail.close()
+
+
+def running_replace_logs() -> list[PurePath]:
+    """regular files the running replace processes write their stdout to"""
+    logs: list[PurePath] = []
+    try:
+        pids = [pid for pid in os.listdir("/proc") if pid.isdigit()]
+    except OSError:
+        return logs
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/comm") as file:
+                if file.read().strip() != "replace":
+                    continue
+            stdout = os.readlink(f"/proc/{pid}/fd/1")
+        except OSError:
+            continue
+        if os.path.isfile(stdout):
+            logs.append(PurePath(os.path.relpath(stdout)))
+    return logs
+
+
+def find_logs(paths: list[str]) -> list[PurePath]:
+    """the given logs, the *.log under the given directories, or without paths
+    the logs of the running replace processes"""
+    if not paths:
+        return running_replace_logs()
+    logs: list[PurePath] = []
+    for path_str in paths:
+        path = Path(path_str)
+        if path.is_dir():
+            logs += sorted(path.rglob("*.log"))
+        elif path.exists():
+            logs.append(path)
+    return logs
+
+
+def render(jobs: dict[PurePath, JobProgress], clear: bool):
+    now = time.time()
+    rows = [job.row(now) for job in jobs.values()]
+    if clear:
+        sys.stdout.write("\x1b[H\x1b[2J")
+    print(time.strftime("%H:%M:%S"), f"{len(rows)} jobs")
+    if rows:
+        columns = list(rows[0])
+        widths = [
+            max(len(column), *(len(row[column]) for row in rows)) for column in columns
+        ]
+        print("  ".join(f"{column:<{width}}" for column, width in zip(columns, widths)))
+        for row in rows:
+            values = [row[column] for column in columns]
+            print(
+                "  ".join(f"{value:<{width}}" for value, width in zip(values, widths))
+            )
+    sys.stdout.flush()
+
+
+async def monitor(
+    paths: list[str],
+    target_overflow: float = DEFAULT_TARGET_OVERFLOW,
+    interval: float = DEFAULT_INTERVAL,
+    poll: float = DEFAULT_POLL,
+    rescan: float = DEFAULT_RESCAN,
+    once: bool = False,
+):
+    jobs: dict[PurePath, JobProgress] = {}
+    tasks: list[asyncio.Task] = []
+    if once:
+        for log_path in find_logs(paths):
+            jobs[log_path] = JobProgress(log_path, target_overflow)
+            tail = LogTail(jobs[log_path])
+            while tail.read_chunk(time.time()):
+                pass
+            tail.close()
+        render(jobs, clear=False)
+        return
+
+    clear = sys.stdout.isatty()
+    last_scan = None
+    try:
+        while True:
+            if last_scan is None or time.time() - last_scan >= rescan:
+                last_scan = time.time()
+                for log_path in find_logs(paths):
+                    if log_path not in jobs:
+                        jobs[log_path] = JobProgress(log_path, target_overflow)
+                        tail = LogTail(jobs[log_path])
+                        tasks.append(asyncio.create_task(follow(tail, poll)))
+            render(jobs, clear)
+            await asyncio.sleep(interval)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main(
+    paths: list[str],
+    target_overflow: float = DEFAULT_TARGET_OVERFLOW,
+    interval: float = DEFAULT_INTERVAL,
+    poll: float = DEFAULT_POLL,
+    rescan: float = DEFAULT_RESCAN,
+    once: bool = False,
+):
+    try:
+        asyncio.run(monitor(paths, target_overflow, interval, poll, rescan, once))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Show the progress of running replace jobs from their logs"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="logs, or directories to watch for *.log"
+        " (default: the logs of the running replace processes)",
+    )
+    parser.add_argument(
+        "--target-overflow",
+        type=float,
+        default=DEFAULT_TARGET_OVERFLOW,
+        help="overflow the Nesterov ETA counts down to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help="seconds between table updates (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=DEFAULT_POLL,
+        help="seconds between reads of a log (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rescan",
+        type=float,
+        default=DEFAULT_RESCAN,
+        help="seconds between searches for new logs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="print the table once and exit"
+    )
+    args = parser.parse_args()
+    main(
+        args.paths,
+        args.target_overflow,
+        args.interval,
+        args.poll,
+        args.rescan,
+        args.once,
+    )
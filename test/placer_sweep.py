@@ -0,0 +1,465 @@
+"""Sweep RePlAce parameters over a grid, running the points in parallel
+
+A base Tcl script such as gcd_nontd_test.tcl is rewritten once per grid point:
+the swept set_* commands are issued before init_replace in place of those of
+the script, set_output and export_def are pointed into a directory of the
+point, and HPWL (and WNS / TNS of timing-driven scripts) are printed at the
+end. Every point runs "replace < point.tcl" in the directory of the base
+script, one point per core of the budget, since replace places on a single
+thread when run from Tcl.
+
+The output of each run is followed as it comes: a point whose overflow
+trajectory is diverging (see placer_log.DivergenceCheck) is cancelled. All
+points end up in one table, printed and saved as JSON and CSV.
+
+With --warm-start, points that share their initial placement run it once: they
+start from its placement in a placement_cache.PlacementCache.
+
+    python placer_sweep.py gcd_nontd_test.tcl --density 0.5,0.7,0.9,1.0 \\
+        --target-overflow 0.1,0.07 --cores 4
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePath
+
+from placement_cache import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_STAGE,
+    STAGES,
+    PlacementCache,
+    command_pattern,
+    replace_object,
+)
+from placer_log import (
+    DEFAULT_HPWL_GROWTH,
+    DEFAULT_NUM_RISES,
+    DEFAULT_WARMUP_ITERS,
+    DEFAULT_WINDOW_ITERS,
+    DEFAULT_WINDOW_RISE,
+    DivergenceCheck,
+    IterationStream,
+)
+
+# sweep parameter -> replace_external command and value type; the bin grid
+# count is set by set_number_of_bin_grids
+SWEEP_COMMANDS: dict[str, tuple[str, type]] = {
+    "density": ("set_density", float),
+    "target_overflow": ("set_target_overflow", float),
+    "bin_grids": ("set_number_of_bin_grids", int),
+    "min_pcof": ("set_min_pcof", float),
+    "max_pcof": ("set_max_pcof", float),
+    "lambda": ("set_lambda", float),
+}
+RESULT_PREFIX = "SWEEP"
+# SWEEP HPWL: 44384.16
+RESULT_PATTERN = re.compile(rf"^{RESULT_PREFIX} (HPWL|WNS|TNS): (\S+)")
+TABLE_COLUMNS = ("hpwl", "wns", "tns", "runtime", "overflow", "iterations")
+
+
+def parse_values(values_str: str, value_type: type) -> list:
+    return [value_type(value) for value in values_str.split(",") if value.strip()]
+
+
+def grid_points(grid: dict[str, list]) -> list[dict[str, float | int]]:
+    """every combination of the swept values, the last parameter varying fastest"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def point_name(idx: int, point: dict[str, float | int]) -> str:
+    values = [f"{name}{value:g}" for name, value in point.items()]
+    return "_".join([f"p{idx:03d}"] + values)
+
+
+def point_script(
+    base_lines: list[str], point: dict[str, float | int], point_dir: Path
+) -> tuple[str, bool]:
+    """the base script rewritten for one grid point
+
+    Raises:
+        ValueError: when the script creates no replace_external object or never
+            calls init_replace
+
+    Returns:
+        tuple[str, bool]: the script, and whether it is timing-driven
+    """
+    obj = replace_object(base_lines)
+    pattern = command_pattern(obj)
+    swept = {SWEEP_COMMANDS[name][0] for name in point} | {"set_output"}
+    settings = [f"{obj} set_output {point_dir}/output/"] + [
+        f"{obj} {SWEEP_COMMANDS[name][0]} {value}" for name, value in point.items()
+    ]
+    is_timing = False
+    has_init = False
+    lines: list[str] = []
+    for line in base_lines:
+        match = pattern.match(line)
+        command, argument = match.groups() if match else (None, "")
+        if command in swept:
+            continue
+        if command == "set_timing_driven":
+            is_timing = argument.lower() in ("1", "true")
+        elif command == "init_replace":
+            lines += settings
+            has_init = True
+        elif command == "export_def":
+            # the DEF goes next to the log of the point, under its own name
+            line = f"{obj} export_def {point_dir}/{argument.split('/')[-1]}"
+        lines.append(line.rstrip("\n"))
+    if not has_init:
+        raise ValueError(f"no {obj} init_replace in the base script\n")
+
+    results = [f'puts "{RESULT_PREFIX} HPWL: [{obj} get_hpwl]"']
+    if is_timing:
+        results += [
+            f'puts "{RESULT_PREFIX} WNS: [{obj} get_wns]"',
+            f'puts "{RESULT_PREFIX} TNS: [{obj} get_tns]"',
+        ]
+    # before a trailing exit, which would end the script first
+    end = len(lines)
+    while end > 0 and lines[end - 1].strip() in ("", "exit"):
+        end -= 1
+    lines[end:end] = results
+    return "\n".join(lines) + "\n", is_timing
+
+
+class SweepPoint:
+    def __init__(self, idx: int, point: dict[str, float | int], point_dir: Path):
+        self.idx = idx
+        self.point = point
+        self.dir = point_dir
+        self.script_path = point_dir / "point.tcl"
+        self.log_path = point_dir / "point.log"
+        self.is_timing = False
+        # started from a cached placement
+        self.is_warm = False
+        # ok, fail, diverged, timeout or error
+        self.status = "pending"
+        self.reason: str | None = None
+        self.exit_code: int | None = None
+        self.hpwl: float | None = None
+        self.wns: float | None = None
+        self.tns: float | None = None
+        self.runtime: float | None = None
+        # overflow of the last Nesterov iteration seen, and its number
+        self.overflow: float | None = None
+        self.iterations: int | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "point": self.idx,
+            **self.point,
+            "status": self.status,
+            "hpwl": self.hpwl,
+            "wns": self.wns,
+            "tns": self.tns,
+            "runtime": self.runtime,
+            "overflow": self.overflow,
+            "iterations": self.iterations,
+            "reason": self.reason,
+            "warm": self.is_warm,
+            "log": str(self.log_path),
+        }
+
+
+def kill_group(proc: subprocess.Popen):
+    """kills replace and everything it started"""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def run_point(
+    sweep_point: SweepPoint,
+    replace_cmd: list[str],
+    work_dir: PurePath,
+    timeout: float | None,
+    check_args: dict,
+    cache: PlacementCache | None = None,
+) -> SweepPoint:
+    """runs one point, following its output until it ends or is cancelled"""
+    if cache is not None:
+        with open(sweep_point.script_path) as file:
+            script = cache.warm_start(file.read(), work_dir, replace_cmd, timeout)
+        if script is not None:
+            sweep_point.script_path = sweep_point.dir / "point_warm.tcl"
+            with open(sweep_point.script_path, "w") as file:
+                file.write(script)
+            sweep_point.is_warm = True
+    stream = IterationStream()
+    check = DivergenceCheck(**check_args)
+    timed_out = threading.Event()
+
+    def on_timeout():
+        timed_out.set()
+        kill_group(proc)
+
+    start_time = time.time()
+    with open(sweep_point.script_path) as tcl_file, open(
+        sweep_point.log_path, "w"
+    ) as log_file:
+        try:
+            # own session: a cancelled point is killed with all its children
+            proc = subprocess.Popen(
+                replace_cmd,
+                cwd=work_dir,
+                stdin=tcl_file,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors="replace",
+                start_new_session=True,
+            )
+        except OSError as err:
+            log_file.write(f"cannot start {' '.join(replace_cmd)}: {err}\n")
+            sweep_point.status = "error"
+            sweep_point.reason = str(err)
+            return sweep_point
+        timer = threading.Timer(timeout, on_timeout) if timeout else None
+        if timer is not None:
+            timer.start()
+        for line in proc.stdout:
+            log_file.write(line)
+            if match := RESULT_PATTERN.match(line):
+                try:
+                    setattr(sweep_point, match.group(1).lower(), float(match.group(2)))
+                except ValueError:
+                    pass
+                continue
+            sample = stream.feed(line)
+            if sample is None or sweep_point.reason is not None:
+                continue
+            sweep_point.iterations, sweep_point.overflow, _ = sample
+            if reason := check.add(*sample):
+                sweep_point.reason = reason
+                log_file.write(f"{RESULT_PREFIX} cancelled: {reason}\n")
+                kill_group(proc)
+        sweep_point.exit_code = proc.wait()
+        if timer is not None:
+            timer.cancel()
+    sweep_point.runtime = round(time.time() - start_time, 2)
+
+    if sweep_point.reason is not None:
+        sweep_point.status = "diverged"
+    elif timed_out.is_set():
+        sweep_point.status = "timeout"
+        sweep_point.reason = f"over {timeout:g} s"
+    elif sweep_point.exit_code == 0 and sweep_point.hpwl is not None:
+        sweep_point.status = "ok"
+    else:
+        sweep_point.status = "fail"
+        sweep_point.reason = f"exit code {sweep_point.exit_code}"
+    if not sweep_point.is_timing:
+        sweep_point.wns = sweep_point.tns = None
+    print(
+        f"  {sweep_point.status:<8} {sweep_point.dir.name}"
+        f" ({sweep_point.runtime:.1f}s)"
+        + (f": {sweep_point.reason}" if sweep_point.status == "diverged" else "")
+    )
+    return sweep_point
+
+
+def format_value(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
+
+
+def print_table(sweep_points: list[SweepPoint], names: list[str]):
+    columns = ["point"] + names + ["status"] + list(TABLE_COLUMNS)
+    rows = [
+        [format_value(row[column]) for column in columns]
+        for row in (sweep_point.to_dict() for sweep_point in sweep_points)
+    ]
+    widths = [
+        max(len(column), *(len(row[col]) for row in rows))
+        for col, column in enumerate(columns)
+    ]
+    print("  ".join(f"{column:>{width}}" for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(f"{value:>{width}}" for value, width in zip(row, widths)))
+    num_ok = sum(sweep_point.status == "ok" for sweep_point in sweep_points)
+    print(f"\t{num_ok} of {len(sweep_points)} points placed")
+
+
+def write_table(sweep_points: list[SweepPoint], out_dir: Path):
+    rows = [sweep_point.to_dict() for sweep_point in sweep_points]
+    with open(out_dir / "sweep.json", "w") as file:
+        json.dump(rows, file, indent=2)
+    with open(out_dir / "sweep.csv", "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Table written to {out_dir / 'sweep.json'} and {out_dir / 'sweep.csv'}")
+
+
+def main(
+    base_path_str: str,
+    grid: dict[str, list],
+    replace_path_str: str = "replace",
+    out_dir_str: str | None = None,
+    cores: int | None = None,
+    timeout: float | None = None,
+    check_args: dict | None = None,
+    warm_stage: str | None = None,
+    cache_dir_str: str | None = None,
+) -> bool:
+    """
+    Returns:
+        bool: True when every point was placed
+    """
+    base_path = Path(base_path_str).resolve()
+    out_dir = Path(out_dir_str or base_path.with_name(f"{base_path.stem}_sweep"))
+    out_dir = out_dir.resolve()
+    replace_path = shutil.which(replace_path_str)
+    if replace_path is None:
+        raise SystemExit(f"no replace binary at {replace_path_str}")
+    replace_cmd = [str(Path(replace_path).resolve())]
+    cores = cores or os.cpu_count() or 1
+    cache = None
+    if warm_stage is not None:
+        cache_dir = Path(cache_dir_str or base_path.with_name(DEFAULT_CACHE_DIR))
+        cache = PlacementCache(cache_dir, warm_stage)
+
+    with open(base_path) as file:
+        base_lines = file.readlines()
+    sweep_points: list[SweepPoint] = []
+    for idx, point in enumerate(grid_points(grid)):
+        point_dir = out_dir / point_name(idx, point)
+        point_dir.mkdir(parents=True, exist_ok=True)
+        sweep_point = SweepPoint(idx, point, point_dir)
+        script, sweep_point.is_timing = point_script(base_lines, point, point_dir)
+        with open(sweep_point.script_path, "w") as file:
+            file.write(script)
+        sweep_points.append(sweep_point)
+
+    print(f"Sweeping {len(sweep_points)} points of {base_path.name} on {cores} cores")
+    with ThreadPoolExecutor(max_workers=cores) as executor:
+        futures = [
+            executor.submit(
+                run_point,
+                sweep_point,
+                replace_cmd,
+                base_path.parent,
+                timeout,
+                check_args or {},
+                cache,
+            )
+            for sweep_point in sweep_points
+        ]
+        for future in futures:
+            future.result()
+
+    print_table(sweep_points, list(grid))
+    write_table(sweep_points, out_dir)
+    return all(sweep_point.status == "ok" for sweep_point in sweep_points)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run a RePlAce Tcl script over a grid of parameters in parallel"
+    )
+    parser.add_argument("tcl", help="base Tcl script, e.g. gcd_nontd_test.tcl")
+    for name, (command, _) in SWEEP_COMMANDS.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            metavar="VALUES",
+            help=f"comma-separated values for {command}",
+        )
+    parser.add_argument(
+        "--replace", default="replace", help="replace binary (default: from PATH)"
+    )
+    parser.add_argument(
+        "--out-dir", help="directory of the points (default: <tcl stem>_sweep)"
+    )
+    parser.add_argument(
+        "--cores",
+        type=int,
+        default=None,
+        help="points run at once, one core each (default: all cores)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="seconds a point may run"
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=DEFAULT_WARMUP_ITERS,
+        help="Nesterov iterations before divergence is judged",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=DEFAULT_WINDOW_ITERS,
+        help="iterations whose mean overflow is compared",
+    )
+    parser.add_argument(
+        "--rise",
+        type=float,
+        default=DEFAULT_WINDOW_RISE,
+        help="rise of mean overflow from one window to the next counted as rising",
+    )
+    parser.add_argument(
+        "--num-rises",
+        type=int,
+        default=DEFAULT_NUM_RISES,
+        help="rising windows in a row that cancel a point",
+    )
+    parser.add_argument(
+        "--hpwl-growth",
+        type=float,
+        default=DEFAULT_HPWL_GROWTH,
+        help="growth of HPWL over its first value that cancels a point",
+    )
+    parser.add_argument(
+        "--warm-start",
+        nargs="?",
+        const=DEFAULT_STAGE,
+        choices=STAGES,
+        metavar="STAGE",
+        help="start points from the cached placement after STAGE"
+        f" (default: {DEFAULT_STAGE})",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=f"warm start cache (default: {DEFAULT_CACHE_DIR} next to tcl)",
+    )
+    args = parser.parse_args()
+    grid = {
+        name: parse_values(values_str, value_type)
+        for name, (_, value_type) in SWEEP_COMMANDS.items()
+        if (values_str := getattr(args, name)) is not None
+    }
+    check_args = {
+        "warmup": args.warmup,
+        "window": args.window,
+        "rise": args.rise,
+        "num_rises": args.num_rises,
+        "hpwl_growth": args.hpwl_growth,
+    }
+    all_placed = main(
+        args.tcl,
+        grid,
+        args.replace,
+        args.out_dir,
+        args.cores,
+        args.timeout,
+        check_args,
+        args.warm_start,
+        args.cache_dir,
+    )
+    sys.exit(0 if all_placed else 1)
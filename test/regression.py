@@ -1,42 +1,177 @@
 import os
+import re
 import sys
+import csv
+import json
+import time
+import signal
+import argparse
 import subprocess as sp
+from concurrent.futures import ThreadPoolExecutor
 
-useValgrind = False 
-useScreen = True
+useValgrind = False
+
+# memory one replace run may take; bounds the number of concurrent jobs
+DefaultMemPerJobGB = 4.0
+# per-job limit of wall-clock seconds
+DefaultTimeout = 3600
+SummaryJson = "regression_summary.json"
+SummaryCsv = "regression_summary.csv"
+SummaryFields = ["case", "tcl", "status", "exit_code", "runtime", "log", "rpt",
+                 "hpwl", "wns", "tns"]
 
 def ExecuteCommand( cmd ):
   print( cmd )
   sp.call( cmd, shell=True )
 
-def TdRun(tdList):
+def AvailableMemoryGB():
+  # MemAvailable of /proc/meminfo; None where it does not exist
+  try:
+    with open("/proc/meminfo") as f:
+      for line in f:
+        if line.startswith("MemAvailable:"):
+          return int(line.split()[1]) / (1 << 20)
+  except OSError:
+    pass
+  return None
+
+def NumWorkers(numJobs, memPerJobGB):
+  # bounded by cores and by the memory available right now
+  numWorkers = os.cpu_count() or 1
+  memGB = AvailableMemoryGB()
+  if memGB is not None and memPerJobGB > 0:
+    numWorkers = min(numWorkers, int(memGB // memPerJobGB))
+  return max(1, min(numWorkers, numJobs))
+
+def ReportPath(curTdCase, cFile):
+  # the *.rpt a tcl script writes: "set fp [open ${exp_folder}/${design}_1_td.rpt w]"
+  tclVars = {}
+  rptPath = None
+  with open(os.path.join(curTdCase, cFile)) as f:
+    for line in f:
+      words = line.split()
+      if len(words) >= 3 and words[0] == "set" and not words[2].startswith("["):
+        tclVars[words[1]] = words[2]
+      match = re.search(r"\[open\s+(\S+\.rpt)\s+w\]", line)
+      if match:
+        rptPath = match.group(1)
+  if rptPath is None:
+    return None
+  rptPath = re.sub(r"\$\{(\w+)\}", lambda m: tclVars.get(m.group(1), m.group(0)), rptPath)
+  return os.path.join(curTdCase, rptPath)
+
+def ParseReport(rptPath):
+  # "HPWL: <value>", "WNS: <value>", "TNS: <value>" rows
+  metrics = {"hpwl": None, "wns": None, "tns": None}
+  if rptPath is None or not os.path.exists(rptPath):
+    return metrics
+  with open(rptPath) as f:
+    for line in f:
+      key, _, value = line.partition(":")
+      key = key.strip().lower()
+      if key in metrics:
+        try:
+          metrics[key] = float(value)
+        except ValueError:
+          pass
+  return metrics
+
+def RunJob(curTdCase, cFile, timeout):
+  # runs "../replace < cFile" in curTdCase; the log goes to exp/cFile.log
+  logPath = os.path.join(curTdCase, "exp", "%s.log" % (cFile))
+  rptPath = ReportPath(curTdCase, cFile)
+  cmd = ["../replace"]
+  if useValgrind:
+    cmd = ["valgrind", "--log-fd=1"] + cmd
+  result = {"case": curTdCase, "tcl": cFile, "log": logPath, "rpt": rptPath,
+            "exit_code": None}
+
+  startTime = time.time()
+  with open(os.path.join(curTdCase, cFile)) as tclFile, open(logPath, "w") as logFile:
+    try:
+      # own session: a timeout kills replace and everything it started
+      proc = sp.Popen(cmd, cwd=curTdCase, stdin=tclFile, stdout=logFile,
+                      stderr=sp.STDOUT, start_new_session=True)
+    except OSError as err:
+      logFile.write("cannot start %s: %s\n" % (" ".join(cmd), err))
+      result["status"] = "error"
+      proc = None
+    if proc is not None:
+      try:
+        result["exit_code"] = proc.wait(timeout=timeout)
+        result["status"] = "ok" if result["exit_code"] == 0 else "fail"
+      except sp.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)
+        result["exit_code"] = proc.wait()
+        result["status"] = "timeout"
+  result["runtime"] = round(time.time() - startTime, 2)
+  result.update(ParseReport(rptPath))
+  print("  %-8s %s/%s (%.1fs)" % (result["status"], curTdCase, cFile, result["runtime"]))
+  return result
+
+def WriteSummary(results):
+  with open(SummaryJson, "w") as f:
+    json.dump(results, f, indent=2)
+  with open(SummaryCsv, "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=SummaryFields)
+    writer.writeheader()
+    writer.writerows(results)
+  print("Summary: %s, %s" % (SummaryJson, SummaryCsv))
+
+def PrintSummary(results):
+  print("%-12s %-26s %-8s %14s %14s %14s %9s" %
+        ("case", "tcl", "status", "HPWL", "WNS", "TNS", "runtime"))
+  for r in results:
+    metrics = ["-" if r[key] is None else "%.6g" % r[key] for key in ("hpwl", "wns", "tns")]
+    print("%-12s %-26s %-8s %14s %14s %14s %8.1fs" %
+          (r["case"], r["tcl"], r["status"], metrics[0], metrics[1], metrics[2], r["runtime"]))
+
+def TdRun(tdList, numWorkers=None, timeout=DefaultTimeout, memPerJobGB=DefaultMemPerJobGB):
   # regression for TD test cases
   for curTdCase in tdList:
     ExecuteCommand("rm -rf %s/exp" % (curTdCase))
     ExecuteCommand("rm -rf %s/output" % (curTdCase))
-  
+
+  jobs = []
   for curTdCase in tdList:
     print ( "Access " + curTdCase + ":")
-    for cFile in os.listdir(curTdCase):
+    os.makedirs(os.path.join(curTdCase, "exp"), exist_ok=True)
+    ExecuteCommand("cd %s && ln -sf ../*.dat ./" % (curTdCase))
+    for cFile in sorted(os.listdir(curTdCase)):
       if cFile.endswith(".tcl") == False:
         continue
       print ( "  " + cFile )
-      cmd = "cd %s && ../replace < %s |& tee exp/%s.log" % (curTdCase, cFile, cFile) 
-      ExecuteCommand("cd %s && ln -s ../*.dat ./" % (curTdCase))
-      if useValgrind: 
-        ExecuteCommand("cd %s && valgrind --log-fd=1 ../replace < %s |& tee exp/%s_valgrind.log" % (curTdCase, cFile, cFile) )
-      elif useScreen:
-        scName = "%s_%s" %(curTdCase, cFile)
-        ExecuteCommand("screen -dmS %s bash" %(scName))
-        ExecuteCommand("screen -S %s -X stuff \"%s \n\"" % (scName, cmd))
-      else:
-        ExecuteCommand(cmd)
-
-
-if len(sys.argv) <= 1:
+      jobs.append((curTdCase, cFile))
+
+  numWorkers = numWorkers or NumWorkers(len(jobs), memPerJobGB)
+  print("Running %d jobs, %d at a time, timeout %ds" % (len(jobs), numWorkers, timeout))
+  with ThreadPoolExecutor(max_workers=numWorkers) as executor:
+    futures = [executor.submit(RunJob, curTdCase, cFile, timeout) for curTdCase, cFile in jobs]
+    results = [future.result() for future in futures]
+
+  WriteSummary(results)
+  PrintSummary(results)
+  return all(r["status"] == "ok" for r in results)
+
+
+parser = argparse.ArgumentParser(description="regression for TD test cases")
+parser.add_argument("command", nargs="?", choices=["run", "skill", "get", "watch"],
+                    help="run: run every td-test*/*.tcl; skill: kill the screen"
+                    " sessions of older runs; get: print the last summary;"
+                    " watch: follow the logs of a run in progress")
+parser.add_argument("-j", "--jobs", type=int, default=None,
+                    help="concurrent jobs (default: by cores and available memory)")
+parser.add_argument("--timeout", type=int, default=DefaultTimeout,
+                    help="seconds after which a job is killed (default: %(default)s)")
+parser.add_argument("--mem-per-job", type=float, default=DefaultMemPerJobGB,
+                    help="GB of memory to reserve per job (default: %(default)s)")
+args = parser.parse_args()
+
+if args.command is None:
   print("Usage: python regression.py run")
   print("Usage: python regression.py skill")
   print("Usage: python regression.py get")
+  print("Usage: python regression.py watch")
   sys.exit(0)
 
 dirList = os.listdir(".")
@@ -48,9 +183,18 @@ for cdir in sorted(dirList):
   if "td-test" in cdir:
     tdList.append(cdir)
 
-if sys.argv[1] == "run":
-  TdRun(tdList)
-elif sys.argv[1] == "skill":
+if args.command == "run":
+  passed = TdRun(tdList, args.jobs, args.timeout, args.mem_per_job)
+  sys.exit(0 if passed else 1)
+elif args.command == "watch":
+  # tails td-test*/exp/*.log as "run" writes them
+  import placer_monitor
+  placer_monitor.main([os.path.join(curTdCase, "exp") for curTdCase in tdList])
+elif args.command == "skill":
   ExecuteCommand("for scr in $(screen -ls | awk '{print $1}'); do screen -S $scr -X kill; done")
 else:
-  ExecuteCommand("watch -n 3 \"grep -r 'HPWL' td-test*/exp/*.rpt; grep -r 'WNS' td-test*/exp/*.rpt; grep -r 'TNS' td-test*/exp/*.rpt\"")
+  if not os.path.exists(SummaryJson):
+    print("No %s; run \"python regression.py run\" first" % (SummaryJson))
+    sys.exit(1)
+  with open(SummaryJson) as f:
+    PrintSummary(json.load(f))
@@ -0,0 +1,250 @@
+"""Per-stage instrumentation of the converter, written as a JSON trace
+
+Code marks its stages with trace_stage, as a context manager or a decorator:
+
+    @trace_stage("read_net_input")
+    def nets(self): ...
+
+Without an active StageTracer a stage costs next to nothing. With one, every
+stage records wall and CPU time, RSS and peak RSS, the number of objects
+tracked by the garbage collector and, optionally, its tracemalloc peak.
+Stages nest: a part read lazily while the DEF is written is a child of
+write_def. A stage that starts in another thread, with no stage of its own
+open there, is a child of the stage the tracing thread is in; it records the
+name and the CPU time of its thread. cProfile can run over the whole traced
+run as well.
+"""
+import cProfile
+import datetime
+import gc
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import PurePath
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+MB = 1 << 20
+# functions of the cProfile summary in the trace
+PROFILE_TOP = 30
+
+# the tracer trace_stage reports to; None when tracing is off
+_active_tracer: "StageTracer | None" = None
+
+
+def rss_mb() -> float | None:
+    """resident set size of this process, from /proc where there is one"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_mb() -> float | None:
+    """highest resident set size of this process so far"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return max_rss / (MB if os.uname().sysname == "Darwin" else 1024)
+
+
+class StageRecord:
+    def __init__(
+        self,
+        name: str,
+        parent: int | None,
+        depth: int,
+        start: float,
+        thread: str | None = None,
+    ):
+        self.name = name
+        # index of the enclosing stage in StageTracer.records
+        self.parent = parent
+        self.depth = depth
+        # seconds since the tracer started
+        self.start = start
+        # the thread the stage ran in, unless it is the tracing thread
+        self.thread = thread
+        self.wall_seconds: float | None = None
+        # of this process only, or of self.thread; worker processes are not counted
+        self.cpu_seconds: float | None = None
+        self.rss_mb: float | None = None
+        self.peak_rss_mb: float | None = None
+        self.objects: int | None = None
+        self.objects_delta: int | None = None
+        self.tracemalloc_peak_mb: float | None = None
+        self.error: str | None = None
+
+    def to_dict(self) -> dict:
+        return {key: value for key, value in vars(self).items() if value is not None}
+
+
+class StageTracer:
+    """collects a StageRecord per stage while it is the active tracer"""
+
+    def __init__(
+        self,
+        count_objects: bool = True,
+        use_tracemalloc: bool = False,
+        profile: bool = False,
+    ):
+        self.count_objects = count_objects
+        self.use_tracemalloc = use_tracemalloc
+        self.profiler = cProfile.Profile() if profile else None
+        self.records: list[StageRecord] = []
+        self.local = threading.local()
+        # the thread that started tracing and its open stages
+        self.thread: threading.Thread | None = None
+        self.thread_stack: list[tuple[int, int]] = []
+        self.started_at: datetime.datetime | None = None
+        self.start_time = 0.0
+        self.start_cpu = 0.0
+        self.wall_seconds: float | None = None
+        self.cpu_seconds: float | None = None
+
+    def stack(self) -> list[tuple[int, int]]:
+        """(record index, tracemalloc peak seen so far) of the open stages"""
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def start(self):
+        global _active_tracer
+        _active_tracer = self
+        self.thread = threading.current_thread()
+        self.thread_stack = self.stack()
+        self.started_at = datetime.datetime.now()
+        self.start_time, self.start_cpu = time.perf_counter(), time.process_time()
+        if self.use_tracemalloc:
+            tracemalloc.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop(self):
+        global _active_tracer
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.use_tracemalloc:
+            tracemalloc.stop()
+        self.wall_seconds = time.perf_counter() - self.start_time
+        self.cpu_seconds = time.process_time() - self.start_cpu
+        if _active_tracer is self:
+            _active_tracer = None
+
+    @contextmanager
+    def stage(self, name: str):
+        stack = self.stack()
+        thread = threading.current_thread()
+        other_thread = thread is not self.thread
+        if stack:
+            parent = stack[-1][0]
+        elif other_thread and self.thread_stack:
+            parent = self.thread_stack[-1][0]
+        else:
+            parent = None
+        record = StageRecord(
+            name,
+            parent,
+            0 if parent is None else self.records[parent].depth + 1,
+            time.perf_counter() - self.start_time,
+            thread.name if other_thread else None,
+        )
+        self.records.append(record)
+        # CPU time of the process includes every other thread at work
+        cpu_time = time.thread_time if other_thread else time.process_time
+        objects = len(gc.get_objects()) if self.count_objects else None
+        if self.use_tracemalloc:
+            traced, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # the parent's peak so far, before the reset below loses it
+                stack[-1] = (stack[-1][0], max(stack[-1][1], peak))
+            tracemalloc.reset_peak()
+        stack.append((len(self.records) - 1, 0))
+        start, cpu_start = time.perf_counter(), cpu_time()
+        try:
+            yield record
+        except BaseException as err:
+            record.error = f"{type(err).__name__}: {err}"
+            raise
+        finally:
+            record.wall_seconds = time.perf_counter() - start
+            record.cpu_seconds = cpu_time() - cpu_start
+            _, peak_seen = stack.pop()
+            if self.use_tracemalloc:
+                peak = max(peak_seen, tracemalloc.get_traced_memory()[1])
+                record.tracemalloc_peak_mb = (peak - traced) / MB
+                if stack:
+                    stack[-1] = (stack[-1][0], max(stack[-1][1], peak))
+            record.rss_mb = rss_mb()
+            record.peak_rss_mb = peak_rss_mb()
+            if objects is not None:
+                record.objects = len(gc.get_objects())
+                record.objects_delta = record.objects - objects
+            logging.info(
+                f"{'  ' * record.depth}[{name}] {record.wall_seconds:.3f}s wall,"
+                f" {record.cpu_seconds:.3f}s CPU, RSS {record.rss_mb or 0:.0f} MB"
+            )
+
+    def profile_summary(self, top: int = PROFILE_TOP) -> list[dict]:
+        """the `top` functions by cumulative time"""
+        if self.profiler is None:
+            return []
+        stats = pstats.Stats(self.profiler)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": pstats.func_std_string(func),
+                "calls": num_calls,
+                "self_seconds": self_seconds,
+                "cumulative_seconds": cumulative_seconds,
+            }
+            for func, (_, num_calls, self_seconds, cumulative_seconds, _) in rows[:top]
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_rss_mb": peak_rss_mb(),
+            "tracemalloc": self.use_tracemalloc,
+            "stages": [record.to_dict() for record in self.records],
+            "profile": self.profile_summary(),
+        }
+
+    def write(self, trace_path: PurePath, info: dict | None = None):
+        """writes the JSON trace, plus the raw cProfile stats to <trace stem>.prof
+
+        Args:
+            trace_path (PurePath): *.json
+            info (dict | None, optional): added to the top level of the trace,
+                e.g. the command line. Defaults to None.
+        """
+        trace = {**(info or {}), **self.to_dict()}
+        if self.profiler is not None:
+            profile_path = PurePath(trace_path.parent, f"{trace_path.stem}.prof")
+            self.profiler.dump_stats(profile_path)
+            trace["profile_path"] = str(profile_path)
+        with open(trace_path, "w") as file:
+            json.dump(trace, file, indent=2)
+        print(f"Trace of {len(self.records)} stages written to {trace_path}")
+
+
+@contextmanager
+def trace_stage(name: str):
+    """marks a stage of the active tracer; does nothing when there is none"""
+    if _active_tracer is None:
+        yield None
+    else:
+        with _active_tracer.stage(name) as record:
+            yield record
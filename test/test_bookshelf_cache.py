@@ -0,0 +1,55 @@
+"""freshness checks and file handling of the Bookshelf cache"""
+import os
+from pathlib import PurePath
+
+import pytest
+
+import bookshelf_cache
+from bookshelf_cache import cache_path_of, current_umask, load_cache
+from bookshelf_synth import SyntheticDesign, write_bookshelf
+from from_bookshelf_to_lefdef import read_bookshelf, save_to_cache
+
+PARAMS = [12, 1]
+
+
+@pytest.fixture
+def cached_aux(tmp_path) -> PurePath:
+    aux_path = write_bookshelf(SyntheticDesign(2000, seed=1), tmp_path, "t")
+    pd_data = read_bookshelf(aux_path, columnar=True, use_cache=False)
+    # parts are read on first access; save_to_cache wants all of them
+    pd_data.region, pd_data.placement, pd_data.nets
+    save_to_cache(pd_data, aux_path)
+    assert os.path.exists(cache_path_of(aux_path))
+    return aux_path
+
+
+def test_cache_file_has_default_mode(cached_aux):
+    mode = os.stat(cache_path_of(cached_aux)).st_mode & 0o777
+    assert mode == 0o666 & ~current_umask()
+
+
+def test_touched_input_is_hashed_once(cached_aux, monkeypatch):
+    nets_path = cached_aux.with_suffix(".nets")
+    stat = os.stat(nets_path)
+    os.utime(nets_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    digests = []
+    file_digest = bookshelf_cache.file_digest
+    monkeypatch.setattr(
+        bookshelf_cache,
+        "file_digest",
+        lambda path: digests.append(path) or file_digest(path),
+    )
+
+    assert load_cache(cached_aux, PARAMS) is not None
+    assert len(digests) == 1
+    assert load_cache(cached_aux, PARAMS) is not None
+    assert len(digests) == 1
+
+
+def test_inaccessible_cache_is_kept(cached_aux, monkeypatch):
+    def read_header(file):
+        raise PermissionError(13, "Permission denied")
+
+    monkeypatch.setattr(bookshelf_cache, "read_header", read_header)
+    assert load_cache(cached_aux, PARAMS) is None
+    assert os.path.exists(cache_path_of(cached_aux))
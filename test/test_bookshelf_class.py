@@ -0,0 +1,119 @@
+"""name table and bulk readers of the ArrayObjectDB"""
+import numpy as np
+import pytest
+
+import bookshelf_class
+from bookshelf_class import (
+    ArrayObjectDB,
+    Node,
+    ObjectDB,
+    read_node_input,
+    read_placement_input,
+)
+
+
+def test_names_map_to_their_index():
+    object_db = ArrayObjectDB(capacity=2)
+    object_db.append("b2", 1, 2, False)
+    object_db.extend(["a", "c10", "b"], [3, 4, 5], [6, 7, 8], [True, False, False])
+    node = Node("é", 1, 1, 9, 9, "movable")
+    node.is_fixed = False
+    object_db.add_node(node)
+
+    names = ["b2", "a", "c10", "b", "é"]
+    assert list(object_db.nodes) == names
+    assert [object_db.name_of(idx) for idx in range(5)] == names
+    assert [object_db.find(name) for name in names] == [0, 1, 2, 3, 4]
+    assert object_db.find("c1") == object_db.find("b22") == -1
+    assert "c10" in object_db.nodes and "c" not in object_db.nodes
+    assert object_db.nodes["c10"].dy == 7
+    assert object_db.indices_of(["b", "x", "a", "c100"]).tolist() == [3, -1, 1, -1]
+
+    object_db.set_node_loc("c10", 11, 12)
+    copy = ArrayObjectDB.from_arrays(object_db.to_arrays())
+    assert list(copy.nodes) == names
+    assert copy.nodes["c10"].lx == 11
+    copy.append("d", 1, 1, False)
+    assert copy.find("d") == 5 and copy.find("b2") == 0
+
+
+def test_same_columns_as_object_db():
+    object_db, array_db = ObjectDB(), ArrayObjectDB(capacity=1)
+    for idx in range(300):
+        node = Node(f"n{idx * 7919 % 300}", idx, 2, idx, -idx, "movable")
+        node.is_fixed = idx % 5 == 0
+        object_db.add_node(node)
+        array_db.add_node(node)
+    for key, array in object_db.to_arrays().items():
+        assert np.array_equal(array_db.to_arrays()[key], array), key
+
+
+NODES = """UCLA nodes 1.0
+# irregular lines between regular ones go through the per-line reader
+
+NumNodes : 7
+NumTerminals : 2
+\ta\t4\t12
+\tb\t6\t12\tterminal
+# comment
+\tc\t+8\t12
+\td\t4\t12\tterminal_NI
+\tp\t1\t1\tterminal
+\tq\t2\t12 extra words
+"""
+PL = """UCLA pl 1.0
+
+a\t0\t0\t: N
+p\t-5\t30\t: N /FIXED
+c\t8\t0\t: N
+b 10 20 : N /FIXED
+d\t12\t+3\t: N
+q\t0\t12\t: FS
+"""
+
+
+@pytest.mark.parametrize("block_size", [16, 64, 1 << 18])
+def test_column_readers_match_line_readers(tmp_path, monkeypatch, block_size):
+    monkeypatch.setattr(bookshelf_class, "COLUMN_BLOCK_SIZE", block_size)
+    (tmp_path / "t.nodes").write_text(NODES)
+    (tmp_path / "t.pl").write_text(PL)
+    expected = read_node_input(tmp_path / "t.nodes")
+    read_placement_input(tmp_path / "t.pl", expected)
+    object_db = read_node_input(tmp_path / "t.nodes", columnar=True)
+    read_placement_input(tmp_path / "t.pl", object_db)
+
+    for key, array in expected.to_arrays().items():
+        assert np.array_equal(object_db.to_arrays()[key], array), key
+
+
+@pytest.mark.parametrize(
+    "pl_line",
+    [
+        "x\t0\t0\t: N",  # undefined node
+        "b\t0\t0\t: N",  # terminal that is not /FIXED
+        "c\tx\t0\t: N",  # no number
+    ],
+)
+def test_column_readers_raise_line_reader_errors(tmp_path, monkeypatch, pl_line):
+    monkeypatch.setattr(bookshelf_class, "COLUMN_BLOCK_SIZE", 64)
+    (tmp_path / "t.nodes").write_text(NODES)
+    (tmp_path / "t.pl").write_text(PL + pl_line + "\n" + PL.split("\n", 2)[2])
+    object_db = read_node_input(tmp_path / "t.nodes")
+    with pytest.raises(ValueError) as expected:
+        read_placement_input(tmp_path / "t.pl", object_db)
+    object_db = read_node_input(tmp_path / "t.nodes", columnar=True)
+    with pytest.raises(ValueError) as err:
+        read_placement_input(tmp_path / "t.pl", object_db)
+    assert str(err.value) == str(expected.value)
+
+
+@pytest.mark.parametrize(
+    "nodes", [NODES.replace("NumTerminals : 2\n", ""), NODES.split("NumTerminals")[0]]
+)
+def test_num_terminals_must_follow_num_nodes(tmp_path, nodes):
+    (tmp_path / "t.nodes").write_text(nodes)
+    with pytest.raises(ValueError) as expected:
+        read_node_input(tmp_path / "t.nodes")
+    with pytest.raises(ValueError) as err:
+        read_node_input(tmp_path / "t.nodes", columnar=True)
+    assert str(err.value) == str(expected.value)
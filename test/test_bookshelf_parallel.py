@@ -0,0 +1,85 @@
+"""parallel *.nets parsing must match the serial reader exactly"""
+import re
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import bookshelf_parallel
+from bookshelf_class import find_net_ranges, read_net_input
+from bookshelf_synth import SyntheticDesign, write_bookshelf
+from from_bookshelf_to_lefdef import read_bookshelf
+
+NUM_NETS = 300
+
+
+def write_nets(path: Path, bad_net: int | None = None) -> Path:
+    """writes a *.nets file whose pins repeat across nets and ranges"""
+    lines = ["UCLA nets 1.0", "# test", "", f"NumNets : {NUM_NETS}"]
+    pin_lines = []
+    for net_idx in range(NUM_NETS):
+        degree = 2 + net_idx % 4
+        pin_lines.append(f"NetDegree : {degree}   n{net_idx}")
+        for pin_idx in range(degree):
+            cell = (net_idx * 7 + pin_idx * 13) % (40 + net_idx // 3)
+            io = "IOB"[(net_idx + pin_idx) % 3]
+            x_offset = f"{(cell + pin_idx) % 5 - 2}.5"
+            if net_idx == bad_net and pin_idx == 1:
+                x_offset = "x"
+            pin_lines.append(f"\to{cell}\t{io} : {x_offset}\t{pin_idx % 3}.000000")
+    num_pins = sum(1 for line in pin_lines if line.startswith("\t"))
+    lines += [f"NumPins : {num_pins}", "", *pin_lines, ""]
+    path.write_text("\n".join(lines))
+    return path
+
+
+@pytest.fixture
+def small_ranges(monkeypatch):
+    monkeypatch.setattr(bookshelf_parallel, "MIN_RANGE_SIZE", 256)
+    monkeypatch.setattr(bookshelf_parallel, "RANGES_PER_WORKER", 8)
+
+
+def test_many_ranges_match_serial(tmp_path, small_ranges):
+    nets_path = write_nets(tmp_path / "t.nets")
+    assert len(find_net_ranges(nets_path, 16)) == 16
+
+    serial = read_net_input(nets_path)
+    parallel = read_net_input(nets_path, num_workers=2)
+    for key in ("net_ptr", "net_pins", "pin_cell", "pin_io", "pin_x", "pin_y"):
+        assert np.array_equal(getattr(parallel, key), getattr(serial, key)), key
+    assert parallel.net_names == serial.net_names
+    assert parallel.cell_names == serial.cell_names
+    assert parallel.io_names == serial.io_names
+
+
+def test_malformed_range_reports_absolute_line(tmp_path, small_ranges):
+    nets_path = write_nets(tmp_path / "t.nets", bad_net=NUM_NETS - 20)
+
+    with pytest.raises(UserWarning) as serial_err:
+        read_net_input(nets_path)
+    with pytest.raises(UserWarning) as parallel_err:
+        read_net_input(nets_path, num_workers=2)
+    line = re.search(r"at line (\d+)", str(serial_err.value))
+    assert line and int(line.group(1)) > 1000
+    assert str(parallel_err.value) == str(serial_err.value)
+
+
+def test_single_worker_matches_serial(tmp_path, monkeypatch):
+    aux_path = write_bookshelf(SyntheticDesign(2000, seed=5), tmp_path, "t")
+    pool_sizes = []
+    executor = bookshelf_parallel.ProcessPoolExecutor
+    monkeypatch.setattr(
+        bookshelf_parallel,
+        "ProcessPoolExecutor",
+        lambda max_workers: pool_sizes.append(max_workers) or executor(max_workers),
+    )
+
+    serial = read_bookshelf(aux_path, columnar=True, use_cache=False)
+    parallel = read_bookshelf(
+        aux_path, columnar=True, parallel=True, num_workers=1, use_cache=False
+    )
+    assert pool_sizes == [1]
+    for part in ("region", "placement", "nets"):
+        expected = getattr(serial, part).to_arrays()
+        for key, array in getattr(parallel, part).to_arrays().items():
+            assert np.array_equal(array, expected[key]), f"{part}.{key}"
@@ -0,0 +1,120 @@
+"""compressed and archived Bookshelf inputs parse like the plain files"""
+import bz2
+import gzip
+import io
+import lzma
+import shutil
+import tarfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import bookshelf_stream
+from bookshelf_class import read_node_input
+from bookshelf_stream import BackgroundReader, open_input
+from bookshelf_synth import SyntheticDesign, write_bookshelf
+from from_bookshelf_to_lefdef import read_bookshelf
+
+SUFFIXES = ("aux", "nodes", "nets", "wts", "pl", "scl")
+COMPRESSORS = {
+    ".gz": gzip.compress,
+    ".bz2": bz2.compress,
+    ".xz": lzma.compress,
+}
+if bookshelf_stream.zstandard is not None:
+    COMPRESSORS[".zst"] = bookshelf_stream.zstandard.ZstdCompressor().compress
+
+
+def parsed_arrays(aux_path: Path) -> dict[str, np.ndarray]:
+    pd_data = read_bookshelf(aux_path, columnar=True, use_cache=False)
+    arrays = {}
+    for part in ("region", "placement", "nets"):
+        for key, array in getattr(pd_data, part).to_arrays().items():
+            arrays[f"{part}.{key}"] = array
+    return arrays
+
+
+def assert_same_arrays(arrays: dict, expected: dict):
+    assert arrays.keys() == expected.keys()
+    for key, array in expected.items():
+        assert np.array_equal(arrays[key], array), key
+
+
+@pytest.fixture(scope="module")
+def plain_design(tmp_path_factory) -> Path:
+    out_dir = tmp_path_factory.mktemp("plain")
+    return Path(write_bookshelf(SyntheticDesign(3000, seed=4), out_dir, "t"))
+
+
+@pytest.fixture(scope="module")
+def plain_arrays(plain_design) -> dict[str, np.ndarray]:
+    return parsed_arrays(plain_design)
+
+
+@pytest.mark.parametrize("suffix", sorted(COMPRESSORS))
+def test_compressed_design_parses_like_plain(
+    suffix, plain_design, plain_arrays, tmp_path
+):
+    for name in SUFFIXES:
+        data = plain_design.with_suffix(f".{name}").read_bytes()
+        (tmp_path / f"t.{name}{suffix}").write_bytes(COMPRESSORS[suffix](data))
+    assert_same_arrays(parsed_arrays(tmp_path / f"t.aux{suffix}"), plain_arrays)
+
+
+@pytest.mark.parametrize("mode", ["w", "w:gz", "w:bz2", "w:xz"])
+def test_archived_design_parses_like_plain(mode, plain_design, plain_arrays, tmp_path):
+    archive_name = "t.tar" + {"w": "", "w:gz": ".gz", "w:bz2": ".bz2", "w:xz": ".xz"}[mode]
+    with tarfile.open(tmp_path / archive_name, mode) as tar:
+        for name in SUFFIXES:
+            tar.add(plain_design.with_suffix(f".{name}"), arcname=f"t/t.{name}")
+    aux_path = tmp_path / archive_name / "t" / "t.aux"
+    assert_same_arrays(parsed_arrays(aux_path), plain_arrays)
+
+
+def test_str_paths_are_accepted(plain_design):
+    object_db = read_node_input(str(plain_design.with_suffix(".nodes")), columnar=True)
+    assert object_db.num_entry() > 0
+
+
+def test_background_reader_returns_the_stream_in_small_blocks():
+    data = bytes(range(256)) * 1000
+    reader = BackgroundReader(io.BytesIO(data), block_size=1000, queue_blocks=2)
+    chunks = [reader.read(777) for _ in range(2)]
+    chunks.append(reader.read())
+    reader.close()
+    assert b"".join(chunks) == data
+
+
+def test_background_reader_raises_the_error_of_its_thread():
+    class FailingSource(io.RawIOBase):
+        def __init__(self):
+            self.reads = 0
+
+        def readable(self) -> bool:
+            return True
+
+        def read(self, size: int = -1) -> bytes:
+            self.reads += 1
+            if self.reads > 2:
+                raise OSError("disk gone")
+            return b"x" * size
+
+    reader = BackgroundReader(FailingSource(), block_size=10)
+    with pytest.raises(OSError, match="disk gone"):
+        reader.read()
+    reader.close()
+    assert not reader.thread.is_alive()
+
+
+def test_closing_early_stops_the_background_thread(plain_design, tmp_path):
+    gz_path = tmp_path / "t.nets.gz"
+    with open(plain_design.with_suffix(".nets"), "rb") as src, gzip.open(
+        gz_path, "wb"
+    ) as dst:
+        shutil.copyfileobj(src, dst)
+    threads_before = threading.active_count()
+    with open_input(gz_path) as file:
+        assert file.read(10)
+    assert threading.active_count() == threads_before
@@ -0,0 +1,65 @@
+"""density overflow of a hand-computed placement"""
+import pytest
+
+from bookshelf_class import (
+    DEFAULT_ROW_HEIGHT,
+    DEFAULT_SITE_SPACING,
+    read_node_input,
+    read_placement_input,
+    read_row_input,
+)
+from density_checker import check_density_target
+
+# one row of 20 sites and 12 x 12 bins: bin 0 has cap 144, bin 1 (cut at x = 20)
+# has cap 96. Two stacked fixed blocks put FUSAGE 192 into bin 1, so its free
+# space is max(96 - 192, 0) = 0. Cell a fills bin 0, cell b sits in bin 1.
+NODES = """UCLA nodes 1.0
+
+NumNodes : 4
+NumTerminals : 2
+\ta\t12\t12
+\tb\t4\t12
+\tf0\t8\t12\tterminal
+\tf1\t8\t12\tterminal
+"""
+PL = """UCLA pl 1.0
+
+a\t0\t0\t: N
+b\t12\t0\t: N
+f0\t12\t0\t: N /FIXED
+f1\t12\t0\t: N /FIXED
+"""
+SCL = """UCLA scl 1.0
+
+NumRows : 1
+
+CoreRow Horizontal
+  Coordinate    :   0
+  Height        :   12
+  Sitewidth     :    1
+  Sitespacing   :    1
+  Siteorient    :    1
+  Sitesymmetry  :    1
+  SubrowOrigin  :   0\tNumSites  :  20
+End
+"""
+
+
+def test_overflow_of_small_grid(tmp_path):
+    for suffix, text in (("nodes", NODES), ("pl", PL), ("scl", SCL)):
+        (tmp_path / f"t.{suffix}").write_text(text)
+    region = read_row_input(tmp_path / "t.scl", DEFAULT_ROW_HEIGHT, DEFAULT_SITE_SPACING)
+    object_db = read_node_input(tmp_path / "t.nodes", columnar=True)
+    read_placement_input(tmp_path / "t.pl", object_db)
+
+    report = check_density_target(region, object_db, 0.5, bin_row_factor=1)
+    assert report.num_bins == 2
+    assert report.bin_area == 144
+    assert report.total_movable_area == 144 + 48
+    # bin 0: 144 - 0.5 * 144 = 72; bin 1: 48 - 0.5 * 0 = 48
+    assert report.num_overflow_bins == 2
+    assert report.total_overflow == 72 + 48
+    assert report.max_density == 1.0
+    # 120 / 192 * 144 * 0.5
+    assert report.overflow_ratio == pytest.approx(0.625)
+    assert report.scaled_overflow_per_bin == pytest.approx(45.0)
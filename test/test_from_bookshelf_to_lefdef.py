@@ -0,0 +1,127 @@
+"""DEF output of the Bookshelf to LEF/DEF converter"""
+from pathlib import Path
+
+import bookshelf_cache
+from bookshelf_synth import SyntheticDesign, write_bookshelf
+from from_bookshelf_to_lefdef import convert, lefdef_paths
+
+# cells a and b both have pins I1 and O1; b also has I2
+SHARED_PIN_NAMES = {
+    "aux": "RowBasedPlacement :  t.nodes  t.nets  t.wts  t.pl  t.scl\n",
+    "nodes": """UCLA nodes 1.0
+
+NumNodes : 3
+NumTerminals : 1
+\ta\t4\t12
+\tb\t4\t12
+\tp\t1\t1\tterminal
+""",
+    "nets": """UCLA nets 1.0
+
+NumNets : 3
+NumPins : 7
+
+NetDegree : 2   n0
+\ta\tO : 1.0\t0.0
+\tb\tI : -1.0\t0.0
+NetDegree : 3   n1
+\tb\tO : 1.0\t0.0
+\ta\tI : -1.0\t0.0
+\tp\tI : 0.0\t0.0
+NetDegree : 2   n2
+\tb\tI : -1.0\t2.0
+\ta\tO : 1.0\t0.0
+""",
+    "wts": "UCLA wts 1.0\n",
+    "pl": """UCLA pl 1.0
+
+a\t0\t0\t: N
+b\t8\t0\t: N
+p\t0\t30\t: N /FIXED
+""",
+    "scl": """UCLA scl 1.0
+
+NumRows : 2
+
+CoreRow Horizontal
+  Coordinate    :   0
+  Height        :   12
+  Sitewidth     :    1
+  Sitespacing   :    1
+  Siteorient    :    1
+  Sitesymmetry  :    1
+  SubrowOrigin  :   0\tNumSites  :  20
+End
+CoreRow Horizontal
+  Coordinate    :   12
+  Height        :   12
+  Sitewidth     :    1
+  Sitespacing   :    1
+  Siteorient    :    1
+  Sitesymmetry  :    1
+  SubrowOrigin  :   0\tNumSites  :  20
+End
+""",
+}
+
+
+def write_design(out_dir: Path, files: dict[str, str]) -> Path:
+    for suffix, text in files.items():
+        (out_dir / f"t.{suffix}").write_text(text)
+    return out_dir / "t.aux"
+
+
+def def_section(def_path: Path, section: str) -> list[str]:
+    """lines between `<section> n ;` and `END <section>` of a DEF file"""
+    lines = Path(def_path).read_text().splitlines()
+    start = next(idx for idx, line in enumerate(lines) if line.startswith(section))
+    end = lines.index(f"END {section}")
+    return lines[start + 1 : end]
+
+
+def test_nets_name_the_cell_of_every_pin(tmp_path):
+    aux_path = write_design(tmp_path, SHARED_PIN_NAMES)
+    convert(aux_path, use_cache=False)
+
+    _, def_path = lefdef_paths(aux_path)
+    assert def_section(def_path, "NETS") == [
+        "- n0 ( a O1 ) ( b I1 ) ;",
+        "- n1 ( b O1 ) ( a I1 ) ( p I1 ) ;",
+        "- n2 ( b I2 ) ( a O1 ) ;",
+    ]
+
+
+def test_incremental_def_equals_full_conversion(tmp_path, capsys, monkeypatch):
+    aux_path = Path(write_bookshelf(SyntheticDesign(2000, seed=3), tmp_path, "t"))
+    convert(aux_path)
+    _, def_path = lefdef_paths(aux_path)
+    original_def = Path(def_path).read_bytes()
+    pl_path = aux_path.with_suffix(".pl")
+    # only fixed components carry a location in the DEF: move those
+    moved = []
+    for line in pl_path.read_text().splitlines():
+        words = line.split()
+        if words[-1:] == ["/FIXED"]:
+            words[1] = str(int(words[1]) + 2)
+            line = "\t".join(words)
+        moved.append(line)
+    pl_path.write_text("\n".join(moved) + "\n")
+
+    capsys.readouterr()
+    convert(aux_path, incremental=True)
+    assert "COMPONENTS of" in capsys.readouterr().out
+    incremental_def = Path(def_path).read_bytes()
+    assert incremental_def != original_def
+
+    hashed = []
+    file_digest = bookshelf_cache.file_digest
+    monkeypatch.setattr(
+        bookshelf_cache,
+        "file_digest",
+        lambda path: hashed.append(str(path)) or file_digest(path),
+    )
+    convert(aux_path)
+    assert Path(def_path).read_bytes() == incremental_def
+    # the netlist files are hashed once, for both the stamp and the cache
+    for suffix in (".scl", ".nodes", ".nets"):
+        assert hashed.count(str(aux_path.with_suffix(suffix))) == 1
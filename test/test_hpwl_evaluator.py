@@ -0,0 +1,28 @@
+"""HPWL from the Nets pin table must equal HPWL from the raw net records"""
+import numpy as np
+
+from bookshelf_class import (
+    BookshelfPaths,
+    read_net_input,
+    read_net_records,
+    read_node_input,
+    read_placement_input,
+)
+from bookshelf_synth import SyntheticDesign, write_bookshelf
+from hpwl_evaluator import NetCSR, evaluate_hpwl
+
+
+def test_from_nets_matches_from_records(tmp_path):
+    paths = BookshelfPaths(write_bookshelf(SyntheticDesign(2000, seed=2), tmp_path, "t"))
+    object_db = read_node_input(paths.nodes, columnar=True)
+    read_placement_input(paths.pl, object_db)
+
+    from_records = evaluate_hpwl(
+        NetCSR.from_records(read_net_records(paths.nets), object_db), object_db
+    )
+    from_nets = evaluate_hpwl(
+        NetCSR.from_nets(read_net_input(paths.nets), object_db), object_db
+    )
+    assert from_nets.net_names == from_records.net_names
+    assert np.array_equal(from_nets.hpwl_x, from_records.hpwl_x)
+    assert np.array_equal(from_nets.hpwl_y, from_records.hpwl_y)
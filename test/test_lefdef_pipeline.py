@@ -0,0 +1,41 @@
+"""the pipelined converter writes what convert() writes"""
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from bookshelf_synth import SyntheticDesign, write_bookshelf
+from from_bookshelf_to_lefdef import convert, lefdef_paths
+
+
+def test_pipelined_output_is_byte_identical(tmp_path):
+    aux_path = Path(write_bookshelf(SyntheticDesign(3000, seed=6), tmp_path, "t"))
+    lef_path, def_path = lefdef_paths(aux_path)
+    convert(aux_path, use_cache=False)
+    expected = Path(lef_path).read_bytes(), Path(def_path).read_bytes()
+
+    convert(aux_path, use_cache=False, pipelined=True, num_workers=2)
+    assert (Path(lef_path).read_bytes(), Path(def_path).read_bytes()) == expected
+
+
+def break_last_line(path: Path, word_idx: int):
+    """replaces a number on the last line of a file with a word"""
+    lines = path.read_text().splitlines()
+    words = lines[-1].split()
+    words[word_idx] = "x"
+    lines[-1] = "\t".join(words)
+    path.write_text("\n".join(lines) + "\n")
+
+
+# a width in *.nodes, an x in *.pl and a pin offset in *.nets
+@pytest.mark.parametrize("suffix, word_idx", [(".nodes", 1), (".pl", 1), (".nets", -1)])
+def test_failing_stage_reaches_caller(tmp_path, suffix, word_idx):
+    aux_path = Path(write_bookshelf(SyntheticDesign(3000, seed=6), tmp_path, "t"))
+    break_last_line(aux_path.with_suffix(suffix), word_idx)
+
+    with pytest.raises((ValueError, UserWarning)) as serial_err:
+        convert(aux_path, use_cache=False)
+    with pytest.raises(type(serial_err.value)) as pipelined_err:
+        convert(aux_path, use_cache=False, pipelined=True, num_workers=2)
+    assert str(pipelined_err.value) == str(serial_err.value)
+    assert multiprocessing.active_children() == []
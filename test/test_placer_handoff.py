@@ -0,0 +1,52 @@
+"""the in-memory handoff must pass columns as arrays and match the LEF/DEF path"""
+import numpy as np
+import pytest
+
+from bookshelf_synth import SyntheticDesign, write_bookshelf
+from from_bookshelf_to_lefdef import read_bookshelf
+from placer_handoff import check_handoff, handoff_arrays, import_design
+
+
+class RecordingReplace:
+    """stands in for replace_external and keeps the arguments of every call"""
+
+    def __init__(self):
+        self.calls = {}
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.setdefault(name, args)
+
+
+def test_columns_are_passed_as_arrays(tmp_path):
+    aux_path = write_bookshelf(SyntheticDesign(2000, seed=4), tmp_path, "t")
+    pd_data = read_bookshelf(aux_path, columnar=True, use_cache=False)
+    rep = RecordingReplace()
+    import_design(rep, pd_data, "t")
+
+    arrays = handoff_arrays(pd_data)
+    node_args = rep.calls["import_bookshelf_nodes"]
+    net_args = rep.calls["import_bookshelf_nets"]
+    row_args = rep.calls["import_bookshelf_rows"]
+    columns = {
+        np.float64: [
+            *node_args[1:3],
+            *rep.calls["import_bookshelf_placement"],
+            *net_args[4:6],
+            *row_args[:2],
+        ],
+        np.int64: [node_args[3], *net_args[1:4], row_args[2]],
+    }
+    for dtype, args in columns.items():
+        for array in args:
+            assert isinstance(array, np.ndarray) and array.dtype == dtype
+            assert array.flags["C_CONTIGUOUS"]
+    assert np.array_equal(net_args[1], arrays["net_ptr"])
+    assert len(net_args[2]) == net_args[1][-1]
+
+
+def test_in_memory_hpwl_matches_lefdef(tmp_path):
+    pytest.importorskip("replace")
+    aux_path = write_bookshelf(SyntheticDesign(2000, seed=4), tmp_path, "t")
+    in_memory_hpwl, lefdef_hpwl = check_handoff(aux_path, use_cache=False)
+    assert in_memory_hpwl > 0
+    assert in_memory_hpwl == pytest.approx(lefdef_hpwl, rel=1e-6)